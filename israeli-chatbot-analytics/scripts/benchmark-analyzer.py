@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+"""Benchmark conversation-analyzer.py on deterministic synthetic corpora.
+
+Generates a reproducible JSONL corpus for each message scale, then times
+every analyze_* function and the full command-line pipeline on it,
+reporting throughput and peak resident memory. Each case runs in its own
+process so that peak RSS belongs to that case alone.
+
+Usage:
+    python benchmark-analyzer.py
+    python benchmark-analyzer.py --scales 10k,1M
+    python benchmark-analyzer.py --scales 1M --cases pipeline,analyze_conversations
+    python benchmark-analyzer.py --scales 10k --hebrew-ratio 0.9 --loop-rate 0.2
+    python benchmark-analyzer.py --scales 1M --model compact
+    python benchmark-analyzer.py --scales 1M --format json --output bench.json
+    python benchmark-analyzer.py --generate corpus.jsonl --messages 100000
+    python benchmark-analyzer.py --help
+
+Corpora are cached in --corpus-dir under a name derived from the generator
+settings, so repeated runs (e.g. before and after a change) measure exactly
+the same input.
+"""
+
+import argparse
+import hashlib
+import importlib.util
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+ANALYZER_PATH = Path(__file__).with_name("conversation-analyzer.py")
+
+# Function cases run the analyzer's public functions on conversations already
+# in memory, as dicts or a CompactCorpus (or streamed from disk above
+# --max-in-memory); "load" measures reading the corpus alone, and "pipeline"
+# runs the full CLI.
+FUNCTION_CASES = {
+    "compute_core_metrics": lambda ca, convos: ca.compute_core_metrics(convos),
+    "analyze_drop_offs": lambda ca, convos: ca.analyze_drop_offs(convos),
+    "detect_loops": lambda ca, convos: ca.detect_loops(convos),
+    "analyze_intent_accuracy": lambda ca, convos: ca.analyze_intent_accuracy(convos),
+    "analyze_response_times": lambda ca, convos: ca.analyze_response_times(convos),
+    "analyze_traffic_patterns": lambda ca, convos: ca.analyze_traffic_patterns(convos),
+    "analyze_language": lambda ca, convos: ca.analyze_language(convos),
+    "analyze_conversations": lambda ca, convos: ca.analyze_conversations(convos),
+}
+CASES = ("load", *FUNCTION_CASES, "pipeline")
+SCALE_UNITS = {"": 1, "k": 1_000, "m": 1_000_000}
+
+CHANNELS = ("whatsapp", "telegram", "web", "app")
+OUTCOMES = ("resolved", "resolved", "resolved", "escalated", "abandoned", "unknown")
+INTENTS = ("order_status", "billing", "shipping", "returns", "opening_hours",
+           "tech_support", "greeting", "human_agent", "fallback")
+HEBREW_TEXTS = (
+    "שלום, איפה ההזמנה שלי?",
+    "אני רוצה לבטל את המנוי",
+    "מתי אתם פתוחים ביום שישי?",
+    "החיוב בכרטיס האשראי לא נכון",
+    "תודה רבה, זה עזר לי",
+    "אפשר לדבר עם נציג?",
+)
+ENGLISH_TEXTS = (
+    "where is my order",
+    "I want to cancel my subscription",
+    "what are your opening hours on Friday?",
+    "my credit card was charged twice",
+    "thanks, that helped",
+    "can I talk to a human?",
+)
+MIXED_TEXTS = (
+    "ההזמנה שלי #4417 עדיין in transit",
+    "יש לי בעיה עם ה-login באפליקציה",
+    "can you send the קבלה to my email?",
+)
+BOT_TEXTS = (
+    "Let me check that for you.",
+    "אני בודק את זה עבורך",
+    "Could you share your order number?",
+    "תוכל לשלוח את מספר ההזמנה?",
+    "Is there anything else I can help with?",
+)
+LOOP_TEXT = "Sorry, I didn't understand. Could you rephrase?"
+
+
+def load_analyzer():
+    """Import conversation-analyzer.py, whose file name is not a module name."""
+    spec = importlib.util.spec_from_file_location("conversation_analyzer", ANALYZER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark conversation-analyzer.py on synthetic corpora.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --scales 10k
+  %(prog)s --scales 10k,1M,10M --format json --output bench.json
+  %(prog)s --generate corpus.jsonl --messages 1M --seed 7
+
+Scales count messages; sessions = messages / --messages-per-session.
+        """,
+    )
+    parser.add_argument(
+        "--scales",
+        type=_scale_list,
+        default=_scale_list("10k,1M,10M"),
+        help="Comma-separated corpus sizes in messages (default: 10k,1M,10M)",
+    )
+    parser.add_argument(
+        "--cases",
+        type=_case_list,
+        default=list(CASES),
+        help=f"Comma-separated cases to run (default: all of {', '.join(CASES)})",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Runs per case; the fastest is reported (default: 1)",
+    )
+    parser.add_argument(
+        "--messages-per-session",
+        type=float,
+        default=8.0,
+        help="Average messages per conversation (default: 8)",
+    )
+    parser.add_argument(
+        "--hebrew-ratio",
+        type=float,
+        default=0.6,
+        help="Share of user messages written in Hebrew (default: 0.6)",
+    )
+    parser.add_argument(
+        "--mixed-ratio",
+        type=float,
+        default=0.1,
+        help="Share of user messages mixing Hebrew and English (default: 0.1)",
+    )
+    parser.add_argument(
+        "--loop-rate",
+        type=float,
+        default=0.05,
+        help="Share of conversations where the bot repeats itself (default: 0.05)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed for the generator (default: 42)",
+    )
+    parser.add_argument(
+        "--corpus-dir",
+        default=os.path.join(tempfile.gettempdir(), "conversation-analyzer-bench"),
+        help="Where generated corpora are cached (default: system temp dir)",
+    )
+    parser.add_argument(
+        "--max-in-memory",
+        type=_scale,
+        default=_scale("2M"),
+        help="Largest scale whose conversations are loaded into a list before timing "
+             "function cases; larger corpora are streamed from disk (default: 2M)",
+    )
+    parser.add_argument(
+        "--model",
+        choices=["dict", "compact"],
+        default="dict",
+        help="In-memory model for function cases: plain dicts or a CompactCorpus (default: dict)",
+    )
+    parser.add_argument(
+        "--analyzer-args",
+        default="",
+        help="Extra arguments for the pipeline case, e.g. --analyzer-args=\"--workers 4\"",
+    )
+    parser.add_argument(
+        "--generate",
+        metavar="PATH",
+        default=None,
+        help="Only write a synthetic JSONL corpus to PATH (sized by --messages)",
+    )
+    parser.add_argument(
+        "--messages",
+        type=_scale,
+        default=_scale("10k"),
+        help="Corpus size in messages for --generate (default: 10k)",
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=["summary", "json"],
+        default="summary",
+        help="Output format (default: summary)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default=None,
+        help="Path to write the results (default: stdout)",
+    )
+    parser.add_argument("--run-case", nargs=3, metavar=("CASE", "CORPUS", "MODE"),
+                        help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.messages_per_session < 1:
+        parser.error("--messages-per-session must be at least 1")
+    for name in ("hebrew_ratio", "mixed_ratio", "loop_rate"):
+        if not 0 <= getattr(args, name) <= 1:
+            parser.error(f"--{name.replace('_', '-')} must be between 0 and 1")
+    if args.hebrew_ratio + args.mixed_ratio > 1:
+        parser.error("--hebrew-ratio plus --mixed-ratio cannot exceed 1")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    return args
+
+
+def _scale(value: str) -> int:
+    value = value.strip().lower()
+    try:
+        return int(float(value[:-1] if value[-1:] in SCALE_UNITS else value)
+                   * SCALE_UNITS.get(value[-1:], 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r}, expected e.g. 10k or 1M") from None
+
+
+def _scale_list(value: str) -> list[int]:
+    return [_scale(part) for part in value.split(",") if part.strip()]
+
+
+def _case_list(value: str) -> list[str]:
+    cases = [part.strip() for part in value.split(",") if part.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown case(s): {', '.join(unknown)}")
+    return cases
+
+
+def generate_conversations(messages: int, messages_per_session: float = 8.0,
+                           hebrew_ratio: float = 0.6, mixed_ratio: float = 0.1,
+                           loop_rate: float = 0.05, seed: int = 42):
+    """Yield synthetic conversations totalling exactly `messages` messages.
+
+    The same arguments always produce the same conversations. Session
+    lengths vary uniformly around `messages_per_session`; conversations
+    alternate user and bot turns, and in `loop_rate` of them the bot sends
+    the same reply three or more times in a row.
+    """
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    max_length = max(1, round(2 * messages_per_session - 1))
+    remaining = messages
+    index = 0
+
+    while remaining > 0:
+        length = rng.randint(1, max_length)
+        looping = rng.random() < loop_rate
+        loop_left = rng.randint(3, 5) if looping else 0
+        # A loop needs its repeated bot replies, which alternate with user turns.
+        length = min(remaining, max(length, 2 * loop_left))
+        remaining -= length
+        started = start + timedelta(seconds=rng.randrange(90 * 86400))
+        tz = "+02:00" if started.month in (1, 2, 11, 12) else "+03:00"
+        clock = started
+        messages_list = []
+        last_bot_text = None
+        for turn in range(length):
+            msg = {"timestamp": f"{clock.isoformat()}{tz}"}
+            if turn % 2 == 0:
+                roll = rng.random()
+                if roll < hebrew_ratio:
+                    text = rng.choice(HEBREW_TEXTS)
+                elif roll < hebrew_ratio + mixed_ratio:
+                    text = rng.choice(MIXED_TEXTS)
+                else:
+                    text = rng.choice(ENGLISH_TEXTS)
+                msg.update(sender="user", text=text, intent=rng.choice(INTENTS),
+                           intent_confidence=round(rng.uniform(0.3, 1.0), 3))
+            else:
+                if loop_left:
+                    text = LOOP_TEXT
+                    loop_left -= 1
+                else:
+                    # Never repeat the previous reply, so loops come only from loop_rate.
+                    text = rng.choice(BOT_TEXTS)
+                    while text == last_bot_text:
+                        text = rng.choice(BOT_TEXTS)
+                last_bot_text = text
+                msg.update(sender="bot", text=text,
+                           response_time_ms=int(rng.lognormvariate(6, 0.6)))
+            messages_list.append(msg)
+            clock += timedelta(seconds=rng.randint(2, 90))
+
+        convo = {
+            "session_id": f"bench-{seed}-{index:09d}",
+            "user_id": f"u-{rng.randrange(max(1, messages // 20)):07d}",
+            "channel": rng.choice(CHANNELS),
+            "language": "he",
+            "started_at": f"{started.isoformat()}{tz}",
+            "ended_at": f"{clock.isoformat()}{tz}",
+            "messages": messages_list,
+            "outcome": rng.choice(OUTCOMES),
+        }
+        if rng.random() < 0.3:
+            convo["satisfaction_score"] = rng.randint(1, 5)
+        index += 1
+        yield convo
+
+
+def write_corpus(path: Path, messages: int, **settings) -> int:
+    """Write a synthetic JSONL corpus; returns the number of conversations."""
+    count = 0
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for convo in generate_conversations(messages, **settings):
+            f.write(json.dumps(convo, ensure_ascii=False))
+            f.write("\n")
+            count += 1
+    os.replace(tmp_path, path)
+    return count
+
+
+def corpus_path(corpus_dir: str, messages: int, settings: dict) -> Path:
+    """A cached corpus file name that changes with every generator setting."""
+    key = json.dumps({"messages": messages, **settings}, sort_keys=True)
+    digest = hashlib.sha1(key.encode()).hexdigest()[:10]
+    return Path(corpus_dir) / f"corpus-{messages}-{digest}.jsonl"
+
+
+def ensure_corpus(corpus_dir: str, messages: int, settings: dict) -> Path:
+    path = corpus_path(corpus_dir, messages, settings)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        print(f"Generating {messages:,}-message corpus at {path}...", file=sys.stderr)
+        write_corpus(path, messages, **settings)
+    return path
+
+
+def run_case(case: str, corpus: str, mode: str) -> dict:
+    """Time one case in this process (the child side of measure_case)."""
+    ca = load_analyzer()
+    if mode in ("dict", "compact") and case in FUNCTION_CASES:
+        conversations = ca.load_conversations(corpus, "jsonl", compact=mode == "compact")
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+        FUNCTION_CASES[case](ca, conversations)
+    else:
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+        conversations = ca.iter_conversations(corpus, "jsonl")
+        if case == "load":
+            for _ in conversations:
+                pass
+        else:
+            FUNCTION_CASES[case](ca, conversations)
+    return {
+        "wall_seconds": time.perf_counter() - started_wall,
+        "cpu_seconds": time.process_time() - started_cpu,
+    }
+
+
+def _peak_rss_bytes(rusage) -> int:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return rusage.ru_maxrss if platform.system() == "Darwin" else rusage.ru_maxrss * 1024
+
+
+def measure_case(case: str, corpus: Path, mode: str, analyzer_args: list[str]) -> dict:
+    """Run one case in a child process and collect its timing and peak RSS."""
+    if case == "pipeline":
+        command = [sys.executable, str(ANALYZER_PATH), "--input", str(corpus),
+                   "--format", "json", "--output", os.devnull, *analyzer_args]
+    else:
+        command = [sys.executable, __file__, "--run-case", case, str(corpus), mode]
+
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    stdout = process.stdout.read()
+    stderr = process.stderr.read()
+    _, status, rusage = os.wait4(process.pid, 0)
+    wall = time.perf_counter() - started
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise RuntimeError(f"{case} failed:\n{stderr.decode(errors='replace')}")
+
+    if case == "pipeline":
+        timing = {"wall_seconds": wall, "cpu_seconds": rusage.ru_utime + rusage.ru_stime}
+    else:
+        timing = json.loads(stdout)
+    timing["peak_rss_bytes"] = _peak_rss_bytes(rusage)
+    return timing
+
+
+def run_benchmarks(args) -> dict:
+    settings = {
+        "messages_per_session": args.messages_per_session,
+        "hebrew_ratio": args.hebrew_ratio,
+        "mixed_ratio": args.mixed_ratio,
+        "loop_rate": args.loop_rate,
+        "seed": args.seed,
+    }
+    analyzer_args = args.analyzer_args.split()
+    results = []
+
+    for messages in args.scales:
+        corpus = ensure_corpus(args.corpus_dir, messages, settings)
+        with open(corpus, "rb") as f:
+            conversations = sum(1 for _ in f)
+        mode = args.model if messages <= args.max_in_memory else "stream"
+        for case in args.cases:
+            print(f"  {messages:>12,} messages  {case}...", file=sys.stderr)
+            runs = [measure_case(case, corpus, mode, analyzer_args) for _ in range(args.repeat)]
+            best = min(runs, key=lambda run: run["wall_seconds"])
+            wall = best["wall_seconds"]
+            results.append({
+                "case": case,
+                "messages": messages,
+                "conversations": conversations,
+                "input": "file" if case in ("load", "pipeline") else mode,
+                "wall_seconds": round(wall, 4),
+                "cpu_seconds": round(best["cpu_seconds"], 4),
+                "messages_per_second": round(messages / wall) if wall > 0 else None,
+                "conversations_per_second": round(conversations / wall) if wall > 0 else None,
+                "peak_rss_mb": round(max(run["peak_rss_bytes"] for run in runs) / 2**20, 1),
+            })
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "corpus": settings,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def format_summary(report: dict) -> str:
+    """Format benchmark results as a table."""
+    lines = []
+    lines.append("=" * 86)
+    lines.append("CONVERSATION ANALYZER BENCHMARK")
+    lines.append("=" * 86)
+    corpus = report["corpus"]
+    lines.append(f"Python {report['python']} on {report['platform']}")
+    lines.append(f"Corpus: {corpus['messages_per_session']:g} messages/session, "
+                 f"{corpus['hebrew_ratio']:.0%} Hebrew, {corpus['mixed_ratio']:.0%} mixed, "
+                 f"{corpus['loop_rate']:.0%} loops, seed {corpus['seed']}")
+
+    header = (f"{'Case':<26} {'Messages':>11} {'Input':>7} {'Wall s':>9} "
+              f"{'CPU s':>9} {'Msgs/s':>12} {'Peak RSS':>10}")
+    scale = None
+    for row in report["results"]:
+        if row["messages"] != scale:
+            scale = row["messages"]
+            lines.append("")
+            lines.append(header)
+            lines.append("-" * len(header))
+        rate = f"{row['messages_per_second']:,}" if row["messages_per_second"] else "-"
+        lines.append(f"{row['case']:<26} {row['messages']:>11,} {row['input']:>7} "
+                     f"{row['wall_seconds']:>9.3f} {row['cpu_seconds']:>9.3f} "
+                     f"{rate:>12} {row['peak_rss_mb']:>8.1f}MB")
+
+    lines.append("\n" + "=" * 86)
+    return "\n".join(lines)
+
+
+def main():
+    args = parse_args()
+
+    if args.run_case:
+        print(json.dumps(run_case(*args.run_case)))
+        return
+
+    if not ANALYZER_PATH.exists():
+        print(f"Error: {ANALYZER_PATH} not found", file=sys.stderr)
+        sys.exit(1)
+
+    if args.generate:
+        count = write_corpus(
+            Path(args.generate),
+            args.messages,
+            messages_per_session=args.messages_per_session,
+            hebrew_ratio=args.hebrew_ratio,
+            mixed_ratio=args.mixed_ratio,
+            loop_rate=args.loop_rate,
+            seed=args.seed,
+        )
+        print(f"Wrote {count:,} conversations ({args.messages:,} messages) to {args.generate}",
+              file=sys.stderr)
+        return
+
+    try:
+        report = run_benchmarks(args)
+    except RuntimeError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.format == "json":
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+    else:
+        output = format_summary(report)
+
+    if args.output:
+        output_path = Path(args.output)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Results written to {output_path}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,17 @@ Usage:
     python conversation-analyzer.py --input conversations.json
     python conversation-analyzer.py --input conversations.json --output report.json
     python conversation-analyzer.py --input conversations.json --format markdown
+    python conversation-analyzer.py --input conversations.jsonl --input-format jsonl
+    python conversation-analyzer.py --input conversations.jsonl --workers 8
+    python conversation-analyzer.py --input 'logs/2026-03-*.jsonl.gz'
+    python conversation-analyzer.py --input conversations.jsonl --latency-sketch
+    python conversation-analyzer.py --input today.jsonl --rollup-dir rollups/ --since 2026-01-01
+    python conversation-analyzer.py --input messages.parquet --sessions sessions.parquet
+    python conversation-analyzer.py --input live.jsonl --follow --window 1h --output kpis.json
+    python conversation-analyzer.py --input conversations.jsonl --group-by channel,week
+    python conversation-analyzer.py --input conversations.jsonl --timeseries 1h --format json
+    python conversation-analyzer.py --input big.jsonl --cache-dir .analyzer-cache --top-n 20
+    python conversation-analyzer.py --input conversations.jsonl --profile --profile-stats run.pstats
     python conversation-analyzer.py --help
 
 Input Format:
@@ -37,340 +48,3688 @@ Input Format:
             "satisfaction_score": 4.5
         }
     ]
+
+    JSONL input (one conversation object per line) is also accepted. Both
+    formats are read incrementally, so memory use is bounded by the largest
+    single conversation rather than the size of the file. When the optional
+    `ijson` package is installed it is used to parse JSON arrays.
+
+    --input may also be a directory or a quoted glob; every matching file is
+    analyzed (concurrently) into one merged report. Files compressed with
+    gzip, or with zstd when the optional `zstandard` package is installed,
+    are decompressed on the fly.
 """
 
-import argparse
-import json
-import sys
-import statistics
-from collections import Counter, defaultdict
-from datetime import datetime
-from pathlib import Path
+import argparse
+import cProfile
+import glob
+import gzip
+import hashlib
+import io
+import json
+import marshal
+import math
+import mmap
+import os
+import re
+import select
+import struct
+import sys
+import time
+import tracemalloc
+from array import array
+from collections import Counter, deque
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from datetime import date, datetime, timedelta
+from fractions import Fraction
+from functools import partial
+from itertools import chain, islice
+from pathlib import Path
+from typing import NamedTuple
+
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:
+    HAS_RESOURCE = False
+
+try:
+    import zstandard
+    HAS_ZSTD = True
+except ImportError:
+    HAS_ZSTD = False
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+COLUMNAR_SUFFIXES = {
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".arrow": "arrow",
+    ".feather": "arrow",
+    ".ipc": "arrow",
+}
+COLUMNAR_FORMATS = ("parquet", "arrow")
+COMPRESSION_SUFFIXES = (".gz", ".zst", ".zstd")
+COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+READ_CHUNK_SIZE = 1 << 20
+# Longest token a buffer can end partway through ("-Infinit", '\u123', "1.5e-")
+# whose decode error is reported at the token's start rather than the end.
+PARTIAL_TOKEN_CHARS = 8
+DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Script detection works on UTF-8 bytes. ASCII letters are single bytes that
+# never occur inside multi-byte sequences, and the Hebrew block U+0590-U+05FF
+# encodes as D7 80-BF (U+05C0-U+05FF) or D6 90-BF (U+0590-U+05BF).
+NON_LATIN_BYTES = bytes(b for b in range(256) if not (0x41 <= b <= 0x5A or 0x61 <= b <= 0x7A))
+HEBREW_D6_RE = re.compile(rb"\xd6[\x90-\xbf]")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Analyze chatbot conversation logs for key metrics.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --input conversations.json
+  %(prog)s --input conversations.json --output report.json
+  %(prog)s --input conversations.json --format markdown
+  %(prog)s --input conversations.json --top-n 20
+  %(prog)s --input conversations.jsonl --workers 0
+  %(prog)s --input exports/ --io-threads 8
+  tail -F bot.log | %(prog)s --input - --follow --window 15m --emit-interval 30
+
+Input file should be a JSON array of conversation objects, or JSONL
+with one conversation object per line.
+        """,
+    )
+    parser.add_argument(
+        "--input", "-i",
+        default=None,
+        help="JSON, JSONL, Parquet or Arrow file of conversation logs, a directory of "
+             "them, or a quoted glob such as 'logs/*.jsonl.gz'; .gz and .zst files are "
+             "decompressed transparently",
+    )
+    parser.add_argument(
+        "--input-format",
+        choices=["auto", "json", "jsonl", *COLUMNAR_FORMATS],
+        default="auto",
+        help="Input file format (default: auto-detect from extension and content)",
+    )
+    parser.add_argument(
+        "--sessions",
+        default=None,
+        help="Parquet/Arrow table of conversation fields (session_id, channel, language, "
+             "started_at, ended_at, outcome, satisfaction_score) to join with a columnar --input",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default=None,
+        help="Path to write the report (default: stdout)",
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=["json", "markdown", "summary"],
+        default="summary",
+        help="Output format (default: summary)",
+    )
+    parser.add_argument(
+        "--top-n",
+        type=int,
+        default=10,
+        help="Number of top items to show in rankings (default: 10)",
+    )
+    parser.add_argument(
+        "--loop-threshold",
+        type=int,
+        default=3,
+        help="Consecutive repeated bot messages to flag as a loop (default: 3)",
+    )
+    parser.add_argument(
+        "--loop-max-period",
+        type=int,
+        default=1,
+        help="Also flag cycles of up to this many bot replies repeated --loop-threshold "
+             "times, e.g. 2 catches A-B-A-B (default: 1, identical replies only)",
+    )
+    parser.add_argument(
+        "--workers", "-j",
+        type=int,
+        default=1,
+        help="Worker processes to shard the analysis across; 0 uses every CPU (default: 1)",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=4,
+        help="Files read concurrently when --input matches several files (default: 4)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=1000,
+        help="Conversations per shard when --workers is not 1 (default: 1000)",
+    )
+    parser.add_argument(
+        "--latency-sketch",
+        action="store_true",
+        help="Estimate response-time percentiles with a constant-memory, mergeable sketch",
+    )
+    parser.add_argument(
+        "--sketch-accuracy",
+        type=float,
+        default=0.01,
+        help="Relative error bound for --latency-sketch percentiles (default: 0.01)",
+    )
+    parser.add_argument(
+        "--approx-rankings",
+        action="store_true",
+        help="Keep drop-off and intent rankings in bounded-memory, mergeable "
+             "heavy-hitter summaries instead of exact counts",
+    )
+    parser.add_argument(
+        "--ranking-capacity",
+        type=int,
+        default=None,
+        help="Entries kept per ranking with --approx-rankings (default: 20 x --top-n)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Keep parsed JSON/JSONL inputs in this directory as a binary cache; later "
+             "runs over an unchanged input (same path, size and mtime) read the cache "
+             "instead of re-parsing",
+    )
+    parser.add_argument(
+        "--group-by",
+        type=_group_by,
+        default=(),
+        help="Also break every report section down by these comma-separated dimensions, "
+             "computed in the same pass: channel, language, week (ISO week of started_at)",
+    )
+    parser.add_argument(
+        "--timeseries",
+        type=_duration,
+        default=None,
+        help="Add a traffic time series with this bucket size, e.g. 1h or 1m: volume, "
+             "resolution rate and p95 response time per bucket",
+    )
+    parser.add_argument(
+        "--timeseries-span",
+        type=_duration,
+        default=None,
+        help="With --timeseries, how far back from the newest conversation to keep "
+             "buckets (default: 31d); memory is at most about 0.6 KB per bucket",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Time loading, each analysis section and each formatter separately and add "
+             "a 'profile' section (wall/CPU seconds, messages/s, memory peaks) to the report",
+    )
+    parser.add_argument(
+        "--profile-stats",
+        default=None,
+        help="With --profile, also write cProfile statistics to this file "
+             "(read with: python -m pstats FILE)",
+    )
+    parser.add_argument(
+        "--trace-allocations",
+        action="store_true",
+        help="With --profile, also measure each stage's peak Python allocations with "
+             "tracemalloc (slows the run down several times)",
+    )
+    parser.add_argument(
+        "--rollup-dir",
+        default=None,
+        help="Directory of per-day rollups; new days from --input are added, "
+             "then the report is built from the stored rollups (conversation "
+             "loops are then listed day by day, not in input order)",
+    )
+    parser.add_argument(
+        "--since",
+        type=_iso_date,
+        default=None,
+        help="First day (YYYY-MM-DD) to include in a --rollup-dir report",
+    )
+    parser.add_argument(
+        "--until",
+        type=_iso_date,
+        default=None,
+        help="Last day (YYYY-MM-DD) to include in a --rollup-dir report",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Recompute rollups for days in --input even if they are already stored; "
+             "each such day is replaced by its conversations in --input alone",
+    )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep reading a growing JSONL --input ('-' for stdin) and re-emit the report "
+             "as new conversations arrive",
+    )
+    parser.add_argument(
+        "--window",
+        type=_duration,
+        default=None,
+        help="With --follow, only report conversations that started within this long "
+             "of the newest one, e.g. 900, 15m, 1h, 7d (default: everything)",
+    )
+    parser.add_argument(
+        "--emit-interval",
+        type=_duration,
+        default=None,
+        help="With --follow, seconds between report updates (default: 60)",
+    )
+    args = parser.parse_args()
+
+    if not args.input and not args.rollup_dir:
+        parser.error("--input is required unless --rollup-dir is given")
+    if (args.since or args.until or args.rebuild) and not args.rollup_dir:
+        parser.error("--since, --until and --rebuild require --rollup-dir")
+    if args.rollup_dir and args.workers != 1:
+        parser.error("--workers cannot be combined with --rollup-dir")
+    if args.sessions and (args.rollup_dir or args.workers != 1):
+        parser.error("--sessions cannot be combined with --rollup-dir or --workers")
+    if args.ranking_capacity is not None and not args.approx_rankings:
+        parser.error("--ranking-capacity requires --approx-rankings")
+    if args.approx_rankings and (args.ranking_capacity or 20 * args.top_n) < max(args.top_n, 1):
+        parser.error("--ranking-capacity must be at least --top-n and at least 1")
+    if args.loop_max_period < 1:
+        parser.error("--loop-max-period must be at least 1")
+    if args.io_threads < 1:
+        parser.error("--io-threads must be at least 1")
+    if args.timeseries_span and not args.timeseries:
+        parser.error("--timeseries-span requires --timeseries")
+    if (args.profile_stats or args.trace_allocations) and not args.profile:
+        parser.error("--profile-stats and --trace-allocations require --profile")
+    if args.profile and (args.rollup_dir or args.follow or args.workers != 1):
+        parser.error("--profile cannot be combined with --rollup-dir, --follow or --workers")
+    if (args.window or args.emit_interval) and not args.follow:
+        parser.error("--window and --emit-interval require --follow")
+    if args.follow:
+        if args.rollup_dir or args.sessions or args.workers != 1 or args.cache_dir:
+            parser.error("--follow cannot be combined with --rollup-dir, --sessions, "
+                         "--workers or --cache-dir")
+        if args.input_format not in ("auto", "jsonl"):
+            parser.error("--follow reads JSONL input only")
+        if args.emit_interval is None:
+            args.emit_interval = 60.0
+    return args
+
+
+def _group_by(value: str) -> tuple[str, ...]:
+    dimensions = tuple(dict.fromkeys(d.strip() for d in value.split(",") if d.strip()))
+    unknown = [d for d in dimensions if d not in SEGMENT_DIMENSIONS]
+    if unknown or not dimensions:
+        raise argparse.ArgumentTypeError(
+            f"invalid --group-by {value!r}, expected a comma-separated list of "
+            + ", ".join(SEGMENT_DIMENSIONS)
+        )
+    return dimensions
+
+
+def _iso_date(value: str) -> str:
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date {value!r}, expected YYYY-MM-DD") from None
+
+
+def _duration(value: str) -> float:
+    match = re.fullmatch(r"(\d+(?:\.\d+)?)([smhd]?)", value.strip())
+    if not match or float(match.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(f"invalid duration {value!r}, expected e.g. 90, 15m, 1h or 7d")
+    return float(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
+def _data_suffix(path: str) -> str:
+    """The extension that names the data format, ignoring .gz/.zst."""
+    name = Path(path).name.lower()
+    for suffix in COMPRESSION_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+            break
+    return Path(name).suffix
+
+
+def detect_compression(path: str) -> str | None:
+    """"gzip" or "zstd" when the file starts with that format's magic bytes."""
+    with open(path, "rb") as f:
+        head = f.read(4)
+    for magic, compression in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_input(path: str, binary: bool = False):
+    """Open an input file, transparently decompressing gzip and zstd.
+
+    Compression is recognized from the content, whatever the file is named.
+    zstd needs the optional `zstandard` package.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return open(path, "rb") if binary else open(path, "r", encoding="utf-8")
+    if compression == "gzip":
+        raw = gzip.open(path, "rb")
+    else:
+        if not HAS_ZSTD:
+            print(f"Error: {path} is zstd-compressed; install zstandard "
+                  "(pip install zstandard) to read it", file=sys.stderr)
+            sys.exit(1)
+        raw = io.BufferedReader(
+            zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), closefd=True),
+            READ_CHUNK_SIZE,
+        )
+    return raw if binary else io.TextIOWrapper(raw, encoding="utf-8")
+
+
+def expand_inputs(spec: str) -> list[str]:
+    """Resolve --input to files: a single path, a directory, or a glob.
+
+    Directories are searched recursively for JSON, JSONL, Parquet and Arrow
+    files (optionally .gz/.zst compressed). Matches are sorted by path, so
+    hourly or daily partitions are read in time order.
+    """
+    if Path(spec).is_dir():
+        known = {".json", *JSONL_SUFFIXES, *COLUMNAR_SUFFIXES}
+        paths = sorted(
+            str(p) for p in Path(spec).rglob("*")
+            if p.is_file() and _data_suffix(p.name) in known
+        )
+    elif glob.has_magic(spec):
+        paths = sorted(p for p in glob.glob(spec, recursive=True) if os.path.isfile(p))
+    else:
+        return [spec]
+    if not paths:
+        print(f"Error: No input files match {spec}", file=sys.stderr)
+        sys.exit(1)
+    return paths
+
+
+def detect_input_format(path: str) -> str:
+    """Guess the input format from the extension, then from the content."""
+    suffix = _data_suffix(path)
+    if suffix in JSONL_SUFFIXES:
+        return "jsonl"
+    if suffix in COLUMNAR_SUFFIXES:
+        return COLUMNAR_SUFFIXES[suffix]
+    with open_input(path) as f:
+        while True:
+            chunk = f.read(4096)
+            if not chunk:
+                return "json"
+            stripped = chunk.lstrip()
+            if stripped:
+                return "jsonl" if stripped[0] == "{" else "json"
+
+
+def decode_jsonl_lines(lines: Iterable[str], path: str, first_line_no: int = 1) -> Iterator[dict]:
+    """Decode JSONL text lines, skipping blanks.
+
+    Raises ValueError naming the file and line on malformed input.
+    """
+    for line_no, line in enumerate(lines, first_line_no):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            convo = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {path} line {line_no}: {e}") from None
+        if not isinstance(convo, dict):
+            raise ValueError(f"{path} line {line_no} is not a conversation object")
+        yield convo
+
+
+def _iter_jsonl(f, path: str) -> Iterator[dict]:
+    """Yield conversations from a JSONL stream, one object per line."""
+    try:
+        yield from decode_jsonl_lines(f, path)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def _iter_json_array(f, path: str) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading it whole.
+
+    Decodes one element at a time from a sliding text buffer. When an element
+    is larger than the buffer, the read size doubles until it fits. More is
+    read only when the decode error could be the buffer cutting the element
+    short (an unterminated string, or an error within the last few
+    characters); any other error is reported at once, so a malformed element
+    never pulls the rest of the file into memory.
+    """
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    chunk_size = READ_CHUNK_SIZE
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in " \t\r\n":
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return ""
+
+    def fail(reason: str):
+        print(f"Error: Invalid JSON in {path}: {reason}", file=sys.stderr)
+        sys.exit(1)
+
+    if skip_whitespace() != "[":
+        print("Error: Input JSON must be a list of conversation objects", file=sys.stderr)
+        sys.exit(1)
+    pos += 1
+    if skip_whitespace() == "]":
+        return
+
+    while True:
+        if not skip_whitespace():
+            fail("unexpected end of file")
+        while True:
+            try:
+                convo, end = decoder.raw_decode(buf, pos)
+                break
+            except json.JSONDecodeError as e:
+                truncated = (e.msg.startswith("Unterminated string")
+                             or e.pos >= len(buf) - PARTIAL_TOKEN_CHARS)
+                if not truncated or not fill():
+                    fail(str(e))
+                chunk_size = min(chunk_size * 2, 1 << 30)
+        if not isinstance(convo, dict):
+            print("Error: Input JSON must be a list of conversation objects", file=sys.stderr)
+            sys.exit(1)
+        pos = end
+        chunk_size = READ_CHUNK_SIZE
+        yield convo
+
+        char = skip_whitespace()
+        if char == "]":
+            pos += 1
+            if skip_whitespace():
+                fail("extra data after the closing ']'")
+            return
+        if not char:
+            fail("unexpected end of file")
+        if char != ",":
+            fail("expected ',' or ']' after a conversation object")
+        pos += 1
+
+
+def _iter_json_array_ijson(f, path: str) -> Iterator[dict]:
+    """Yield array elements using ijson's incremental parser."""
+    try:
+        for convo in ijson.items(f, "item", use_float=True):
+            if not isinstance(convo, dict):
+                print("Error: Input JSON must be a list of conversation objects", file=sys.stderr)
+                sys.exit(1)
+            yield convo
+    except ijson.JSONError as e:
+        print(f"Error: Invalid JSON in {path}: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+def iter_conversations(path: str, input_format: str = "auto") -> Iterator[dict]:
+    """Stream conversation objects from a JSON array or JSONL file.
+
+    Only one conversation is held in memory at a time, so arbitrarily large
+    exports can be analyzed. Parquet/Arrow message tables are also accepted
+    and regrouped into conversations (that path loads the table whole).
+    """
+    file_path = Path(path)
+    if not file_path.exists():
+        print(f"Error: File not found: {path}", file=sys.stderr)
+        sys.exit(1)
+
+    if input_format == "auto":
+        input_format = detect_input_format(path)
+
+    if input_format == "jsonl":
+        with open_input(path) as f:
+            yield from _iter_jsonl(f, path)
+    elif input_format in COLUMNAR_FORMATS:
+        try:
+            frame = ColumnarFrame(read_columnar(path, input_format))
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        yield from frame.iter_conversations()
+    elif HAS_IJSON:
+        with open_input(path, binary=True) as f:
+            yield from _iter_json_array_ijson(f, path)
+    else:
+        with open_input(path) as f:
+            yield from _iter_json_array(f, path)
+
+
+class ConversationCache:
+    """A directory of parsed JSON/JSONL inputs in a fast-loading binary form.
+
+    Each input gets one file, named after its absolute path: the parsed
+    conversations as marshal-encoded chunks, then an index recording the
+    input's size and modification time. When either changes, the entry is
+    rebuilt by the next run that reads the input. Cached runs memory-map
+    the file and decode one chunk at a time, which is about twice as fast
+    as parsing the JSON and keeps memory bounded. marshal data must only be
+    loaded from trusted files, so keep the directory private.
+    """
+
+    MAGIC = b"CACONV01"
+    VERSION = 1
+    SUFFIX = ".conv"
+    CHUNK_SIZE = 1000
+    _HEADER = struct.Struct("<8sQ")
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path_for(self, source: str) -> Path:
+        digest = hashlib.sha1(os.path.abspath(source).encode("utf-8", "surrogatepass")).hexdigest()
+        return self.directory / f"{digest[:20]}{self.SUFFIX}"
+
+    @classmethod
+    def _source_key(cls, source: str) -> dict:
+        stat = os.stat(source)
+        return {
+            "version": cls.VERSION,
+            "marshal": marshal.version,
+            "path": os.path.abspath(source),
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    def lookup(self, source: str) -> list | None:
+        """The chunk index of an up-to-date entry for `source`, if there is one."""
+        try:
+            with open(self.path_for(source), "rb") as f:
+                magic, index_offset = self._HEADER.unpack(f.read(self._HEADER.size))
+                if magic != self.MAGIC:
+                    return None
+                f.seek(index_offset)
+                index = marshal.loads(f.read())
+        except (OSError, EOFError, ValueError, TypeError, struct.error):
+            return None
+        if not isinstance(index, dict) or index.get("source") != self._source_key(source):
+            return None
+        return index["chunks"]
+
+    def _build(self, source: str, input_format: str) -> Iterator[dict]:
+        """Parse `source`, yielding its conversations while writing the entry.
+
+        The input is stat'ed before it is read, so an input that grows
+        meanwhile leaves an entry the next run sees as stale.
+        """
+        key = self._source_key(source)
+        path = self.path_for(source)
+        tmp_path = path.with_name(path.name + ".tmp")
+        chunks = []
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(self._HEADER.pack(self.MAGIC, 0))
+                for chunk in iter_chunks(iter_conversations(source, input_format), self.CHUNK_SIZE):
+                    data = marshal.dumps(chunk)
+                    chunks.append((f.tell(), len(data)))
+                    f.write(data)
+                    yield from chunk
+                index_offset = f.tell()
+                f.write(marshal.dumps({"source": key, "chunks": chunks}))
+                f.seek(0)
+                f.write(self._HEADER.pack(self.MAGIC, index_offset))
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    def ensure(self, source: str, input_format: str = "auto") -> list:
+        """The chunk index for `source`, building the entry first if needed."""
+        chunks = self.lookup(source)
+        if chunks is None:
+            print(f"Caching parsed conversations from {source}...", file=sys.stderr)
+            for _ in self._build(source, input_format):
+                pass
+            chunks = self.lookup(source)
+        return chunks
+
+    def _section_key(self, analyzer: "Analyzer", options: "AnalysisOptions") -> str:
+        settings = {name: getattr(options, name) for name in analyzer.option_fields}
+        return json.dumps([analyzer.section, settings], sort_keys=True)
+
+    def _load_sections(self, source_key: dict, path: Path) -> dict:
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        if payload.get("source") != source_key:
+            return {}
+        return payload["sections"]
+
+    def restore_sections(self, source: str, analyzers: list["Analyzer"],
+                         options: "AnalysisOptions") -> list["Analyzer"]:
+        """Load cached section state into `analyzers`; return those still to compute.
+
+        Finished sections are kept next to the conversations, keyed by the
+        options their state depends on, so a rerun that only changes
+        --top-n, or one section's settings, rescans for that section alone.
+        """
+        sections = self._load_sections(self._source_key(source), self.sections_path_for(source))
+        pending = []
+        for analyzer in analyzers:
+            state = sections.get(self._section_key(analyzer, options))
+            if state is None:
+                pending.append(analyzer)
+            else:
+                analyzer.load_state(state)
+        return pending
+
+    def save_sections(self, source: str, source_key: dict, analyzers: list["Analyzer"],
+                      options: "AnalysisOptions") -> None:
+        """Store finished section state for a scan that began at `source_key`."""
+        path = self.sections_path_for(source)
+        sections = self._load_sections(source_key, path)
+        for analyzer in analyzers:
+            sections[self._section_key(analyzer, options)] = analyzer.to_state()
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"source": source_key, "sections": sections}, f,
+                      ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def sections_path_for(self, source: str) -> Path:
+        return self.path_for(source).with_suffix(".sections.json")
+
+    def iter_conversations(self, source: str, input_format: str = "auto") -> Iterator[dict]:
+        """Stream `source`'s conversations from its entry, or parse and cache them."""
+        chunks = self.lookup(source)
+        if chunks is None:
+            print(f"Caching parsed conversations from {source}...", file=sys.stderr)
+            return self._build(source, input_format)
+        return iter_cached(self.path_for(source), chunks)
+
+
+def iter_cached(cache_path: str, chunks: list) -> Iterator[dict]:
+    """Stream conversations from chunks of a ConversationCache file."""
+    with open(cache_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for offset, length in chunks:
+            yield from marshal.loads(mm[offset:offset + length])
+
+
+def iter_input(path: str, input_format: str = "auto",
+               cache: ConversationCache | None = None) -> Iterator[dict]:
+    """iter_conversations(), going through `cache` for JSON and JSONL input.
+
+    Parquet and Arrow input is already binary and is always read directly.
+    """
+    if cache is None:
+        return iter_conversations(path, input_format)
+    if not Path(path).exists():
+        print(f"Error: File not found: {path}", file=sys.stderr)
+        sys.exit(1)
+    if input_format == "auto":
+        input_format = detect_input_format(path)
+    if input_format in COLUMNAR_FORMATS:
+        return iter_conversations(path, input_format)
+    return cache.iter_conversations(path, input_format)
+
+
+def load_conversations(path: str, input_format: str = "auto",
+                       compact: bool = False) -> "list[dict] | CompactCorpus":
+    """Load all conversation logs from a JSON or JSONL file into memory.
+
+    With `compact`, the conversations are packed into a CompactCorpus
+    instead of a list of dicts.
+    """
+    conversations = iter_conversations(path, input_format)
+    if compact:
+        return CompactCorpus.from_conversations(conversations)
+    return list(conversations)
+
+
+_MISSING = object()
+
+
+class _ValueColumn:
+    """Low-cardinality values, interned: one int32 code per row."""
+
+    __slots__ = ("codes", "values", "_index")
+
+    def __init__(self):
+        self.codes = array("i")
+        self.values = []
+        self._index = {}
+
+    def append(self, value) -> None:
+        if value is _MISSING:
+            self.codes.append(-1)
+            return
+        try:
+            # Key on the type too, so 1, 1.0 and True stay distinct.
+            key = (value.__class__, value)
+            code = self._index.get(key)
+        except TypeError:
+            key = code = None
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            if key is not None:
+                self._index[key] = code
+        self.codes.append(code)
+
+    def get(self, row: int):
+        code = self.codes[row]
+        return _MISSING if code < 0 else self.values[code]
+
+
+class _NumberColumn:
+    """Numbers as float64, with a per-row tag that restores int vs float.
+
+    Values that do not fit (bools, big ints, strings, None) are kept aside.
+    """
+
+    __slots__ = ("numbers", "kinds", "others")
+
+    FLOAT, INT, MISSING, OTHER = 0, 1, 2, 3
+
+    def __init__(self):
+        self.numbers = array("d")
+        self.kinds = array("b")
+        self.others = {}
+
+    def append(self, value) -> None:
+        kind = value.__class__
+        if kind is float:
+            self.kinds.append(self.FLOAT)
+            self.numbers.append(value)
+            return
+        if kind is int and -(1 << 53) <= value <= 1 << 53:
+            self.kinds.append(self.INT)
+            self.numbers.append(value)
+            return
+        if value is _MISSING:
+            self.kinds.append(self.MISSING)
+        else:
+            self.others[len(self.kinds)] = value
+            self.kinds.append(self.OTHER)
+        self.numbers.append(0.0)
+
+    def get(self, row: int):
+        kind = self.kinds[row]
+        if kind == self.FLOAT:
+            return self.numbers[row]
+        if kind == self.INT:
+            return int(self.numbers[row])
+        return self.others.get(row, _MISSING)
+
+
+class _TextColumn:
+    """Strings as UTF-8 in one shared buffer, addressed by end offsets.
+
+    Each offset is shifted left one bit; a set low bit marks a row that is
+    not a string, either missing or kept aside with its original value.
+    """
+
+    __slots__ = ("buffer", "ends", "others")
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.ends = array("Q")
+        self.others = {}
+
+    def append(self, value) -> None:
+        if value.__class__ is str:
+            # surrogatepass keeps lone surrogates from JSON "\ud800" escapes.
+            self.buffer += value.encode("utf-8", "surrogatepass")
+            self.ends.append(len(self.buffer) << 1)
+            return
+        if value is not _MISSING:
+            self.others[len(self.ends)] = value
+        self.ends.append(len(self.buffer) << 1 | 1)
+
+    def get(self, row: int):
+        end = self.ends[row]
+        if end & 1:
+            return self.others.get(row, _MISSING)
+        start = self.ends[row - 1] >> 1 if row else 0
+        return self.buffer[start:end >> 1].decode("utf-8", "surrogatepass")
+
+
+class _CompactRecord:
+    """Read-only, dict-like view of one row of a CompactCorpus."""
+
+    __slots__ = ("_columns", "_row")
+
+    def __init__(self, columns: dict, row: int):
+        self._columns = columns
+        self._row = row
+
+    def get(self, key: str, default=None):
+        column = self._columns.get(key)
+        if column is None:
+            return default
+        value = column.get(self._row)
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def keys(self) -> list[str]:
+        return [key for key in self._columns if key in self]
+
+    def items(self) -> list[tuple]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def to_dict(self) -> dict:
+        return dict(self.items())
+
+
+class CompactMessage(_CompactRecord):
+    __slots__ = ()
+
+
+class CompactConversation(_CompactRecord):
+    __slots__ = ("_corpus",)
+
+    def __init__(self, corpus: "CompactCorpus", row: int):
+        super().__init__(corpus.conversation_columns, row)
+        self._corpus = corpus
+
+    def get(self, key: str, default=None):
+        if key == "messages":
+            return CompactMessages(self._corpus, self._row)
+        return super().get(key, default)
+
+    def keys(self) -> list[str]:
+        return [*super().keys(), "messages"]
+
+    def to_dict(self) -> dict:
+        convo = dict(self.items())
+        convo["messages"] = [msg.to_dict() for msg in convo["messages"]]
+        return convo
+
+
+class CompactMessages(Sequence):
+    """The messages of one CompactConversation, as a lazy sequence of views."""
+
+    __slots__ = ("_columns", "_start", "_stop")
+
+    def __init__(self, corpus: "CompactCorpus", row: int):
+        self._columns = corpus.message_columns
+        self._start = corpus.message_ends[row - 1] if row else 0
+        self._stop = corpus.message_ends[row]
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("message index out of range")
+        return CompactMessage(self._columns, self._start + index)
+
+    def __iter__(self) -> Iterator[CompactMessage]:
+        columns = self._columns
+        for row in range(self._start, self._stop):
+            yield CompactMessage(columns, row)
+
+    def __reversed__(self) -> Iterator[CompactMessage]:
+        columns = self._columns
+        for row in range(self._stop - 1, self._start - 1, -1):
+            yield CompactMessage(columns, row)
+
+
+class CompactCorpus:
+    """Conversations packed into parallel typed arrays.
+
+    A corpus of dicts costs several hundred bytes per message in dict and
+    object overhead. Here each field is one column: categorical fields
+    (sender, intent, channel, outcome, language) are interned int32 codes,
+    numbers are float64 with an int/float tag, and free text is UTF-8 in a
+    shared buffer. Iterating yields lightweight dict-like views, so every
+    analyze_* function and analyzer accepts a CompactCorpus in place of a
+    list of conversations. Only the fields the report reads are kept.
+    """
+
+    CONVERSATION_FIELDS = {
+        "session_id": _TextColumn,
+        "user_id": _TextColumn,
+        "channel": _ValueColumn,
+        "language": _ValueColumn,
+        "started_at": _TextColumn,
+        "ended_at": _TextColumn,
+        "outcome": _ValueColumn,
+        "satisfaction_score": _NumberColumn,
+    }
+    MESSAGE_FIELDS = {
+        "timestamp": _TextColumn,
+        "sender": _ValueColumn,
+        "text": _TextColumn,
+        "intent": _ValueColumn,
+        "intent_confidence": _NumberColumn,
+        "response_time_ms": _NumberColumn,
+    }
+
+    def __init__(self):
+        self.conversation_columns = {name: kind() for name, kind in self.CONVERSATION_FIELDS.items()}
+        self.message_columns = {name: kind() for name, kind in self.MESSAGE_FIELDS.items()}
+        self.message_ends = array("Q")
+
+    @classmethod
+    def from_conversations(cls, conversations: Iterable[dict]) -> "CompactCorpus":
+        corpus = cls()
+        for convo in conversations:
+            corpus.append(convo)
+        return corpus
+
+    def append(self, convo: dict) -> None:
+        """Add one conversation, copying only the fields the report reads."""
+        for name, column in self.conversation_columns.items():
+            column.append(convo.get(name, _MISSING))
+        count = self.message_ends[-1] if self.message_ends else 0
+        for msg in convo.get("messages") or ():
+            for name, column in self.message_columns.items():
+                column.append(msg.get(name, _MISSING))
+            count += 1
+        self.message_ends.append(count)
+
+    def __len__(self) -> int:
+        return len(self.message_ends)
+
+    def __getitem__(self, index: int) -> CompactConversation:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("conversation index out of range")
+        return CompactConversation(self, index)
+
+    def __iter__(self) -> Iterator[CompactConversation]:
+        for row in range(len(self)):
+            yield CompactConversation(self, row)
+
+    @property
+    def message_count(self) -> int:
+        return self.message_ends[-1] if self.message_ends else 0
+
+
+class Timestamp(NamedTuple):
+    """A decoded ISO-8601 timestamp with its local calendar buckets."""
+
+    epoch_us: int
+    aware: bool
+    hour: int
+    weekday: str
+    date: str
+
+
+class TimestampDecoder:
+    """Parse ISO-8601 timestamps once, with caches for the repetitive parts.
+
+    The `YYYY-MM-DDTHH` prefix and the trailing UTC offset are each parsed
+    by datetime.fromisoformat() once per distinct value and cached. Minutes,
+    seconds and fractions are read directly, and hour/weekday/date buckets
+    come from the cached prefix, so strftime never runs per timestamp.
+    The epoch is in integer microseconds (wall clock for naive timestamps).
+    Strings outside the fast path fall back to datetime.fromisoformat(),
+    so accepted and rejected inputs match it exactly. The last decoded
+    value is memoized, because several analyzers ask for the same field of
+    the same conversation in turn; the memo is one (value, result) tuple
+    replaced in a single assignment, so threads sharing a decoder never
+    see a value paired with another value's result.
+    """
+
+    _EPOCH = datetime(1970, 1, 1)
+    _PROBE = "2000-01-01T00:00:00"
+
+    def __init__(self):
+        self._hours = {}
+        self._zones = {}
+        self._last = (None, None)
+
+    def decode(self, value) -> Timestamp | None:
+        """Decode a timestamp string; None if it is missing or invalid."""
+        last_value, last_result = self._last
+        if value == last_value and value is not None:
+            return last_result
+        if not isinstance(value, str):
+            return None
+        result = self._decode_fast(value)
+        if result is False:
+            result = self._decode_slow(value)
+        self._last = (value, result)
+        return result
+
+    def _decode_fast(self, value: str):
+        """Decode common forms; False means "not handled here"."""
+        if (len(value) < 19 or value[10] not in "T " or value[13] != ":"
+                or value[16] != ":"):
+            return False
+        prefix = value[:13]
+        hour_info = self._hours.get(prefix)
+        if hour_info is None:
+            hour_info = self._hours[prefix] = self._parse_hour(prefix)
+        if not hour_info:
+            return False
+        minute = _SEXAGESIMAL.get(value[14:16])
+        second = _SEXAGESIMAL.get(value[17:19])
+        if minute is None or second is None:
+            return False
+
+        micros = 0
+        zone = value[19:]
+        if zone[:1] in (".", ","):
+            end = 1
+            while end < len(zone) and "0" <= zone[end] <= "9":
+                end += 1
+            if end == 1:
+                return False
+            micros = int(zone[1:end][:6].ljust(6, "0"))
+            zone = zone[end:]
+
+        offset_us = 0
+        aware = False
+        if zone:
+            offset_us = self._zones.get(zone)
+            if offset_us is None:
+                offset_us = self._zones[zone] = self._parse_zone(zone)
+            if offset_us is False:
+                return False
+            aware = True
+
+        hour_start, hour, weekday, day = hour_info
+        epoch_us = (hour_start + minute * 60 + second) * 1_000_000 + micros - offset_us
+        return Timestamp(epoch_us, aware, hour, weekday, day)
+
+    def _parse_hour(self, prefix: str):
+        try:
+            dt = datetime.fromisoformat(prefix + ":00")
+        except ValueError:
+            return ()
+        return (
+            (dt - self._EPOCH) // timedelta(seconds=1),
+            dt.hour,
+            dt.strftime("%A"),
+            dt.strftime("%Y-%m-%d"),
+        )
+
+    def _parse_zone(self, zone: str):
+        if zone != "Z" and (zone[0] not in "+-" or zone[1:].strip("0123456789:")):
+            return False
+        try:
+            offset = datetime.fromisoformat(self._PROBE + zone).utcoffset()
+        except ValueError:
+            return False
+        if offset is None:
+            return False
+        return offset // timedelta(microseconds=1)
+
+    def _decode_slow(self, value: str) -> Timestamp | None:
+        try:
+            dt = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+        offset = dt.utcoffset()
+        wall = dt.replace(tzinfo=None)
+        epoch_us = (wall - self._EPOCH) // timedelta(microseconds=1)
+        if offset is not None:
+            epoch_us -= offset // timedelta(microseconds=1)
+        return Timestamp(epoch_us, offset is not None, dt.hour,
+                         dt.strftime("%A"), dt.strftime("%Y-%m-%d"))
+
+
+_SEXAGESIMAL = {f"{i:02d}": i for i in range(60)}
+_timestamps = TimestampDecoder()
+
+
+def decode_timestamp(value) -> Timestamp | None:
+    """Decode an ISO-8601 timestamp with the shared per-process decoder."""
+    return _timestamps.decode(value)
+
+
+def duration_seconds(started_at, ended_at) -> float | None:
+    """Seconds between two ISO-8601 timestamps, as timedelta.total_seconds().
+
+    None when either is missing or invalid, or when only one of them has a
+    UTC offset (datetime cannot subtract those either).
+    """
+    if not started_at or not ended_at:
+        return None
+    start = decode_timestamp(started_at)
+    if start is None:
+        return None
+    start_us, start_aware = start.epoch_us, start.aware
+    end = decode_timestamp(ended_at)
+    if end is None or end.aware != start_aware:
+        return None
+    return (end.epoch_us - start_us) / 1_000_000
+
+
+class ExactSum:
+    """Running sum that stays exact, so means match statistics.mean.
+
+    Integers are summed as-is; floats are kept as non-overlapping partial
+    sums (Shewchuk's algorithm), which represent the total without rounding.
+    """
+
+    __slots__ = ("ints", "partials")
+
+    def __init__(self):
+        self.ints = 0
+        self.partials = []
+
+    def add(self, x, count: int = 1) -> None:
+        """Add x, `count` times."""
+        if isinstance(x, int):
+            self.ints += x * count
+            return
+        if count == 1:
+            self._add_float(x)
+            return
+        # x * 2**k is exact, so add x scaled by each set bit of count.
+        bit = 0
+        while count:
+            if count & 1:
+                self._add_float(math.ldexp(x, bit))
+            count >>= 1
+            bit += 1
+
+    def _add_float(self, x: float) -> None:
+        partials = self.partials
+        i = 0
+        for y in partials:
+            if abs(x) < abs(y):
+                x, y = y, x
+            hi = x + y
+            lo = y - (hi - x)
+            if lo:
+                partials[i] = lo
+                i += 1
+            x = hi
+        partials[i:] = [x]
+
+    def merge(self, other: "ExactSum") -> None:
+        self.ints += other.ints
+        for partial in other.partials:
+            self.add(partial)
+
+    def to_state(self) -> dict:
+        return {"ints": self.ints, "partials": list(self.partials)}
+
+    @classmethod
+    def from_state(cls, state: dict) -> "ExactSum":
+        total = cls()
+        total.ints = state["ints"]
+        total.partials = list(state["partials"])
+        return total
+
+    def value(self):
+        """The exact total: an int for integer data, otherwise a Fraction."""
+        if not self.partials:
+            return self.ints
+        return sum((Fraction(p) for p in self.partials), Fraction(self.ints))
+
+
+def _counter_state(counter: Counter) -> list[list]:
+    """Counter as [key, count] pairs, so int and float keys survive JSON."""
+    return [[key, count] for key, count in counter.items()]
+
+
+def _counter_from_state(pairs: list[list]) -> Counter:
+    return Counter({key: count for key, count in pairs})
+
+
+def _counter_total(counter: Counter):
+    """Exact sum of the values tallied in a Counter."""
+    if all(isinstance(value, int) for value in counter):
+        return sum(value * count for value, count in counter.items())
+    return sum((Fraction(value) * count for value, count in counter.items()), Fraction(0))
+
+
+def _mean(total, count):
+    """Mean from an exact total, typed the way statistics.mean types it."""
+    if isinstance(total, int) and total % count == 0:
+        return total // count
+    return float(total / count)
+
+
+class QuantileSketch:
+    """Mergeable streaming quantile sketch with a relative error bound.
+
+    DDSketch-style: a positive value x is counted in bucket
+    ceil(log_gamma(x)) with gamma = (1 + accuracy) / (1 - accuracy), so every
+    quantile is reported within `relative_accuracy` of a true sample value.
+    Memory depends on the spread of values, not on how many were added;
+    beyond `max_buckets` the lowest buckets are collapsed together, which
+    only degrades the lowest quantiles. Count, sum, min and max stay exact.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01, max_buckets: int = 2048):
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max_buckets
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = ExactSum()
+        self.min = None
+        self.max = None
+
+    def add(self, value, count: int = 1) -> None:
+        if value > 0:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self.buckets[index] = self.buckets.get(index, 0) + count
+            if len(self.buckets) > self.max_buckets:
+                self._collapse()
+        else:
+            self.zero_count += count
+        self.count += count
+        self.total.add(value, count)
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def _collapse(self) -> None:
+        indexes = sorted(self.buckets)
+        excess = len(indexes) - self.max_buckets
+        keep = indexes[excess]
+        for index in indexes[:excess]:
+            self.buckets[keep] += self.buckets.pop(index)
+
+    def merge(self, other: "QuantileSketch") -> None:
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different relative accuracy")
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            self._collapse()
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.total.merge(other.total)
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def quantile(self, q: float):
+        """Estimate the value at quantile q, using rank int(n * q)."""
+        if not self.count:
+            return None
+        rank = min(int(self.count * q), self.count - 1)
+        if rank < self.zero_count:
+            return self.min
+        seen = self.zero_count
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                estimate = 2 * self.gamma ** index / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+    def mean(self):
+        return _mean(self.total.value(), self.count) if self.count else None
+
+    def to_dict(self) -> dict:
+        """JSON-serializable state, restorable with from_dict()."""
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "max_buckets": self.max_buckets,
+            "buckets": {str(index): count for index, count in self.buckets.items()},
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "total": self.total.to_state(),
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "QuantileSketch":
+        sketch = cls(state["relative_accuracy"], state["max_buckets"])
+        sketch.buckets = {int(index): count for index, count in state["buckets"].items()}
+        sketch.zero_count = state["zero_count"]
+        sketch.count = state["count"]
+        sketch.total = ExactSum.from_state(state["total"])
+        sketch.min = state["min"]
+        sketch.max = state["max"]
+        return sketch
+
+
+class HeavyHitters(Counter):
+    """A Counter that keeps roughly its `capacity` largest counts (Space-Saving).
+
+    Increments work as on a Counter; reading an absent key returns the floor
+    and changes nothing. When storing a new key would grow the table to
+    twice the capacity, only the `capacity` largest counts are kept and the
+    largest evicted count becomes the floor. A key added later starts from
+    the floor instead of zero, as in Space-Saving, so counts never
+    underestimate: a key's count exceeds its true count by at most
+    `errors[key]`. Memory is bounded by the capacity, not the number of
+    distinct keys. Merging adds counts, charging keys absent from one side
+    with that side's floor, so shard summaries combine into one summary
+    with the same guarantees. `on_evict`, if given, is called with every
+    batch of evicted keys.
+    """
+
+    def __init__(self, capacity: int, on_evict=None):
+        dict.__init__(self)
+        self.capacity = capacity
+        self.floor = 0
+        self.errors = {}
+        self.on_evict = on_evict
+
+    def __missing__(self, key):
+        return self.floor
+
+    def __setitem__(self, key, count) -> None:
+        # A new key's count was computed from the floor (self[key] += n); if
+        # making room raises the floor, the key starts from the new one.
+        if key not in self:
+            floor = self.floor
+            if len(self) >= 2 * self.capacity:
+                self._prune()
+            count += self.floor - floor
+            if self.floor:
+                self.errors[key] = self.floor
+        dict.__setitem__(self, key, count)
+
+    def __reduce__(self):
+        return (self.__class__, (self.capacity,), self.__dict__, None, iter(self.items()))
+
+    def _prune(self) -> None:
+        ranked = sorted(self.items(), key=lambda item: item[1], reverse=True)
+        evicted = [key for key, _ in ranked[self.capacity:]]
+        if not evicted:
+            return
+        self.floor = max(self.floor, ranked[self.capacity][1])
+        for key in evicted:
+            del self[key]
+            self.errors.pop(key, None)
+        if self.on_evict is not None:
+            self.on_evict(evicted)
+
+    def update(self, other=None, /, **counts) -> None:
+        """Add counts as Counter.update() does, or merge another HeavyHitters summary."""
+        if not isinstance(other, HeavyHitters):
+            if other is not None:
+                pairs = other.items() if isinstance(other, Mapping) else ((key, 1) for key in other)
+                for key, count in pairs:
+                    self[key] += count
+            for key, count in counts.items():
+                self[key] += count
+            return
+
+        floor, other_floor = self.floor, other.floor
+        errors = self.errors
+        for key, count in other.items():
+            error = other.errors.get(key, 0)
+            if key in self:
+                dict.__setitem__(self, key, self[key] + count)
+                error += errors.get(key, 0)
+            else:
+                dict.__setitem__(self, key, count + floor)
+                error += floor
+            if error:
+                errors[key] = error
+        if other_floor:
+            for key in self:
+                if key not in other:
+                    dict.__setitem__(self, key, self[key] + other_floor)
+                    errors[key] = errors.get(key, 0) + other_floor
+        self.floor = floor + other_floor
+        if len(self) > 2 * self.capacity:
+            self._prune()
+
+    def max_error(self, keys: Iterable) -> int:
+        """The largest possible overcount among `keys`."""
+        return max((self.errors.get(key, 0) for key in keys), default=0)
+
+    def to_state(self) -> dict:
+        return {
+            "capacity": self.capacity,
+            "floor": self.floor,
+            "counts": _counter_state(self),
+            "errors": [[key, error] for key, error in self.errors.items()],
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, on_evict=None) -> "HeavyHitters":
+        hitters = cls(state["capacity"], on_evict)
+        hitters.floor = state["floor"]
+        for key, count in state["counts"]:
+            dict.__setitem__(hitters, key, count)
+        hitters.errors = {key: error for key, error in state["errors"]}
+        return hitters
+
+
+def new_ranking(capacity: int | None = None) -> Counter:
+    """An exact Counter, or a bounded HeavyHitters when `capacity` is set."""
+    return Counter() if capacity is None else HeavyHitters(capacity)
+
+
+def _ranking_state(ranking: Counter):
+    return ranking.to_state() if isinstance(ranking, HeavyHitters) else _counter_state(ranking)
+
+
+def _ranking_from_state(state) -> Counter:
+    return HeavyHitters.from_state(state) if isinstance(state, dict) else _counter_from_state(state)
+
+
+def _counter_median(counter: Counter):
+    """Median of the values tallied in a Counter (same as statistics.median)."""
+    n = sum(counter.values())
+    lower_rank = (n - 1) // 2
+    upper_rank = n // 2
+    seen = 0
+    lower = None
+    for value in sorted(counter):
+        seen += counter[value]
+        if lower is None and seen > lower_rank:
+            lower = value
+        if seen > upper_rank:
+            return lower if lower_rank == upper_rank else (lower + value) / 2
+    raise ValueError("median of empty counter")
+
+
+def _counter_ranks(counter: Counter, ranks: list[int]) -> list:
+    """Values at the given 0-based ranks of the sorted tallied values."""
+    order = sorted(range(len(ranks)), key=ranks.__getitem__)
+    values = [None] * len(ranks)
+    seen = 0
+    i = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        while i < len(order) and ranks[order[i]] < seen:
+            values[order[i]] = value
+            i += 1
+        if i == len(order):
+            break
+    return values
+
+
+class Analyzer:
+    """One report section, accumulated in a single pass over the corpus.
+
+    Subclasses override whichever hooks they need. The engine only calls
+    hooks that a subclass overrides, so unused hooks cost nothing.
+    """
+
+    section = ""
+    # AnalysisOptions fields the accumulated state depends on; top_n only
+    # shapes result(), so it is never one of them.
+    option_fields = ()
+
+    def start_conversation(self, convo: dict) -> None:
+        """Called once per conversation, before its messages."""
+
+    def message(self, msg: dict) -> None:
+        """Called for every message, whatever its sender."""
+
+    def user_message(self, msg: dict) -> None:
+        """Called for messages sent by the user."""
+
+    def bot_message(self, msg: dict) -> None:
+        """Called for messages sent by the bot."""
+
+    def merge(self, other: "Analyzer") -> None:
+        """Fold another analyzer's partial state for the same section into this one."""
+        raise NotImplementedError
+
+    def result(self):
+        """Return the finished report section."""
+        raise NotImplementedError
+
+    def to_state(self) -> dict:
+        """Return the partial state as JSON-serializable data."""
+        raise NotImplementedError
+
+    def load_state(self, state: dict) -> None:
+        """Replace this analyzer's partial state with one from to_state()."""
+        raise NotImplementedError
+
+
+def _hooks(analyzers: list[Analyzer], name: str) -> list:
+    base = getattr(Analyzer, name)
+    return [getattr(a, name) for a in analyzers if getattr(type(a), name) is not base]
+
+
+def make_feeder(analyzers: list[Analyzer]):
+    """Return a function that feeds one conversation to every analyzer."""
+    conversation_hooks = _hooks(analyzers, "start_conversation")
+    message_hooks = _hooks(analyzers, "message")
+    user_hooks = _hooks(analyzers, "user_message")
+    bot_hooks = _hooks(analyzers, "bot_message")
+    walk_messages = bool(message_hooks or user_hooks or bot_hooks)
+
+    def feed(convo: dict) -> None:
+        for hook in conversation_hooks:
+            hook(convo)
+        if not walk_messages:
+            return
+        for msg in convo.get("messages", []):
+            for hook in message_hooks:
+                hook(msg)
+            sender = msg.get("sender")
+            if sender == "user":
+                for hook in user_hooks:
+                    hook(msg)
+            elif sender == "bot":
+                for hook in bot_hooks:
+                    hook(msg)
+
+    return feed
+
+
+def run_analyzers(conversations: Iterable[dict], analyzers: list[Analyzer]) -> list[Analyzer]:
+    """Walk the conversations once, feeding every analyzer's hooks."""
+    feed = make_feeder(analyzers)
+    for convo in conversations:
+        feed(convo)
+    return analyzers
+
+
+def _run_single(analyzer: Analyzer, conversations: Iterable[dict]):
+    run_analyzers(conversations, [analyzer])
+    return analyzer.result()
+
+
+class CoreMetricsAnalyzer(Analyzer):
+    """Outcome rates, session length/duration and CSAT."""
+
+    section = "core_metrics"
+
+    def __init__(self):
+        self.total = 0
+        self.outcomes = Counter()
+        self.session_lengths = Counter()
+        self.session_durations = Counter()
+        self.csat_total = ExactSum()
+        self.csat_count = 0
+
+    def start_conversation(self, convo: dict) -> None:
+        self.total += 1
+        self.outcomes[convo.get("outcome", "unknown")] += 1
+        self.session_lengths[len(convo.get("messages", []))] += 1
+
+        duration = duration_seconds(convo.get("started_at"), convo.get("ended_at"))
+        if duration is not None:
+            self.session_durations[duration] += 1
+
+        if convo.get("satisfaction_score") is not None:
+            self.csat_total.add(convo["satisfaction_score"])
+            self.csat_count += 1
+
+    def merge(self, other: "CoreMetricsAnalyzer") -> None:
+        self.total += other.total
+        self.outcomes.update(other.outcomes)
+        self.session_lengths.update(other.session_lengths)
+        self.session_durations.update(other.session_durations)
+        self.csat_total.merge(other.csat_total)
+        self.csat_count += other.csat_count
+
+    def to_state(self) -> dict:
+        return {
+            "total": self.total,
+            "outcomes": _counter_state(self.outcomes),
+            "session_lengths": _counter_state(self.session_lengths),
+            "session_durations": _counter_state(self.session_durations),
+            "csat_total": self.csat_total.to_state(),
+            "csat_count": self.csat_count,
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.total = state["total"]
+        self.outcomes = _counter_from_state(state["outcomes"])
+        self.session_lengths = _counter_from_state(state["session_lengths"])
+        self.session_durations = _counter_from_state(state["session_durations"])
+        self.csat_total = ExactSum.from_state(state["csat_total"])
+        self.csat_count = state["csat_count"]
+
+    def result(self) -> dict:
+        total = self.total
+        if total == 0:
+            return {"total_conversations": 0}
+
+        resolved = self.outcomes.get("resolved", 0)
+        escalated = self.outcomes.get("escalated", 0)
+        abandoned = self.outcomes.get("abandoned", 0)
+
+        durations = self.session_durations
+        duration_count = sum(durations.values())
+        duration_total = _counter_total(durations)
+        length_total = _counter_total(self.session_lengths)
+
+        return {
+            "total_conversations": total,
+            "outcomes": dict(self.outcomes.most_common()),
+            "resolution_rate": round(resolved / total, 4) if total > 0 else 0,
+            "escalation_rate": round(escalated / total, 4) if total > 0 else 0,
+            "abandonment_rate": round(abandoned / total, 4) if total > 0 else 0,
+            "avg_session_length": round(_mean(length_total, total), 1),
+            "median_session_length": _counter_median(self.session_lengths),
+            "avg_session_duration_seconds": round(_mean(duration_total, duration_count), 1) if duration_count else 0,
+            "median_session_duration_seconds": round(_counter_median(durations), 1) if duration_count else 0,
+            "avg_csat": round(_mean(self.csat_total.value(), self.csat_count), 2) if self.csat_count else None,
+            "csat_responses": self.csat_count,
+        }
+
+
+def compute_core_metrics(conversations: Iterable[dict]) -> dict:
+    """Compute core conversation metrics."""
+    return _run_single(CoreMetricsAnalyzer(), conversations)
+
+
+class DropOffAnalyzer(Analyzer):
+    """Where abandoned conversations stop.
+
+    Only abandoned conversations are inspected, scanning backwards from the
+    last message until the last bot reply and last real intent are found.
+    """
+
+    section = "drop_off_analysis"
+    option_fields = ("ranking_capacity",)
+
+    def __init__(self, top_n: int = 10, ranking_capacity: int | None = None):
+        self.top_n = top_n
+        self.ranking_capacity = ranking_capacity
+        self.abandoned_count = 0
+        self.by_depth = Counter()
+        self.by_intent = new_ranking(ranking_capacity)
+        self.by_last_bot_msg = new_ranking(ranking_capacity)
+
+    def start_conversation(self, convo: dict) -> None:
+        if convo.get("outcome") != "abandoned":
+            return
+
+        self.abandoned_count += 1
+        messages = convo.get("messages", [])
+        if not messages:
+            return
+
+        self.by_depth[len(messages)] += 1
+
+        for msg in reversed(messages):
+            if msg["sender"] == "bot":
+                self.by_last_bot_msg[msg.get("text", "")[:100]] += 1
+                break
+
+        for msg in reversed(messages):
+            if msg.get("intent") and msg["intent"] != "fallback":
+                self.by_intent[msg["intent"]] += 1
+                break
+
+    def merge(self, other: "DropOffAnalyzer") -> None:
+        self.abandoned_count += other.abandoned_count
+        self.by_depth.update(other.by_depth)
+        self.by_intent.update(other.by_intent)
+        self.by_last_bot_msg.update(other.by_last_bot_msg)
+
+    def to_state(self) -> dict:
+        return {
+            "abandoned_count": self.abandoned_count,
+            "by_depth": _counter_state(self.by_depth),
+            "by_intent": _ranking_state(self.by_intent),
+            "by_last_bot_msg": _ranking_state(self.by_last_bot_msg),
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.abandoned_count = state["abandoned_count"]
+        self.by_depth = _counter_from_state(state["by_depth"])
+        self.by_intent = _ranking_from_state(state["by_intent"])
+        self.by_last_bot_msg = _ranking_from_state(state["by_last_bot_msg"])
+
+    def result(self) -> dict:
+        top_n = self.top_n
+        by_intent = dict(self.by_intent.most_common(top_n))
+        by_last_bot_message = dict(self.by_last_bot_msg.most_common(top_n))
+        result = {
+            "total_abandoned": self.abandoned_count,
+            "by_depth": dict(self.by_depth.most_common(top_n)),
+            "by_intent": by_intent,
+            "by_last_bot_message": by_last_bot_message,
+        }
+        if self.ranking_capacity is not None:
+            result["ranking_max_overcount"] = max(
+                self.by_intent.max_error(by_intent),
+                self.by_last_bot_msg.max_error(by_last_bot_message),
+            )
+        return result
+
+
+def analyze_drop_offs(conversations: Iterable[dict], top_n: int = 10,
+                      ranking_capacity: int | None = None) -> dict:
+    """Analyze where users drop off in conversations."""
+    return _run_single(DropOffAnalyzer(top_n, ranking_capacity), conversations)
+
+
+def _fingerprint(text) -> int:
+    """A hash standing in for a bot reply when comparing replies.
+
+    str caches its hash, so each text is hashed once however often it is
+    compared. Unhashable values (never produced by real logs) fall back to
+    hashing their repr.
+    """
+    try:
+        return hash(text)
+    except TypeError:
+        return hash(repr(text))
+
+
+class LoopAnalyzer(Analyzer):
+    """Conversations where the bot repeats a reply, or a cycle of replies.
+
+    Bot replies are compared by fingerprint, streaming: for every cycle
+    length p up to `max_period`, the analyzer counts how many replies in a
+    row matched the reply p positions earlier. A run of m such matches is
+    (m + p) // p repetitions of a p-message cycle, e.g. A-B-A-B-A-B is three
+    repetitions of A-B. The shortest cycle to reach `threshold` repetitions
+    is reported, so identical consecutive replies (p = 1) always win.
+    """
+
+    section = "conversation_loops"
+    option_fields = ("loop_threshold", "loop_max_period")
+
+    def __init__(self, threshold: int = 3, max_period: int = 1):
+        self.threshold = threshold
+        self.max_period = max_period
+        self.loops = []
+        self._convo = None
+        self._previous = None
+        self._run = 0
+        self._fingerprints = deque(maxlen=max_period)
+        self._texts = deque(maxlen=max_period)
+        self._runs = [0] * max_period
+        self._flagged = False
+
+    def start_conversation(self, convo: dict) -> None:
+        self._convo = convo
+        self._previous = None
+        self._run = 0
+        if self.max_period > 1:
+            self._fingerprints.clear()
+            self._texts.clear()
+            self._runs = [0] * self.max_period
+        self._flagged = False
+
+    def bot_message(self, msg: dict) -> None:
+        if self._flagged:
+            return
+
+        text = msg.get("text", "")
+        fingerprint = _fingerprint(text)
+        if self.max_period == 1:
+            # Identical replies only: two scalars instead of the ring buffers.
+            if fingerprint == self._previous:
+                self._run += 1
+                if self._run + 1 >= self.threshold:
+                    self._flag(text, 1, self._run + 1)
+            else:
+                self._previous = fingerprint
+                self._run = 0
+            return
+
+        fingerprints = self._fingerprints
+        runs = self._runs
+        seen = len(fingerprints)
+        for period in range(1, self.max_period + 1):
+            if period <= seen and fingerprints[-period] == fingerprint:
+                runs[period - 1] += 1
+                repeat_count = (runs[period - 1] + period) // period
+                if repeat_count >= self.threshold:
+                    self._flag(text, period, repeat_count)
+                    return
+            else:
+                runs[period - 1] = 0
+        fingerprints.append(fingerprint)
+        self._texts.append(text)
+
+    def _flag(self, text, period: int, repeat_count: int) -> None:
+        convo = self._convo
+        cycle = [*list(self._texts)[len(self._texts) - period + 1:], text]
+        loop = {
+            "session_id": convo.get("session_id", "unknown"),
+            "repeated_message": cycle[0][:100],
+            "repeat_count": repeat_count,
+            "total_messages": len(convo.get("messages", [])),
+            "outcome": convo.get("outcome", "unknown"),
+        }
+        if period > 1:
+            loop["cycle_length"] = period
+            loop["cycle"] = [t[:100] for t in cycle]
+        self.loops.append(loop)
+        self._flagged = True
+
+    def merge(self, other: "LoopAnalyzer") -> None:
+        self.loops.extend(other.loops)
+
+    def to_state(self) -> dict:
+        return {"loops": self.loops}
+
+    def load_state(self, state: dict) -> None:
+        self.loops = list(state["loops"])
+
+    def __getstate__(self) -> dict:
+        # Per-conversation scratch state is not worth shipping between processes.
+        return {"threshold": self.threshold, "max_period": self.max_period, "loops": self.loops}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__(state["threshold"], state["max_period"])
+        self.loops = state["loops"]
+
+    def result(self) -> list[dict]:
+        return self.loops
+
+
+def detect_loops(conversations: Iterable[dict], threshold: int = 3,
+                 max_period: int = 1) -> list[dict]:
+    """Detect conversations with repeated bot responses or response cycles."""
+    return _run_single(LoopAnalyzer(threshold, max_period), conversations)
+
+
+class IntentAnalyzer(Analyzer):
+    """Intent distribution, fallback rate and low-confidence intents."""
+
+    section = "intent_analysis"
+    option_fields = ("ranking_capacity",)
+
+    def __init__(self, top_n: int = 10, ranking_capacity: int | None = None):
+        self.top_n = top_n
+        self.ranking_capacity = ranking_capacity
+        self.intent_counts = new_ranking(ranking_capacity)
+        self.low_confidence = {}
+        # With bounded rankings, low-confidence intents are ranked by their
+        # own summary, and evicting an intent drops its confidence stats.
+        self.low_confidence_ranks = None
+        if ranking_capacity is not None:
+            self.low_confidence_ranks = HeavyHitters(ranking_capacity, self._drop_low_confidence)
+        self.fallback_count = 0
+        self.total_user_messages = 0
+
+    def _drop_low_confidence(self, intents: list) -> None:
+        for intent in intents:
+            del self.low_confidence[intent]
+
+    def user_message(self, msg: dict) -> None:
+        self.total_user_messages += 1
+        intent = msg.get("intent", "")
+        if not intent:
+            return
+
+        self.intent_counts[intent] += 1
+        confidence = msg.get("intent_confidence", 0)
+        if confidence < 0.6:
+            stats = self.low_confidence.get(intent)
+            if stats is None:
+                stats = self.low_confidence[intent] = [0, ExactSum()]
+            stats[0] += 1
+            stats[1].add(confidence)
+            if self.low_confidence_ranks is not None:
+                self.low_confidence_ranks[intent] += 1
+        if intent == "fallback":
+            self.fallback_count += 1
+
+    def merge(self, other: "IntentAnalyzer") -> None:
+        self.intent_counts.update(other.intent_counts)
+        for intent, (count, total) in other.low_confidence.items():
+            stats = self.low_confidence.get(intent)
+            if stats is None:
+                stats = self.low_confidence[intent] = [0, ExactSum()]
+            stats[0] += count
+            stats[1].merge(total)
+        if self.low_confidence_ranks is not None:
+            self.low_confidence_ranks.update(other.low_confidence_ranks)
+        self.fallback_count += other.fallback_count
+        self.total_user_messages += other.total_user_messages
+
+    def to_state(self) -> dict:
+        state = {
+            "intent_counts": _ranking_state(self.intent_counts),
+            "low_confidence": [
+                [intent, count, total.to_state()]
+                for intent, (count, total) in self.low_confidence.items()
+            ],
+            "fallback_count": self.fallback_count,
+            "total_user_messages": self.total_user_messages,
+        }
+        if self.low_confidence_ranks is not None:
+            state["low_confidence_ranks"] = self.low_confidence_ranks.to_state()
+        return state
+
+    def load_state(self, state: dict) -> None:
+        self.intent_counts = _ranking_from_state(state["intent_counts"])
+        self.low_confidence = {
+            intent: [count, ExactSum.from_state(total)]
+            for intent, count, total in state["low_confidence"]
+        }
+        if "low_confidence_ranks" in state:
+            self.low_confidence_ranks = HeavyHitters.from_state(
+                state["low_confidence_ranks"], self._drop_low_confidence
+            )
+        self.fallback_count = state["fallback_count"]
+        self.total_user_messages = state["total_user_messages"]
+
+    def result(self) -> dict:
+        total_user_messages = self.total_user_messages
+        ranks = self.low_confidence_ranks
+        # avg_confidence covers the messages actually seen since the intent
+        # entered the summary; count is the (over)estimate used for ranking.
+        low_conf_summary = {
+            intent: {
+                "count": count if ranks is None else ranks[intent],
+                "avg_confidence": round(_mean(total.value(), count), 3),
+            }
+            for intent, (count, total) in self.low_confidence.items()
+        }
+        intent_distribution = dict(self.intent_counts.most_common(self.top_n))
+        low_confidence_intents = dict(sorted(
+            low_conf_summary.items(),
+            key=lambda x: x[1]["count"],
+            reverse=True,
+        )[:self.top_n])
+
+        result = {
+            "total_user_messages": total_user_messages,
+            "intent_distribution": intent_distribution,
+            "fallback_count": self.fallback_count,
+            "fallback_rate": round(self.fallback_count / total_user_messages, 4) if total_user_messages > 0 else 0,
+            "low_confidence_intents": low_confidence_intents,
+        }
+        if ranks is not None:
+            result["ranking_max_overcount"] = max(
+                self.intent_counts.max_error(intent_distribution),
+                ranks.max_error(low_confidence_intents),
+            )
+        return result
+
+
+def analyze_intent_accuracy(conversations: Iterable[dict], top_n: int = 10,
+                            ranking_capacity: int | None = None) -> dict:
+    """Analyze intent recognition patterns."""
+    return _run_single(IntentAnalyzer(top_n, ranking_capacity), conversations)
+
+
+class ResponseTimeAnalyzer(Analyzer):
+    """Bot response latency percentiles.
+
+    By default latencies are tallied in a Counter keyed by value, which keeps
+    the percentiles exact while storing each distinct latency only once.
+    With `latency_accuracy` set they go into a QuantileSketch instead, which
+    uses constant memory and reports percentiles within that relative error.
+    """
+
+    section = "response_times"
+    option_fields = ("latency_accuracy",)
+
+    def __init__(self, latency_accuracy: float | None = None):
+        self.response_times = Counter()
+        self.sketch = QuantileSketch(latency_accuracy) if latency_accuracy else None
+
+    def bot_message(self, msg: dict) -> None:
+        response_time = msg.get("response_time_ms")
+        if response_time:
+            if self.sketch is not None:
+                self.sketch.add(response_time)
+            else:
+                self.response_times[response_time] += 1
+
+    def merge(self, other: "ResponseTimeAnalyzer") -> None:
+        if self.sketch is not None:
+            self.sketch.merge(other.sketch)
+        else:
+            self.response_times.update(other.response_times)
+
+    def to_state(self) -> dict:
+        if self.sketch is not None:
+            return {"sketch": self.sketch.to_dict()}
+        return {"response_times": _counter_state(self.response_times)}
+
+    def load_state(self, state: dict) -> None:
+        if self.sketch is not None:
+            self.sketch = QuantileSketch.from_dict(state["sketch"])
+        else:
+            self.response_times = _counter_from_state(state["response_times"])
+
+    def result(self) -> dict:
+        if self.sketch is not None:
+            return self._sketch_result()
+
+        counts = self.response_times
+        if not counts:
+            return {"total_responses": 0}
+
+        n = sum(counts.values())
+        total = _counter_total(counts)
+        p50, p95, p99 = _counter_ranks(counts, [
+            min(int(n * q), n - 1) for q in (0.50, 0.95, 0.99)
+        ])
+
+        return {
+            "total_responses": n,
+            "avg_ms": round(_mean(total, n), 1),
+            "median_ms": round(_counter_median(counts), 1),
+            "p50_ms": p50,
+            "p95_ms": p95,
+            "p99_ms": p99,
+            "max_ms": max(counts),
+            "min_ms": min(counts),
+        }
+
+    def _sketch_result(self) -> dict:
+        sketch = self.sketch
+        if not sketch.count:
+            return {"total_responses": 0}
+
+        return {
+            "total_responses": sketch.count,
+            "avg_ms": round(sketch.mean(), 1),
+            "median_ms": round(sketch.quantile(0.50), 1),
+            "p50_ms": round(sketch.quantile(0.50), 1),
+            "p95_ms": round(sketch.quantile(0.95), 1),
+            "p99_ms": round(sketch.quantile(0.99), 1),
+            "max_ms": sketch.max,
+            "min_ms": sketch.min,
+            "percentile_relative_error": sketch.relative_accuracy,
+        }
+
+
+def analyze_response_times(conversations: Iterable[dict],
+                           latency_accuracy: float | None = None) -> dict:
+    """Analyze bot response time performance."""
+    return _run_single(ResponseTimeAnalyzer(latency_accuracy), conversations)
+
+
+class TrafficAnalyzer(Analyzer):
+    """Volume by hour, weekday, channel and date."""
+
+    section = "traffic_patterns"
+
+    def __init__(self):
+        self.hour_counts = Counter()
+        self.day_counts = Counter()
+        self.channel_counts = Counter()
+        self.daily_volumes = Counter()
+
+    def start_conversation(self, convo: dict) -> None:
+        self.channel_counts[convo.get("channel", "unknown")] += 1
+
+        started = decode_timestamp(convo.get("started_at"))
+        if started is not None:
+            self.hour_counts[started.hour] += 1
+            self.day_counts[started.weekday] += 1
+            self.daily_volumes[started.date] += 1
+
+    def merge(self, other: "TrafficAnalyzer") -> None:
+        self.hour_counts.update(other.hour_counts)
+        self.day_counts.update(other.day_counts)
+        self.channel_counts.update(other.channel_counts)
+        self.daily_volumes.update(other.daily_volumes)
+
+    def to_state(self) -> dict:
+        return {
+            "hour_counts": _counter_state(self.hour_counts),
+            "day_counts": _counter_state(self.day_counts),
+            "channel_counts": _counter_state(self.channel_counts),
+            "daily_volumes": _counter_state(self.daily_volumes),
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.hour_counts = _counter_from_state(state["hour_counts"])
+        self.day_counts = _counter_from_state(state["day_counts"])
+        self.channel_counts = _counter_from_state(state["channel_counts"])
+        self.daily_volumes = _counter_from_state(state["daily_volumes"])
+
+    def result(self) -> dict:
+        hour_counts = self.hour_counts
+        day_counts = self.day_counts
+        daily_volumes = self.daily_volumes
+        return {
+            "by_hour": dict(sorted(hour_counts.items())),
+            "by_day_of_week": dict(day_counts.most_common()),
+            "by_channel": dict(self.channel_counts.most_common()),
+            "daily_volumes": dict(sorted(daily_volumes.items())),
+            "peak_hour": hour_counts.most_common(1)[0][0] if hour_counts else None,
+            "busiest_day": day_counts.most_common(1)[0][0] if day_counts else None,
+            "avg_daily_volume": round(_mean(sum(daily_volumes.values()), len(daily_volumes)), 1) if daily_volumes else 0,
+        }
+
+
+class TimeSeries:
+    """Per-bucket volume, resolution and latency in fixed-size ring buffers.
+
+    Time is cut into `bucket_seconds` buckets, and bucket b lives in slot
+    b % capacity of typed arrays, so memory is bounded by `capacity`
+    however long the input runs. A slot always holds the newest bucket that
+    maps to it: data for an older bucket is dropped, which keeps the newest
+    `capacity` buckets and makes the result independent of input order.
+    Response times go into a fixed log-scale histogram per slot (values
+    within `latency_accuracy` of each other share a bin, anything above
+    `max_latency_ms` lands in the top bin), from which per-bucket
+    percentiles are read. Histograms are allocated when their slot first
+    sees a response, so a shard touching a few buckets stays small.
+    """
+
+    def __init__(self, bucket_seconds: float = 3600, capacity: int = 24 * 31,
+                 latency_accuracy: float = 0.05, max_latency_ms: float = 2 ** 20):
+        self.bucket_seconds = bucket_seconds
+        self.bucket_us = int(bucket_seconds * 1_000_000)
+        self.capacity = capacity
+        self.latency_accuracy = latency_accuracy
+        self.max_latency_ms = max_latency_ms
+        self.gamma = (1 + latency_accuracy) / (1 - latency_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins = math.ceil(math.log(max_latency_ms) / self._log_gamma) + 1
+        self.total = 0
+        self.buckets = array("q", [-1]) * capacity
+        self.conversations = array("I", bytes(4 * capacity))
+        self.resolved = array("I", bytes(4 * capacity))
+        self.latency = [None] * capacity
+        self._empty_row = array("I", bytes(4 * self.bins))
+
+    def __getstate__(self) -> dict:
+        return self.to_state()
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(TimeSeries.from_state(state).__dict__)
+
+    def _settings(self) -> tuple:
+        return (self.bucket_us, self.capacity, self.latency_accuracy, self.max_latency_ms)
+
+    def slot(self, bucket: int) -> int | None:
+        """The slot holding `bucket`, recycling an older one; None if too old."""
+        slot = bucket % self.capacity
+        held = self.buckets[slot]
+        if held == bucket:
+            return slot
+        if held > bucket:
+            return None
+        self.buckets[slot] = bucket
+        self.conversations[slot] = 0
+        self.resolved[slot] = 0
+        self.latency[slot] = None
+        return slot
+
+    def add_conversation(self, epoch_us: int, resolved: bool) -> int | None:
+        """Count a conversation started at `epoch_us`; returns its slot, if kept."""
+        self.total += 1
+        slot = self.slot(epoch_us // self.bucket_us)
+        if slot is not None:
+            self.conversations[slot] += 1
+            if resolved:
+                self.resolved[slot] += 1
+        return slot
+
+    def add_latency(self, slot: int, value_ms: float, count: int = 1) -> None:
+        index = math.ceil(math.log(value_ms) / self._log_gamma) if value_ms > 1 else 0
+        row = self.latency[slot]
+        if row is None:
+            row = self.latency[slot] = array("I", self._empty_row)
+        row[min(index, self.bins - 1)] += count
+
+    def merge(self, other: "TimeSeries") -> None:
+        if other._settings() != self._settings():
+            raise ValueError("cannot merge time series with different bucket settings")
+        self.total += other.total
+        for other_slot, bucket in enumerate(other.buckets):
+            if bucket < 0:
+                continue
+            slot = self.slot(bucket)
+            if slot is None:
+                continue
+            self.conversations[slot] += other.conversations[other_slot]
+            self.resolved[slot] += other.resolved[other_slot]
+            other_row = other.latency[other_slot]
+            if other_row is None:
+                continue
+            row = self.latency[slot]
+            if row is None:
+                self.latency[slot] = array("I", other_row)
+            else:
+                for index, count in enumerate(other_row):
+                    if count:
+                        row[index] += count
+
+    def _percentile(self, slot: int, q: float):
+        row = self.latency[slot]
+        n = sum(row) if row is not None else 0
+        if not n:
+            return None, 0
+        rank = min(int(n * q), n - 1)
+        seen = 0
+        for index, count in enumerate(row):
+            seen += count
+            if seen > rank:
+                return (round(2 * self.gamma ** index / (self.gamma + 1), 1) if index else 1), n
+        return None, n
+
+    def to_state(self) -> dict:
+        slots = []
+        for slot, bucket in enumerate(self.buckets):
+            if bucket >= 0:
+                row = self.latency[slot] or ()
+                slots.append([
+                    bucket, self.conversations[slot], self.resolved[slot],
+                    {str(i): count for i, count in enumerate(row) if count},
+                ])
+        return {
+            "bucket_seconds": self.bucket_seconds,
+            "capacity": self.capacity,
+            "latency_accuracy": self.latency_accuracy,
+            "max_latency_ms": self.max_latency_ms,
+            "total": self.total,
+            "slots": slots,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "TimeSeries":
+        series = cls(state["bucket_seconds"], state["capacity"],
+                     state["latency_accuracy"], state["max_latency_ms"])
+        series.total = state["total"]
+        for bucket, conversations, resolved, latency in state["slots"]:
+            slot = bucket % series.capacity
+            series.buckets[slot] = bucket
+            series.conversations[slot] = conversations
+            series.resolved[slot] = resolved
+            if latency:
+                row = series.latency[slot] = array("I", series._empty_row)
+                for index, count in latency.items():
+                    row[int(index)] = count
+        return series
+
+    def result(self) -> dict:
+        """The newest `capacity` buckets as parallel lists, gaps filled with zeros."""
+        newest = max(self.buckets)
+        slots = {}
+        if newest >= 0:
+            oldest = newest - self.capacity + 1
+            slots = {b: s for s, b in enumerate(self.buckets) if b >= oldest}
+        series = {
+            "bucket_seconds": self.bucket_seconds,
+            "start": [],
+            "conversations": [],
+            "resolution_rate": [],
+            "responses": [],
+            "p95_response_ms": [],
+        }
+        for bucket in range(min(slots), newest + 1) if slots else ():
+            slot = slots.get(bucket)
+            conversations = self.conversations[slot] if slot is not None else 0
+            resolved = self.resolved[slot] if slot is not None else 0
+            p95, responses = self._percentile(slot, 0.95) if slot is not None else (None, 0)
+            series["start"].append(_epoch_us_isoformat(bucket * self.bucket_us))
+            series["conversations"].append(conversations)
+            series["resolution_rate"].append(round(resolved / conversations, 4) if conversations else 0)
+            series["responses"].append(responses)
+            series["p95_response_ms"].append(p95)
+        kept = sum(self.conversations[slot] for slot in slots.values())
+        series["dropped_conversations"] = self.total - kept
+        series["percentile_relative_error"] = self.latency_accuracy
+        return series
+
+
+class TrafficSeriesAnalyzer(TrafficAnalyzer):
+    """TrafficAnalyzer plus a TimeSeries of volume, resolution rate and p95.
+
+    Conversations are bucketed by `started_at` (UTC for timestamps with an
+    offset, wall clock for naive ones), and their bot response times count
+    towards the same bucket.
+    """
+
+    option_fields = ("timeseries_bucket", "timeseries_span")
+
+    def __init__(self, bucket_seconds: float = 3600, span_seconds: float = 31 * 86400):
+        super().__init__()
+        self.series = TimeSeries(bucket_seconds, max(math.ceil(span_seconds / bucket_seconds), 1))
+        self._slot = None
+
+    def start_conversation(self, convo: dict) -> None:
+        super().start_conversation(convo)
+        started = decode_timestamp(convo.get("started_at"))
+        self._slot = None
+        if started is not None:
+            self._slot = self.series.add_conversation(started.epoch_us, convo.get("outcome") == "resolved")
+
+    def bot_message(self, msg: dict) -> None:
+        if self._slot is None:
+            return
+        response_time = msg.get("response_time_ms")
+        if response_time and isinstance(response_time, (int, float)) and response_time > 0:
+            self.series.add_latency(self._slot, response_time)
+
+    def merge(self, other: "TrafficSeriesAnalyzer") -> None:
+        super().merge(other)
+        self.series.merge(other.series)
+
+    def to_state(self) -> dict:
+        state = super().to_state()
+        state["series"] = self.series.to_state()
+        return state
+
+    def load_state(self, state: dict) -> None:
+        super().load_state(state)
+        self.series = TimeSeries.from_state(state["series"])
+
+    def result(self) -> dict:
+        result = super().result()
+        result["time_series"] = self.series.result()
+        return result
+
+
+def analyze_traffic_patterns(conversations: Iterable[dict], bucket_seconds: float | None = None,
+                             span_seconds: float = 31 * 86400) -> dict:
+    """Analyze traffic volume patterns.
+
+    With `bucket_seconds`, a "time_series" of the newest `span_seconds` is
+    added, e.g. bucket_seconds=3600 for hourly volume, resolution rate and
+    p95 response time.
+    """
+    if bucket_seconds:
+        return _run_single(TrafficSeriesAnalyzer(bucket_seconds, span_seconds), conversations)
+    return _run_single(TrafficAnalyzer(), conversations)
+
+
+def count_scripts(text: str) -> tuple[int, int]:
+    """Count Hebrew (U+0590-U+05FF) and ASCII Latin letters in a text.
+
+    Runs entirely in C-level bytes operations: one UTF-8 encode, one
+    translate for Latin letters and one byte count for Hebrew.
+    """
+    data = text.encode("utf-8", "surrogatepass")
+    hebrew = data.count(b"\xd7")
+    if b"\xd6" in data:
+        hebrew += len(HEBREW_D6_RE.findall(data))
+    return hebrew, len(data.translate(None, NON_LATIN_BYTES))
+
+
+def count_scripts_batch(texts: list[str]) -> list[tuple[int, int]]:
+    """count_scripts() over many texts at once.
+
+    With NumPy installed the batch is encoded as one buffer and counted with
+    vectorized masks and a per-text bincount; otherwise it loops.
+    """
+    if not HAS_NUMPY or len(texts) < 2:
+        return [count_scripts(text) for text in texts]
+
+    data = "\x00".join(texts).encode("utf-8", "surrogatepass")
+    if data.count(b"\x00") != len(texts) - 1:
+        return [count_scripts(text) for text in texts]
+
+    buf = np.frombuffer(data, dtype=np.uint8)
+    separators = np.flatnonzero(buf == 0)
+    latin = ((buf >= 0x41) & (buf <= 0x5A)) | ((buf >= 0x61) & (buf <= 0x7A))
+    hebrew = buf == 0xD7
+    follows_d6 = np.zeros_like(hebrew)
+    follows_d6[1:] = (buf[:-1] == 0xD6) & (buf[1:] >= 0x90) & (buf[1:] <= 0xBF)
+    hebrew |= follows_d6
+
+    # The text a byte belongs to is the number of separators before it.
+    n = len(texts)
+    hebrew_counts = np.bincount(np.searchsorted(separators, np.flatnonzero(hebrew)), minlength=n)
+    latin_counts = np.bincount(np.searchsorted(separators, np.flatnonzero(latin)), minlength=n)
+    return list(zip(hebrew_counts.tolist(), latin_counts.tolist()))
+
+
+def classify_language(hebrew_chars: int, english_chars: int) -> str | None:
+    """Label a message "hebrew", "english" or "mixed" from its letter counts.
+
+    Returns None when the message has no letters in either script.
+    """
+    total_chars = hebrew_chars + english_chars
+    if total_chars == 0:
+        return None
+
+    he_ratio = hebrew_chars / total_chars
+
+    if 0.2 < he_ratio < 0.8:
+        return "mixed"
+    elif he_ratio >= 0.5:
+        return "hebrew"
+    return "english"
+
+
+class LanguageAnalyzer(Analyzer):
+    """Hebrew / English / mixed split of user messages."""
+
+    section = "language_analysis"
+
+    def __init__(self):
+        self.hebrew_msg_count = 0
+        self.english_msg_count = 0
+        self.mixed_msg_count = 0
+        self.total_user_messages = 0
+
+    def user_message(self, msg: dict) -> None:
+        self.total_user_messages += 1
+
+        language = classify_language(*count_scripts(msg.get("text", "")))
+        if language == "mixed":
+            self.mixed_msg_count += 1
+        elif language == "hebrew":
+            self.hebrew_msg_count += 1
+        elif language == "english":
+            self.english_msg_count += 1
+
+    def merge(self, other: "LanguageAnalyzer") -> None:
+        self.hebrew_msg_count += other.hebrew_msg_count
+        self.english_msg_count += other.english_msg_count
+        self.mixed_msg_count += other.mixed_msg_count
+        self.total_user_messages += other.total_user_messages
+
+    def to_state(self) -> dict:
+        return {
+            "hebrew_msg_count": self.hebrew_msg_count,
+            "english_msg_count": self.english_msg_count,
+            "mixed_msg_count": self.mixed_msg_count,
+            "total_user_messages": self.total_user_messages,
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.hebrew_msg_count = state["hebrew_msg_count"]
+        self.english_msg_count = state["english_msg_count"]
+        self.mixed_msg_count = state["mixed_msg_count"]
+        self.total_user_messages = state["total_user_messages"]
+
+    def result(self) -> dict:
+        total_user_messages = self.total_user_messages
+        return {
+            "total_user_messages": total_user_messages,
+            "hebrew_messages": self.hebrew_msg_count,
+            "english_messages": self.english_msg_count,
+            "mixed_messages": self.mixed_msg_count,
+            "mixed_rate": round(self.mixed_msg_count / total_user_messages, 4) if total_user_messages > 0 else 0,
+        }
+
+
+def analyze_language(conversations: Iterable[dict]) -> dict:
+    """Analyze language distribution in messages."""
+    return _run_single(LanguageAnalyzer(), conversations)
+
 
+SEGMENT_DIMENSIONS = ("channel", "language", "week")
 
-def parse_args():
-    parser = argparse.ArgumentParser(
-        description="Analyze chatbot conversation logs for key metrics.",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
-Examples:
-  %(prog)s --input conversations.json
-  %(prog)s --input conversations.json --output report.json
-  %(prog)s --input conversations.json --format markdown
-  %(prog)s --input conversations.json --top-n 20
 
-Input file should be a JSON array of conversation objects.
-See --help-schema for the expected schema.
-        """,
-    )
-    parser.add_argument(
-        "--input", "-i",
-        required=True,
-        help="Path to JSON file containing conversation logs",
-    )
-    parser.add_argument(
-        "--output", "-o",
-        default=None,
-        help="Path to write the report (default: stdout)",
-    )
-    parser.add_argument(
-        "--format", "-f",
-        choices=["json", "markdown", "summary"],
-        default="summary",
-        help="Output format (default: summary)",
-    )
-    parser.add_argument(
-        "--top-n",
-        type=int,
-        default=10,
-        help="Number of top items to show in rankings (default: 10)",
-    )
-    parser.add_argument(
-        "--loop-threshold",
-        type=int,
-        default=3,
-        help="Consecutive repeated bot messages to flag as a loop (default: 3)",
+class SegmentAnalyzer(Analyzer):
+    """Every other report section again, per channel, language or ISO week.
+
+    Each segment key gets its own full set of analyzers. They ride on the
+    same pass as the overall report: start_conversation() picks the
+    conversation's segments and the message hooks are forwarded to just
+    those, so messages are still walked once per conversation however many
+    dimensions are requested.
+    """
+
+    section = "segments"
+    option_fields = (
+        "group_by", "loop_threshold", "loop_max_period", "ranking_capacity", "latency_accuracy",
+        "timeseries_bucket", "timeseries_span",
     )
-    return parser.parse_args()
 
+    def __init__(self, dimensions: Iterable[str], options: "AnalysisOptions"):
+        self.dimensions = tuple(dimensions)
+        self.options = replace(options, group_by=())
+        self.segments = {dimension: {} for dimension in self.dimensions}
+        self._reset_routes()
 
-def load_conversations(path: str) -> list[dict]:
-    """Load conversation logs from a JSON file."""
-    file_path = Path(path)
-    if not file_path.exists():
+    def _reset_routes(self) -> None:
+        self._routes = {}
+        self._weeks = {}
+        self._message_hooks = self._user_hooks = self._bot_hooks = ()
+
+    def __getstate__(self) -> dict:
+        return {"dimensions": self.dimensions, "options": self.options, "segments": self.segments}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._reset_routes()
+
+    def _key(self, dimension: str, convo: dict) -> str:
+        if dimension == "week":
+            started = decode_timestamp(convo.get("started_at"))
+            if started is None:
+                return "unknown"
+            week = self._weeks.get(started.date)
+            if week is None:
+                year, number, _ = date.fromisoformat(started.date).isocalendar()
+                week = self._weeks[started.date] = f"{year}-W{number:02d}"
+            return week
+        value = convo.get(dimension)
+        return "unknown" if value is None or value == "" else str(value)
+
+    def _route(self, keys: tuple) -> tuple:
+        analyzers = []
+        for dimension, key in zip(self.dimensions, keys):
+            segment = self.segments[dimension].get(key)
+            if segment is None:
+                segment = self.segments[dimension][key] = create_analyzers(self.options)
+            analyzers.extend(segment)
+        return tuple(
+            _hooks(analyzers, name)
+            for name in ("start_conversation", "message", "user_message", "bot_message")
+        )
+
+    def start_conversation(self, convo: dict) -> None:
+        keys = tuple(self._key(dimension, convo) for dimension in self.dimensions)
+        route = self._routes.get(keys)
+        if route is None:
+            route = self._routes[keys] = self._route(keys)
+        conversation_hooks, self._message_hooks, self._user_hooks, self._bot_hooks = route
+        for hook in conversation_hooks:
+            hook(convo)
+
+    def message(self, msg: dict) -> None:
+        for hook in self._message_hooks:
+            hook(msg)
+
+    def user_message(self, msg: dict) -> None:
+        for hook in self._user_hooks:
+            hook(msg)
+
+    def bot_message(self, msg: dict) -> None:
+        for hook in self._bot_hooks:
+            hook(msg)
+
+    def merge(self, other: "SegmentAnalyzer") -> None:
+        for dimension, segments in other.segments.items():
+            mine = self.segments[dimension]
+            for key, analyzers in segments.items():
+                if key not in mine:
+                    # Fresh analyzers, so later merges never write into `other`.
+                    mine[key] = create_analyzers(self.options)
+                merge_analyzers(mine[key], analyzers)
+        self._reset_routes()
+
+    def to_state(self) -> dict:
+        return {
+            dimension: {
+                key: {a.section: a.to_state() for a in analyzers}
+                for key, analyzers in segments.items()
+            }
+            for dimension, segments in self.segments.items()
+        }
+
+    def load_state(self, state: dict) -> None:
+        self.segments = {}
+        for dimension in self.dimensions:
+            self.segments[dimension] = {}
+            for key, sections in state[dimension].items():
+                analyzers = create_analyzers(self.options)
+                for analyzer in analyzers:
+                    analyzer.load_state(sections[analyzer.section])
+                self.segments[dimension][key] = analyzers
+        self._reset_routes()
+
+    def result(self) -> dict:
+        return {
+            dimension: {key: build_report(segments[key]) for key in sorted(segments)}
+            for dimension, segments in self.segments.items()
+        }
+
+
+def analyze_segments(conversations: Iterable[dict], dimensions: Iterable[str],
+                     options: "AnalysisOptions | None" = None) -> dict:
+    """Produce the full report per channel, language and/or ISO week."""
+    return _run_single(SegmentAnalyzer(dimensions, options or AnalysisOptions()), conversations)
+
+
+@dataclass
+class AnalysisOptions:
+    """Settings that shape the analyzers of a run."""
+
+    top_n: int = 10
+    loop_threshold: int = 3
+    loop_max_period: int = 1
+    latency_accuracy: float | None = None
+    ranking_capacity: int | None = None
+    group_by: tuple[str, ...] = ()
+    timeseries_bucket: float | None = None
+    timeseries_span: float = 31 * 86400
+
+    @classmethod
+    def from_args(cls, args: argparse.Namespace) -> "AnalysisOptions":
+        return cls(
+            top_n=args.top_n,
+            loop_threshold=args.loop_threshold,
+            loop_max_period=args.loop_max_period,
+            latency_accuracy=args.sketch_accuracy if args.latency_sketch else None,
+            ranking_capacity=(args.ranking_capacity or 20 * args.top_n) if args.approx_rankings else None,
+            group_by=args.group_by,
+            timeseries_bucket=args.timeseries,
+            timeseries_span=args.timeseries_span or 31 * 86400,
+        )
+
+
+def create_analyzers(options: AnalysisOptions | None = None) -> list[Analyzer]:
+    """Build one analyzer per report section, in report order."""
+    options = options or AnalysisOptions()
+    analyzers = [
+        CoreMetricsAnalyzer(),
+        DropOffAnalyzer(options.top_n, options.ranking_capacity),
+        LoopAnalyzer(options.loop_threshold, options.loop_max_period),
+        IntentAnalyzer(options.top_n, options.ranking_capacity),
+        ResponseTimeAnalyzer(options.latency_accuracy),
+        TrafficSeriesAnalyzer(options.timeseries_bucket, options.timeseries_span)
+        if options.timeseries_bucket else TrafficAnalyzer(),
+        LanguageAnalyzer(),
+    ]
+    if options.group_by:
+        analyzers.append(SegmentAnalyzer(options.group_by, options))
+    return analyzers
+
+
+def merge_analyzers(target: list[Analyzer], other: list[Analyzer]) -> list[Analyzer]:
+    """Merge a partial analyzer list (same order as target) into target.
+
+    With the default Counter-based analyzers, merging partials in input
+    order gives exactly the report a single sequential pass would,
+    including the order of tied rankings. With --approx-rankings
+    (HeavyHitters) or --latency-sketch (QuantileSketch) the merged
+    rankings and percentiles are only guaranteed within those sketches'
+    error bounds.
+    """
+    for analyzer, partial_analyzer in zip(target, other):
+        analyzer.merge(partial_analyzer)
+    return target
+
+
+def build_report(analyzers: list[Analyzer]) -> dict:
+    """Collect each analyzer's finished section into a report dict."""
+    return {analyzer.section: analyzer.result() for analyzer in analyzers}
+
+
+def analyze_conversations(conversations: Iterable[dict],
+                          options: AnalysisOptions | None = None) -> dict:
+    """Produce the full report in a single pass over the conversations.
+
+    Accepts any iterable, including the generator from iter_conversations(),
+    so the corpus never has to fit in memory.
+    """
+    analyzers = run_analyzers(conversations, create_analyzers(options))
+    return build_report(analyzers)
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    """Group an iterable into lists of at most `size` items."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _iter_shards(path: str, input_format: str, chunk_size: int) -> Iterator[tuple]:
+    """Yield (first_line_no, items) work units for the process pool.
+
+    JSONL shards carry raw text lines so that JSON decoding also happens in
+    the workers. JSON arrays have to be decoded here to find element
+    boundaries, so their shards carry conversation dicts (first_line_no None).
+    """
+    if input_format == "auto":
+        input_format = detect_input_format(path)
+
+    if input_format == "jsonl":
+        with open_input(path) as f:
+            line_no = 1
+            for lines in iter_chunks(f, chunk_size):
+                yield line_no, lines
+                line_no += len(lines)
+    else:
+        for convos in iter_chunks(iter_conversations(path, input_format), chunk_size):
+            yield None, convos
+
+
+def _analyze_shard(shard: tuple, path: str, options: AnalysisOptions) -> list[Analyzer]:
+    """Worker entry point: analyze one shard into partial analyzer state."""
+    first_line_no, items = shard
+    if first_line_no is not None:
+        items = decode_jsonl_lines(items, path, first_line_no)
+    return run_analyzers(items, create_analyzers(options))
+
+
+def _analyze_cached_chunk(chunk: tuple, cache_path: str, options: AnalysisOptions) -> list[Analyzer]:
+    """Worker entry point: analyze one chunk of a ConversationCache file."""
+    return run_analyzers(iter_cached(cache_path, [chunk]), create_analyzers(options))
+
+
+def analyze_parallel(path: str, input_format: str = "auto",
+                     options: AnalysisOptions | None = None, workers: int = 0,
+                     chunk_size: int = 1000, cache: ConversationCache | None = None) -> dict:
+    """Produce the full report using a pool of worker processes.
+
+    The input is split into shards of `chunk_size` conversations, each
+    worker returns partial analyzer state, and partials are merged in input
+    order. At most two shards per worker are in flight, so memory stays
+    bounded however large the input is. With a `cache`, JSON and JSONL
+    input is cached first and the workers each map the cache file and
+    decode their own chunks.
+    """
+    if not Path(path).exists():
         print(f"Error: File not found: {path}", file=sys.stderr)
         sys.exit(1)
 
+    options = options or AnalysisOptions()
+    workers = workers or os.cpu_count() or 1
+    if input_format == "auto":
+        input_format = detect_input_format(path)
+    if cache is not None and input_format not in COLUMNAR_FORMATS:
+        worker = partial(_analyze_cached_chunk, cache_path=cache.path_for(path), options=options)
+        shards = cache.ensure(path, input_format)
+    else:
+        worker = partial(_analyze_shard, path=path, options=options)
+        shards = _iter_shards(path, input_format, chunk_size)
+    merged = create_analyzers(options)
+    pending = deque()
+
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in {path}: {e}", file=sys.stderr)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for shard in shards:
+                pending.append(pool.submit(worker, shard))
+                if len(pending) >= workers * 2:
+                    merge_analyzers(merged, pending.popleft().result())
+            while pending:
+                merge_analyzers(merged, pending.popleft().result())
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
 
-    if not isinstance(data, list):
-        print("Error: Input JSON must be a list of conversation objects", file=sys.stderr)
+    return build_report(merged)
+
+
+def analyze_cached(path: str, input_format: str, options: AnalysisOptions,
+                   cache: ConversationCache) -> list[Analyzer]:
+    """Analyze one input through `cache`, reusing any sections it already holds.
+
+    Only the sections with no cached state for these options are run, over
+    the cached conversations; their state is then cached in turn.
+    """
+    analyzers = create_analyzers(options)
+    if not Path(path).exists():
+        print(f"Error: File not found: {path}", file=sys.stderr)
         sys.exit(1)
+    source_key = cache._source_key(path)
+    pending = cache.restore_sections(path, analyzers, options)
+    if pending:
+        run_analyzers(iter_input(path, input_format, cache), pending)
+        cache.save_sections(path, source_key, pending, options)
+    return analyzers
 
-    return data
 
+def _analyze_file(path: str, input_format: str, options: AnalysisOptions,
+                  cache: ConversationCache | None = None) -> list[Analyzer]:
+    """Pool entry point: analyze one whole input file into partial state."""
+    if cache is not None:
+        return analyze_cached(path, input_format, options, cache)
+    return run_analyzers(iter_conversations(path, input_format), create_analyzers(options))
 
-def compute_core_metrics(conversations: list[dict]) -> dict:
-    """Compute core conversation metrics."""
-    total = len(conversations)
-    if total == 0:
-        return {"total_conversations": 0}
-
-    outcomes = Counter(c.get("outcome", "unknown") for c in conversations)
-    resolved = outcomes.get("resolved", 0)
-    escalated = outcomes.get("escalated", 0)
-    abandoned = outcomes.get("abandoned", 0)
-
-    session_lengths = []
-    session_durations = []
-    for c in conversations:
-        msg_count = len(c.get("messages", []))
-        session_lengths.append(msg_count)
-
-        if c.get("started_at") and c.get("ended_at"):
-            try:
-                start = datetime.fromisoformat(c["started_at"])
-                end = datetime.fromisoformat(c["ended_at"])
-                session_durations.append((end - start).total_seconds())
-            except (ValueError, TypeError):
-                pass
 
-    csat_scores = [
-        c["satisfaction_score"]
-        for c in conversations
-        if c.get("satisfaction_score") is not None
-    ]
+def analyze_files(paths: list[str], input_format: str = "auto",
+                  options: AnalysisOptions | None = None, io_threads: int = 4,
+                  workers: int = 1, cache: ConversationCache | None = None) -> dict:
+    """Produce one report from many input files, reading them concurrently.
 
-    return {
-        "total_conversations": total,
-        "outcomes": dict(outcomes.most_common()),
-        "resolution_rate": round(resolved / total, 4) if total > 0 else 0,
-        "escalation_rate": round(escalated / total, 4) if total > 0 else 0,
-        "abandonment_rate": round(abandoned / total, 4) if total > 0 else 0,
-        "avg_session_length": round(statistics.mean(session_lengths), 1) if session_lengths else 0,
-        "median_session_length": statistics.median(session_lengths) if session_lengths else 0,
-        "avg_session_duration_seconds": round(statistics.mean(session_durations), 1) if session_durations else 0,
-        "median_session_duration_seconds": round(statistics.median(session_durations), 1) if session_durations else 0,
-        "avg_csat": round(statistics.mean(csat_scores), 2) if csat_scores else None,
-        "csat_responses": len(csat_scores),
-    }
+    With `workers` of 1 the files are read on `io_threads` threads, which
+    overlaps disk reads and gzip/zstd decompression (both release the GIL)
+    with parsing. Any other `workers` value parses whole files in that many
+    processes instead (0 uses every CPU). Either way partial results are
+    merged in path order, and only a couple of files per thread or process
+    are in flight at once.
+    """
+    options = options or AnalysisOptions()
+    if workers == 1:
+        executor = ThreadPoolExecutor(max_workers=max(io_threads, 1))
+        in_flight = max(io_threads, 1) * 2
+    else:
+        workers = workers or os.cpu_count() or 1
+        executor = ProcessPoolExecutor(max_workers=workers)
+        in_flight = workers * 2
+    worker = partial(_analyze_file, input_format=input_format, options=options, cache=cache)
+    merged = create_analyzers(options)
+    pending = deque()
 
+    try:
+        with executor:
+            for path in paths:
+                pending.append(executor.submit(worker, path))
+                if len(pending) >= in_flight:
+                    merge_analyzers(merged, pending.popleft().result())
+            while pending:
+                merge_analyzers(merged, pending.popleft().result())
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
 
-def analyze_drop_offs(conversations: list[dict], top_n: int = 10) -> dict:
-    """Analyze where users drop off in conversations."""
-    drop_offs_by_depth = Counter()
-    drop_offs_by_intent = Counter()
-    drop_offs_by_last_bot_msg = Counter()
+    return build_report(merged)
+
+
+def conversation_date(convo: dict) -> str | None:
+    """The YYYY-MM-DD date of `started_at` in its own UTC offset, if valid."""
+    started = decode_timestamp(convo.get("started_at"))
+    return started.date if started is not None else None
+
+
+class RollupStore:
+    """A directory of per-day partial analyzer state.
+
+    Each day is one gzip-compressed JSON file, `YYYY-MM-DD.json.gz`, holding
+    the to_state() of every report section for conversations that started
+    that day. Rankings keep their full counts, so --top-n can change freely
+    between runs; loop detection, latency percentiles and bounded rankings
+    depend on the options recorded in the file, and mismatching files are
+    rejected.
+    """
 
-    abandoned_count = 0
+    VERSION = 1
+    SUFFIX = ".json.gz"
+
+    def __init__(self, directory: str):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _fingerprint(options: AnalysisOptions) -> dict:
+        fingerprint = {
+            "loop_threshold": options.loop_threshold,
+            "latency_accuracy": options.latency_accuracy,
+        }
+        if options.loop_max_period != 1:
+            fingerprint["loop_max_period"] = options.loop_max_period
+        if options.ranking_capacity is not None:
+            fingerprint["ranking_capacity"] = options.ranking_capacity
+        if options.group_by:
+            fingerprint["group_by"] = list(options.group_by)
+        if options.timeseries_bucket:
+            fingerprint["timeseries"] = [options.timeseries_bucket, options.timeseries_span]
+        return fingerprint
+
+    def path_for(self, day: str) -> Path:
+        return self.directory / f"{day}{self.SUFFIX}"
+
+    def days(self) -> list[str]:
+        return sorted(p.name[:-len(self.SUFFIX)] for p in self.directory.glob(f"*{self.SUFFIX}"))
+
+    def save(self, day: str, analyzers: list[Analyzer], options: AnalysisOptions) -> None:
+        payload = {
+            "version": self.VERSION,
+            "date": day,
+            "options": self._fingerprint(options),
+            "sections": {a.section: a.to_state() for a in analyzers},
+        }
+        path = self.path_for(day)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def load(self, day: str, options: AnalysisOptions) -> list[Analyzer]:
+        path = self.path_for(day)
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            payload = json.load(f)
+        if payload.get("version") != self.VERSION:
+            raise ValueError(f"Unsupported rollup version in {path}")
+        if payload["options"] != self._fingerprint(options):
+            raise ValueError(
+                f"Rollup {path} was built with {payload['options']}; "
+                "rerun with the same --loop-threshold/--loop-max-period/--latency-sketch/"
+                "--approx-rankings/--group-by/--timeseries settings or use --rebuild"
+            )
+        analyzers = create_analyzers(options)
+        for analyzer in analyzers:
+            analyzer.load_state(payload["sections"][analyzer.section])
+        return analyzers
+
+
+def analyze_with_rollups(conversations: Iterable[dict], rollup_dir: str,
+                         options: AnalysisOptions | None = None,
+                         since: str | None = None, until: str | None = None,
+                         rebuild: bool = False) -> dict:
+    """Roll new days up into the store, then report from stored rollups.
+
+    Conversations from days that already have a rollup are skipped unless
+    `rebuild` is set, so raw logs for old days are never reprocessed; the
+    skipped conversations are counted per day and reported, since any late
+    arrivals among them are not in the stored rollup. With `rebuild` a
+    stored day is replaced by that day's conversations in this input only.
+    The report merges every stored day between `since` and `until`
+    (inclusive YYYY-MM-DD bounds), oldest first. Because of that, list
+    sections such as conversation_loops come out grouped by day, oldest
+    first and in input order within each day, rather than in the input
+    order a plain run over the same conversations gives; their contents
+    are the same.
+    """
+    options = options or AnalysisOptions()
+    store = RollupStore(rollup_dir)
+    stored = set(store.days())
+    new_days = {}
+    skipped = Counter()
+    undated = 0
 
     for convo in conversations:
-        if convo.get("outcome") != "abandoned":
+        day = conversation_date(convo)
+        if day is None:
+            undated += 1
+            continue
+        if (since and day < since) or (until and day > until):
             continue
+        if day in stored and not rebuild:
+            skipped[day] += 1
+            continue
+        entry = new_days.get(day)
+        if entry is None:
+            analyzers = create_analyzers(options)
+            entry = new_days[day] = (analyzers, make_feeder(analyzers))
+        entry[1](convo)
 
-        abandoned_count += 1
-        messages = convo.get("messages", [])
-        if not messages:
+    for day, (analyzers, _) in sorted(new_days.items()):
+        store.save(day, analyzers, options)
+
+    rebuilt = sum(1 for day in new_days if day in stored)
+    print(f"Rolled up {len(new_days) - rebuilt} new day(s) into {rollup_dir}.", file=sys.stderr)
+    if rebuilt:
+        print(f"Rebuilt {rebuilt} stored day(s) from this input alone.", file=sys.stderr)
+    if skipped:
+        days = ", ".join(f"{day}: {count:,}" for day, count in sorted(skipped.items())[:10])
+        more = f", and {len(skipped) - 10} more" if len(skipped) > 10 else ""
+        print(f"Skipped {sum(skipped.values()):,} conversations from {len(skipped)} already "
+              f"rolled-up day(s) ({days}{more}); use --rebuild to recompute those days "
+              f"if they contain new data.", file=sys.stderr)
+    if undated:
+        print(f"Skipped {undated:,} conversations without a valid started_at.", file=sys.stderr)
+
+    merged = create_analyzers(options)
+    for day in store.days():
+        if (since and day < since) or (until and day > until):
             continue
+        merge_analyzers(merged, store.load(day, options))
+    return build_report(merged)
 
-        drop_offs_by_depth[len(messages)] += 1
 
-        for msg in reversed(messages):
-            if msg["sender"] == "bot":
-                truncated = msg.get("text", "")[:100]
-                drop_offs_by_last_bot_msg[truncated] += 1
-                break
+def _rotated(path: str, f) -> bool:
+    """Whether `path` was truncated or replaced since `f` was opened."""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(f.fileno())
+    return current.st_ino != opened.st_ino or current.st_size < f.tell()
 
-        for msg in reversed(messages):
-            if msg.get("intent") and msg["intent"] != "fallback":
-                drop_offs_by_intent[msg["intent"]] += 1
+
+def follow_lines(path: str, poll_interval: float = 1.0) -> Iterator[str | None]:
+    """Yield lines as they are appended to a file, or to stdin for "-".
+
+    Yields None whenever no complete line has arrived within
+    `poll_interval` seconds, so the caller can do periodic work while the
+    log is idle. A file is read from the start and then followed forever;
+    if it is truncated or replaced (log rotation) it is reopened from the
+    beginning. Stdin is followed until EOF.
+    """
+    pending = b""
+
+    def split(chunk: bytes) -> list[str]:
+        nonlocal pending
+        *lines, pending = (pending + chunk).split(b"\n")
+        return [line.decode("utf-8", errors="replace") for line in lines]
+
+    if path == "-":
+        fd = sys.stdin.fileno()
+        while True:
+            ready, _, _ = select.select([fd], [], [], poll_interval)
+            if not ready:
+                yield None
+                continue
+            chunk = os.read(fd, READ_CHUNK_SIZE)
+            if not chunk:
                 break
+            yield from split(chunk)
+        if pending:
+            yield pending.decode("utf-8", errors="replace")
+        return
 
-    return {
-        "total_abandoned": abandoned_count,
-        "by_depth": dict(drop_offs_by_depth.most_common(top_n)),
-        "by_intent": dict(drop_offs_by_intent.most_common(top_n)),
-        "by_last_bot_message": dict(drop_offs_by_last_bot_msg.most_common(top_n)),
-    }
+    f = open(path, "rb")
+    try:
+        while True:
+            chunk = f.read(READ_CHUNK_SIZE)
+            if chunk:
+                yield from split(chunk)
+            elif _rotated(path, f):
+                f.close()
+                f = open(path, "rb")
+                pending = b""
+            else:
+                yield None
+                time.sleep(poll_interval)
+    finally:
+        f.close()
 
 
-def detect_loops(conversations: list[dict], threshold: int = 3) -> list[dict]:
-    """Detect conversations with repeated bot responses."""
-    loops = []
+class SlidingWindow:
+    """Report state for the conversations in a sliding event-time window.
 
-    for convo in conversations:
-        bot_messages = [
-            m.get("text", "")
-            for m in convo.get("messages", [])
-            if m.get("sender") == "bot"
-        ]
+    The window is cut into `slots` equal slices keyed by `started_at`, each
+    holding its own analyzers. Conversations are analyzed once as they
+    arrive; when a newer slice opens, slices that fell out of the window are
+    dropped, and a report merges the remaining ones. Without a window every
+    conversation lands in a single slice. Conversations without a valid
+    `started_at` count towards the newest slice, and ones that start before
+    the window are counted as late and ignored.
+    """
+
+    def __init__(self, options: AnalysisOptions | None = None,
+                 window_seconds: float | None = None, slots: int = 60):
+        self.options = options or AnalysisOptions()
+        self.window_seconds = window_seconds
+        self.slot_us = max(1, int(window_seconds * 1_000_000) // slots) if window_seconds else None
+        self.span = -(-int(window_seconds * 1_000_000) // self.slot_us) if window_seconds else None
+        self.newest = None
+        self.late = 0
+        self._slots = {}
 
-        repeat_count = 1
-        for i in range(1, len(bot_messages)):
-            if bot_messages[i] == bot_messages[i - 1]:
-                repeat_count += 1
-                if repeat_count >= threshold:
-                    loops.append({
-                        "session_id": convo.get("session_id", "unknown"),
-                        "repeated_message": bot_messages[i][:100],
-                        "repeat_count": repeat_count,
-                        "total_messages": len(convo.get("messages", [])),
-                        "outcome": convo.get("outcome", "unknown"),
-                    })
-                    break
+    def add(self, convo: dict) -> None:
+        key = None
+        if self.slot_us is not None:
+            started = decode_timestamp(convo.get("started_at"))
+            if started is None:
+                key = self.newest
             else:
-                repeat_count = 1
+                key = started.epoch_us // self.slot_us
+                if self.newest is None or key > self.newest:
+                    self.newest = key
+                    self._expire()
+                elif key <= self.newest - self.span:
+                    self.late += 1
+                    return
+        entry = self._slots.get(key)
+        if entry is None:
+            analyzers = create_analyzers(self.options)
+            entry = self._slots[key] = (analyzers, make_feeder(analyzers))
+        entry[1](convo)
 
-    return loops
+    def _expire(self) -> None:
+        cutoff = self.newest - self.span
+        for key in [k for k in self._slots if k is not None and k <= cutoff]:
+            del self._slots[key]
 
+    def report(self) -> dict:
+        """Merge the live slices, oldest first, into a report."""
+        merged = create_analyzers(self.options)
+        for key in sorted(self._slots, key=lambda k: (k is not None, k or 0)):
+            merge_analyzers(merged, self._slots[key][0])
+        report = build_report(merged)
+        if self.window_seconds:
+            end_us = (self.newest + 1) * self.slot_us if self.newest is not None else None
+            report["window"] = {
+                "seconds": self.window_seconds,
+                "start": _epoch_us_isoformat(end_us - self.span * self.slot_us) if end_us else None,
+                "end": _epoch_us_isoformat(end_us) if end_us else None,
+                "late_conversations": self.late,
+            }
+        return report
 
-def analyze_intent_accuracy(conversations: list[dict], top_n: int = 10) -> dict:
-    """Analyze intent recognition patterns."""
-    intent_counts = Counter()
-    low_confidence_intents = defaultdict(list)
-    fallback_count = 0
-    total_user_messages = 0
 
-    for convo in conversations:
-        for msg in convo.get("messages", []):
-            if msg.get("sender") != "user":
-                continue
+def _epoch_us_isoformat(epoch_us: int) -> str:
+    return (TimestampDecoder._EPOCH + timedelta(microseconds=epoch_us)).isoformat()
 
-            total_user_messages += 1
-            intent = msg.get("intent", "")
-            confidence = msg.get("intent_confidence", 0)
-
-            if intent:
-                intent_counts[intent] += 1
-                if confidence < 0.6:
-                    low_confidence_intents[intent].append(confidence)
-                if intent == "fallback":
-                    fallback_count += 1
-
-    low_conf_summary = {}
-    for intent, confidences in low_confidence_intents.items():
-        low_conf_summary[intent] = {
-            "count": len(confidences),
-            "avg_confidence": round(statistics.mean(confidences), 3),
-        }
 
-    return {
-        "total_user_messages": total_user_messages,
-        "intent_distribution": dict(intent_counts.most_common(top_n)),
-        "fallback_count": fallback_count,
-        "fallback_rate": round(fallback_count / total_user_messages, 4) if total_user_messages > 0 else 0,
-        "low_confidence_intents": dict(sorted(
-            low_conf_summary.items(),
-            key=lambda x: x[1]["count"],
-            reverse=True,
-        )[:top_n]),
-    }
+def follow(path: str, options: AnalysisOptions | None = None,
+           window_seconds: float | None = None, interval: float = 60.0,
+           emit=None) -> dict:
+    """Analyze a JSONL log as it grows, emitting a report every `interval` seconds.
 
+    Each line is decoded and analyzed exactly once. `emit` receives the
+    report whenever new conversations arrived since the previous one; a
+    final report is emitted and returned when stdin ends or on Ctrl-C.
+    Malformed lines are reported on stderr and skipped.
+    """
+    window = SlidingWindow(options, window_seconds)
+    emit = emit or (lambda report: None)
+    next_emit = time.monotonic() + interval
+    changed = False
+    line_no = 0
 
-def analyze_response_times(conversations: list[dict]) -> dict:
-    """Analyze bot response time performance."""
-    response_times = []
+    try:
+        for line in follow_lines(path, min(1.0, interval)):
+            if line is not None:
+                line_no += 1
+                try:
+                    for convo in decode_jsonl_lines([line], path, line_no):
+                        window.add(convo)
+                        changed = True
+                except ValueError as e:
+                    print(f"Warning: {e}", file=sys.stderr)
+            if time.monotonic() >= next_emit:
+                if changed:
+                    emit(window.report())
+                    changed = False
+                next_emit = time.monotonic() + interval
+    except KeyboardInterrupt:
+        pass
 
-    for convo in conversations:
-        for msg in convo.get("messages", []):
-            if msg.get("sender") == "bot" and msg.get("response_time_ms"):
-                response_times.append(msg["response_time_ms"])
-
-    if not response_times:
-        return {"total_responses": 0}
-
-    sorted_rt = sorted(response_times)
-    p50_idx = int(len(sorted_rt) * 0.50)
-    p95_idx = int(len(sorted_rt) * 0.95)
-    p99_idx = int(len(sorted_rt) * 0.99)
-
-    return {
-        "total_responses": len(response_times),
-        "avg_ms": round(statistics.mean(response_times), 1),
-        "median_ms": round(statistics.median(response_times), 1),
-        "p50_ms": sorted_rt[min(p50_idx, len(sorted_rt) - 1)],
-        "p95_ms": sorted_rt[min(p95_idx, len(sorted_rt) - 1)],
-        "p99_ms": sorted_rt[min(p99_idx, len(sorted_rt) - 1)],
-        "max_ms": sorted_rt[-1],
-        "min_ms": sorted_rt[0],
-    }
+    report = window.report()
+    if changed:
+        emit(report)
+    return report
 
 
-def analyze_traffic_patterns(conversations: list[dict]) -> dict:
-    """Analyze traffic volume patterns."""
-    hour_counts = Counter()
-    day_counts = Counter()
-    channel_counts = Counter()
-    daily_volumes = Counter()
+SESSION_COLUMNS = ("channel", "language", "started_at", "ended_at", "outcome", "satisfaction_score")
+MESSAGE_COLUMNS = ("timestamp", "sender", "text", "intent", "intent_confidence", "response_time_ms")
 
-    for convo in conversations:
-        channel_counts[convo.get("channel", "unknown")] += 1
 
-        if convo.get("started_at"):
-            try:
-                dt = datetime.fromisoformat(convo["started_at"])
-                hour_counts[dt.hour] += 1
-                day_counts[dt.strftime("%A")] += 1
-                daily_volumes[dt.strftime("%Y-%m-%d")] += 1
-            except (ValueError, TypeError):
-                pass
+def read_columnar(path: str, input_format: str) -> "pa.Table":
+    """Read a Parquet or Arrow IPC/Feather file into an Arrow table."""
+    if not HAS_PYARROW or not HAS_NUMPY:
+        print("Error: Parquet/Arrow input requires pyarrow and numpy. "
+              "Install with: pip install pyarrow numpy", file=sys.stderr)
+        sys.exit(1)
+    if not Path(path).exists():
+        print(f"Error: File not found: {path}", file=sys.stderr)
+        sys.exit(1)
+    if input_format == "parquet":
+        return pq.read_table(path)
+    return feather.read_table(path)
 
-    return {
-        "by_hour": dict(sorted(hour_counts.items())),
-        "by_day_of_week": dict(day_counts.most_common()),
-        "by_channel": dict(channel_counts.most_common()),
-        "daily_volumes": dict(sorted(daily_volumes.items())),
-        "peak_hour": hour_counts.most_common(1)[0][0] if hour_counts else None,
-        "busiest_day": day_counts.most_common(1)[0][0] if day_counts else None,
-        "avg_daily_volume": round(statistics.mean(daily_volumes.values()), 1) if daily_volumes else 0,
-    }
 
+def _pylist(array) -> list:
+    """Arrow values as Python objects, with timestamps as ISO-8601 strings."""
+    values = array.to_pylist()
+    if pa.types.is_timestamp(array.type) or pa.types.is_date(array.type):
+        values = [None if value is None else value.isoformat() for value in values]
+    return values
 
-def analyze_language(conversations: list[dict]) -> dict:
-    """Analyze language distribution in messages."""
-    import re
 
-    hebrew_msg_count = 0
-    english_msg_count = 0
-    mixed_msg_count = 0
-    total_user_messages = 0
+class ColumnarFrame:
+    """A flat messages table joined to one row of fields per conversation.
 
-    for convo in conversations:
-        for msg in convo.get("messages", []):
-            if msg.get("sender") != "user":
-                continue
+    Messages need `session_id` and `sender`; every other column is optional.
+    Conversation fields come from `sessions` when given. Otherwise they are
+    taken from the first message row of each session_id (in order of first
+    appearance), with started_at/ended_at defaulting to the first/last
+    message timestamp.
+    """
 
-            text = msg.get("text", "")
-            total_user_messages += 1
+    def __init__(self, messages: "pa.Table", sessions: "pa.Table | None" = None):
+        for column in ("session_id", "sender"):
+            if column not in messages.column_names:
+                raise ValueError(f"Messages table is missing the '{column}' column")
 
-            hebrew_chars = len(re.findall(r'[\u0590-\u05FF]', text))
-            english_chars = len(re.findall(r'[a-zA-Z]', text))
-            total_chars = hebrew_chars + english_chars
+        self.messages = messages
+        message_sessions = messages["session_id"].combine_chunks()
 
-            if total_chars == 0:
-                continue
+        if sessions is not None:
+            if "session_id" not in sessions.column_names:
+                raise ValueError("Sessions table is missing the 'session_id' column")
+            self.session_ids = sessions["session_id"].combine_chunks()
+            index = pc.index_in(message_sessions, value_set=self.session_ids)
+            self.msg_session = pc.fill_null(index, -1).to_numpy(zero_copy_only=False)
+            self.orphan_messages = int((self.msg_session < 0).sum())
+            self.fields = {
+                name: sessions[name].combine_chunks()
+                for name in SESSION_COLUMNS if name in sessions.column_names
+            }
+        else:
+            encoded = pc.dictionary_encode(message_sessions)
+            self.session_ids = encoded.dictionary
+            self.msg_session = encoded.indices.to_numpy(zero_copy_only=False)
+            self.orphan_messages = 0
+            codes = self.msg_session
+            first_rows = np.unique(codes, return_index=True)[1]
+            last_rows = len(codes) - 1 - np.unique(codes[::-1], return_index=True)[1]
+            self.fields = {
+                name: pc.take(messages[name], first_rows).combine_chunks()
+                for name in SESSION_COLUMNS if name in messages.column_names
+            }
+            if "timestamp" in messages.column_names:
+                self.fields.setdefault("started_at", pc.take(messages["timestamp"], first_rows).combine_chunks())
+                self.fields.setdefault("ended_at", pc.take(messages["timestamp"], last_rows).combine_chunks())
 
-            he_ratio = hebrew_chars / total_chars
+        self.n_sessions = len(self.session_ids)
+        sender = messages["sender"]
+        self.user_mask = pc.fill_null(pc.equal(sender, "user"), False)
+        self.bot_mask = pc.fill_null(pc.equal(sender, "bot"), False)
+        self._grouped_rows = None
 
-            if 0.2 < he_ratio < 0.8:
-                mixed_msg_count += 1
-            elif he_ratio >= 0.5:
-                hebrew_msg_count += 1
-            else:
-                english_msg_count += 1
-
-    return {
-        "total_user_messages": total_user_messages,
-        "hebrew_messages": hebrew_msg_count,
-        "english_messages": english_msg_count,
-        "mixed_messages": mixed_msg_count,
-        "mixed_rate": round(mixed_msg_count / total_user_messages, 4) if total_user_messages > 0 else 0,
-    }
+    def column(self, name: str) -> "pa.ChunkedArray":
+        """A messages column, or all nulls if the table lacks it."""
+        if name in self.messages.column_names:
+            return self.messages[name]
+        return pa.chunked_array([pa.nulls(self.messages.num_rows)])
+
+    def field(self, name: str) -> list:
+        """A conversation-level field as Python values, one per session."""
+        if name not in self.fields:
+            return [None] * self.n_sessions
+        return _pylist(self.fields[name])
+
+    def session_lengths(self) -> "np.ndarray":
+        codes = self.msg_session
+        return np.bincount(codes[codes >= 0], minlength=self.n_sessions)
+
+    def grouped_rows(self) -> "np.ndarray":
+        """Message row numbers grouped by session, keeping each session's order."""
+        if self._grouped_rows is None:
+            order = np.argsort(self.msg_session, kind="stable")
+            self._grouped_rows = order[self.msg_session[order] >= 0]
+        return self._grouped_rows
+
+    def last_row(self, mask) -> "np.ndarray":
+        """Per session, the last message row where `mask` is true (or -1)."""
+        rows = self.grouped_rows()
+        mask = np.asarray(pc.fill_null(mask, False).to_numpy(zero_copy_only=False))
+        rows = rows[mask[rows]]
+        sessions = self.msg_session[rows]
+        last = np.full(self.n_sessions, -1, dtype=np.int64)
+        if len(rows):
+            ends = np.flatnonzero(np.r_[sessions[1:] != sessions[:-1], True])
+            last[sessions[ends]] = rows[ends]
+        return last
+
+    def iter_conversations(self, message_columns: Iterable[str] = MESSAGE_COLUMNS,
+                           sessions: "np.ndarray | None" = None) -> Iterator[dict]:
+        """Rebuild conversation dicts, in session order, for row-wise analyzers.
+
+        `sessions` limits the rebuild to those (sorted) session positions.
+        Null message values are left out of the message dicts, as if the key
+        had been missing from a JSON log.
+        """
+        columns = [c for c in message_columns if c in self.messages.column_names]
+        lengths = self.session_lengths()
+        rows = self.grouped_rows()
+        if sessions is None:
+            sessions = np.arange(self.n_sessions)
+        else:
+            rows = rows[np.isin(self.msg_session[rows], sessions)]
+        ordered = self.messages.select(columns).take(rows)
+        rows = list(zip(*(_pylist(ordered[c].combine_chunks()) for c in columns)))
+        offsets = np.concatenate(([0], np.cumsum(lengths[sessions]))).tolist()
+
+        session_ids = pc.take(self.session_ids, sessions).to_pylist()
+        fields = {name: _pylist(pc.take(column, sessions)) for name, column in self.fields.items()}
+        for i, session_id in enumerate(session_ids):
+            convo = {"session_id": session_id}
+            for name, column in fields.items():
+                if column[i] is not None:
+                    convo[name] = column[i]
+            convo["messages"] = [
+                {name: value for name, value in zip(columns, row) if value is not None}
+                for row in rows[offsets[i]:offsets[i + 1]]
+            ]
+            yield convo
+
+
+def _value_counter(array) -> Counter:
+    """Counter of the non-null values of an Arrow array, in first-seen order."""
+    counts = pc.value_counts(pc.drop_null(array))
+    return Counter(dict(zip(
+        counts.field("values").to_pylist(),
+        counts.field("counts").to_pylist(),
+    )))
+
+
+def _fill_core_metrics(analyzer: CoreMetricsAnalyzer, frame: ColumnarFrame) -> None:
+    n = frame.n_sessions
+    analyzer.total = n
+    if "outcome" in frame.fields:
+        analyzer.outcomes = _value_counter(pc.fill_null(frame.fields["outcome"], "unknown"))
+    elif n:
+        analyzer.outcomes = Counter({"unknown": n})
+
+    lengths, counts = np.unique(frame.session_lengths(), return_counts=True)
+    analyzer.session_lengths = Counter(dict(zip(lengths.tolist(), counts.tolist())))
+
+    for started_at, ended_at in zip(frame.field("started_at"), frame.field("ended_at")):
+        duration = duration_seconds(started_at, ended_at)
+        if duration is not None:
+            analyzer.session_durations[duration] += 1
+
+    if "satisfaction_score" in frame.fields:
+        for score, count in _value_counter(frame.fields["satisfaction_score"]).items():
+            analyzer.csat_total.add(score, count)
+            analyzer.csat_count += count
+
+
+def _fill_drop_offs(analyzer: DropOffAnalyzer, frame: ColumnarFrame) -> None:
+    if "outcome" not in frame.fields:
+        return
+    abandoned = np.flatnonzero(
+        pc.fill_null(pc.equal(frame.fields["outcome"], "abandoned"), False).to_numpy(zero_copy_only=False)
+    )
+    analyzer.abandoned_count = len(abandoned)
+
+    lengths = frame.session_lengths()
+    abandoned = abandoned[lengths[abandoned] > 0]
+    intents = frame.column("intent")
+    real_intent = pc.and_(pc.not_equal(intents, ""), pc.not_equal(intents, "fallback"))
+    last_bot = frame.last_row(frame.bot_mask)[abandoned]
+    last_intent = frame.last_row(real_intent)[abandoned]
+
+    texts = _pylist(pc.take(frame.column("text"), last_bot[last_bot >= 0]).combine_chunks())
+    names = _pylist(pc.take(intents, last_intent[last_intent >= 0]).combine_chunks())
+    texts.reverse()
+    names.reverse()
+    for depth, bot_row, intent_row in zip(lengths[abandoned].tolist(), last_bot.tolist(), last_intent.tolist()):
+        analyzer.by_depth[depth] += 1
+        if bot_row >= 0:
+            analyzer.by_last_bot_msg[(texts.pop() or "")[:100]] += 1
+        if intent_row >= 0:
+            analyzer.by_intent[names.pop()] += 1
+
+
+def _fill_loops(analyzer: LoopAnalyzer, frame: ColumnarFrame) -> None:
+    # Flagging a p-message cycle takes at least p * (threshold - 1) bot
+    # replies equal to the one p positions before them, so only sessions
+    # with that many for some p are rebuilt and fed to the row-wise detector.
+    rows = frame.grouped_rows()
+    bot = frame.bot_mask.to_numpy(zero_copy_only=False)
+    rows = rows[bot[rows]]
+    if len(rows) < 2:
+        return
+    texts = pc.dictionary_encode(pc.fill_null(pc.take(frame.column("text"), rows), "").combine_chunks())
+    codes = texts.indices.to_numpy(zero_copy_only=False)
+    sessions = frame.msg_session[rows]
+    is_candidate = np.zeros(frame.n_sessions, dtype=bool)
+    for period in range(1, min(analyzer.max_period, len(rows) - 1) + 1):
+        repeats = (sessions[period:] == sessions[:-period]) & (codes[period:] == codes[:-period])
+        per_session = np.bincount(sessions[period:][repeats], minlength=frame.n_sessions)
+        is_candidate |= per_session >= max(period * (analyzer.threshold - 1), 1)
+    candidates = np.flatnonzero(is_candidate)
+    if len(candidates):
+        run_analyzers(frame.iter_conversations(("sender", "text"), candidates), [analyzer])
+
+
+def _fill_intents(analyzer: IntentAnalyzer, frame: ColumnarFrame) -> None:
+    intents = pc.filter(frame.column("intent"), frame.user_mask)
+    confidences = pc.fill_null(pc.filter(frame.column("intent_confidence"), frame.user_mask), 0)
+    analyzer.total_user_messages = len(intents)
+
+    has_intent = pc.fill_null(pc.not_equal(intents, ""), False)
+    intents = pc.filter(intents, has_intent)
+    confidences = pc.filter(confidences, has_intent)
+    counts = _value_counter(intents)
+    analyzer.intent_counts.update(counts)
+    analyzer.fallback_count = counts.get("fallback", 0)
+
+    low = pc.less(confidences, 0.6)
+    grouped = pa.table({
+        "intent": pc.filter(intents, low),
+        "confidence": pc.filter(confidences, low),
+    }).group_by(["intent", "confidence"], use_threads=False).aggregate([("intent", "count")])
+    for intent, confidence, count in zip(
+        grouped["intent"].to_pylist(),
+        grouped["confidence"].to_pylist(),
+        grouped["intent_count"].to_pylist(),
+    ):
+        stats = analyzer.low_confidence.get(intent)
+        if stats is None:
+            stats = analyzer.low_confidence[intent] = [0, ExactSum()]
+        stats[0] += count
+        stats[1].add(confidence, count)
+        if analyzer.low_confidence_ranks is not None:
+            analyzer.low_confidence_ranks[intent] += count
+
+
+def _fill_response_times(analyzer: ResponseTimeAnalyzer, frame: ColumnarFrame) -> None:
+    times = pc.drop_null(pc.filter(frame.column("response_time_ms"), frame.bot_mask))
+    times = pc.filter(times, pc.not_equal(times, 0))
+    for value, count in _value_counter(times).items():
+        if analyzer.sketch is not None:
+            analyzer.sketch.add(value, count)
+        else:
+            analyzer.response_times[value] += count
+
+
+def _fill_traffic(analyzer: TrafficAnalyzer, frame: ColumnarFrame) -> None:
+    if "channel" in frame.fields:
+        analyzer.channel_counts = _value_counter(pc.fill_null(frame.fields["channel"], "unknown"))
+    elif frame.n_sessions:
+        analyzer.channel_counts = Counter({"unknown": frame.n_sessions})
+
+    series = analyzer.series if isinstance(analyzer, TrafficSeriesAnalyzer) else None
+    outcomes = frame.field("outcome") if series is not None else None
+    buckets = []
+    for session, started_at in enumerate(frame.field("started_at")):
+        started = decode_timestamp(started_at)
+        bucket = None
+        if started is not None:
+            analyzer.hour_counts[started.hour] += 1
+            analyzer.day_counts[started.weekday] += 1
+            analyzer.daily_volumes[started.date] += 1
+            if series is not None:
+                series.add_conversation(started.epoch_us, outcomes[session] == "resolved")
+                bucket = started.epoch_us // series.bucket_us
+        buckets.append(bucket)
+    if series is None:
+        return
+
+    # Latencies go in after every conversation, so skip those whose bucket
+    # has since been recycled, as the row-wise pass would have dropped them.
+    bot_rows = np.flatnonzero(frame.bot_mask.to_numpy(zero_copy_only=False))
+    times = frame.column("response_time_ms").take(bot_rows).to_pylist()
+    for session, response_time in zip(frame.msg_session[bot_rows].tolist(), times):
+        if session < 0 or not response_time or not isinstance(response_time, (int, float)) or response_time <= 0:
+            continue
+        bucket = buckets[session]
+        if bucket is not None and series.buckets[bucket % series.capacity] == bucket:
+            series.add_latency(bucket % series.capacity, response_time)
+
+
+def _fill_language(analyzer: LanguageAnalyzer, frame: ColumnarFrame) -> None:
+    texts = pc.fill_null(pc.filter(frame.column("text"), frame.user_mask), "")
+    analyzer.total_user_messages = len(texts)
+    if not len(texts):
+        return
+
+    counts = np.array(count_scripts_batch(texts.to_pylist()), dtype=np.int64).reshape(-1, 2)
+    hebrew, english = counts[:, 0], counts[:, 1]
+    total = hebrew + english
+    has_letters = total > 0
+    ratio = np.divide(hebrew, total, out=np.zeros(len(total)), where=has_letters)
+    mixed = has_letters & (ratio > 0.2) & (ratio < 0.8)
+    mostly_hebrew = has_letters & ~mixed & (ratio >= 0.5)
+
+    analyzer.mixed_msg_count = int(mixed.sum())
+    analyzer.hebrew_msg_count = int(mostly_hebrew.sum())
+    analyzer.english_msg_count = int((has_letters & ~mixed & ~mostly_hebrew).sum())
+
+
+COLUMNAR_FILLERS = {
+    "core_metrics": _fill_core_metrics,
+    "drop_off_analysis": _fill_drop_offs,
+    "conversation_loops": _fill_loops,
+    "intent_analysis": _fill_intents,
+    "response_times": _fill_response_times,
+    "traffic_patterns": _fill_traffic,
+    "language_analysis": _fill_language,
+}
+
+
+def analyze_columnar(messages: "pa.Table", sessions: "pa.Table | None" = None,
+                     options: AnalysisOptions | None = None) -> dict:
+    """Produce the full report from a flat messages table.
+
+    Sections in COLUMNAR_FILLERS are filled with Arrow/NumPy group-bys
+    straight into their analyzer's state, then finished by the same result()
+    code as the row-wise path. Loop detection pre-filters sessions with
+    vectorized duplicate detection and runs row-wise on the few candidates.
+    Any other analyzer runs row-wise over rebuilt conversations.
+    """
+    frame = ColumnarFrame(messages, sessions)
+    if frame.orphan_messages:
+        print(f"Skipped {frame.orphan_messages:,} messages whose session_id is not in the sessions table.",
+              file=sys.stderr)
+
+    analyzers = create_analyzers(options)
+    row_wise = []
+    for analyzer in analyzers:
+        filler = COLUMNAR_FILLERS.get(analyzer.section)
+        if filler:
+            filler(analyzer, frame)
+        else:
+            row_wise.append(analyzer)
+
+    if row_wise:
+        run_analyzers(frame.iter_conversations(), row_wise)
+    return build_report(analyzers)
+
+
+def _max_rss_bytes() -> int | None:
+    """The process's peak resident set size so far, where the OS reports it."""
+    if not HAS_RESOURCE:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+class StageProfiler:
+    """Wall time, CPU time, throughput and memory peaks per pipeline stage.
+
+    Every stage records the process's peak RSS when it finished, which is
+    free to read. With `trace_allocations`, tracemalloc also measures the
+    peak of Python allocations made during each stage; tracing slows Python
+    code down several times, so those runs' timings are not comparable
+    with untraced ones.
+    """
+
+    def __init__(self, trace_allocations: bool = False):
+        self.trace_allocations = trace_allocations
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str, messages: int | None = None):
+        """Time the body of a `with` block as one stage.
+
+        The yielded dict is the stage's record; set "messages" on it when
+        the count is only known once the stage has run.
+        """
+        record = {"stage": name}
+        if messages is not None:
+            record["messages"] = messages
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+        started_wall = time.perf_counter()
+        started_cpu = time.process_time()
+        yield record
+        record["wall_seconds"] = round(time.perf_counter() - started_wall, 6)
+        record["cpu_seconds"] = round(time.process_time() - started_cpu, 6)
+        if record.get("messages") and record["wall_seconds"] > 0:
+            record["messages_per_second"] = round(record["messages"] / record["wall_seconds"])
+        if self.trace_allocations:
+            record["peak_alloc_bytes"] = tracemalloc.get_traced_memory()[1] - baseline
+        max_rss = _max_rss_bytes()
+        if max_rss is not None:
+            record["max_rss_bytes"] = max_rss
+        self.stages.append(record)
+
+    def result(self) -> dict:
+        return {
+            "stages": self.stages,
+            "total_wall_seconds": round(sum(s["wall_seconds"] for s in self.stages), 6),
+            "total_cpu_seconds": round(sum(s["cpu_seconds"] for s in self.stages), 6),
+            "allocations_traced": self.trace_allocations,
+        }
+
+
+def profile_analysis(paths: list[str], input_format: str, options: AnalysisOptions,
+                     profiler: StageProfiler, sessions: str | None = None,
+                     cache: ConversationCache | None = None) -> dict:
+    """Produce the full report with every stage timed separately.
+
+    Instead of the usual single fused pass, the input is loaded into memory
+    first ("load") and each analyzer then walks it on its own
+    ("analyze:<section>", the work of the matching analyze_* function), so
+    a slow stage shows up under its own name. Columnar input is timed as
+    it is normally run: vectorized fillers where there is one.
+    """
+    if len(paths) == 1 and input_format in COLUMNAR_FORMATS:
+        with profiler.stage("load") as record:
+            messages = read_columnar(paths[0], input_format)
+            sessions_table = None
+            if sessions:
+                sessions_format = COLUMNAR_SUFFIXES.get(Path(sessions).suffix.lower(), "parquet")
+                sessions_table = read_columnar(sessions, sessions_format)
+            frame = ColumnarFrame(messages, sessions_table)
+            record["messages"] = messages.num_rows
+        message_count = record["messages"]
+        analyzers = create_analyzers(options)
+        for analyzer in analyzers:
+            with profiler.stage(f"analyze:{analyzer.section}", message_count):
+                filler = COLUMNAR_FILLERS.get(analyzer.section)
+                if filler:
+                    filler(analyzer, frame)
+                else:
+                    run_analyzers(frame.iter_conversations(), [analyzer])
+        return _profile_results(analyzers, profiler)
+
+    with profiler.stage("load") as record:
+        conversations = [
+            convo for path in paths for convo in iter_input(path, input_format, cache)
+        ]
+        record["messages"] = sum(len(c.get("messages") or ()) for c in conversations)
+    message_count = record["messages"]
+    analyzers = create_analyzers(options)
+    for analyzer in analyzers:
+        with profiler.stage(f"analyze:{analyzer.section}", message_count):
+            run_analyzers(conversations, [analyzer])
+    return _profile_results(analyzers, profiler)
+
+
+def _profile_results(analyzers: list[Analyzer], profiler: StageProfiler) -> dict:
+    report = {}
+    for analyzer in analyzers:
+        with profiler.stage(f"result:{analyzer.section}"):
+            report[analyzer.section] = analyzer.result()
+    for fmt in ("json", "markdown", "summary"):
+        with profiler.stage(f"format:{fmt}"):
+            format_report(report, fmt)
+    return report
 
 
 def format_summary(report: dict) -> str:
@@ -439,6 +3798,17 @@ def format_summary(report: dict) -> str:
         lines.append("Channel distribution:")
         for channel, count in traffic["by_channel"].items():
             lines.append(f"  {channel}: {count:,}")
+    series = traffic.get("time_series")
+    if series and series["start"]:
+        volumes = series["conversations"]
+        peak = max(range(len(volumes)), key=volumes.__getitem__)
+        lines.append(f"Time series:     {len(volumes):,} buckets of {series['bucket_seconds']:g}s "
+                     f"from {series['start'][0]}")
+        lines.append(f"Peak bucket:     {series['start'][peak]} ({volumes[peak]:,} conversations)")
+        latencies = [(p95, i) for i, p95 in enumerate(series["p95_response_ms"]) if p95 is not None]
+        if latencies:
+            p95, slowest = max(latencies)
+            lines.append(f"Slowest bucket:  {series['start'][slowest]} (P95 {p95:.0f}ms)")
 
     lang = report["language_analysis"]
     if lang["total_user_messages"] > 0:
@@ -447,6 +3817,32 @@ def format_summary(report: dict) -> str:
         lines.append(f"English messages: {lang['english_messages']:,}")
         lines.append(f"Mixed messages:   {lang['mixed_messages']:,} ({lang['mixed_rate']:.1%})")
 
+    for dimension, segments in report.get("segments", {}).items():
+        lines.append(f"\n--- By {dimension.title()} ---")
+        for key, segment in segments.items():
+            core = segment["core_metrics"]
+            line = (f"  {key:<16} {core['total_conversations']:>9,} conversations  "
+                    f"{core['resolution_rate']:>6.1%} resolved  "
+                    f"{segment['intent_analysis']['fallback_rate']:>6.1%} fallback")
+            if segment["response_times"].get("total_responses", 0) > 0:
+                line += f"  P95 {segment['response_times']['p95_ms']:.0f}ms"
+            lines.append(line)
+
+    profile = report.get("profile")
+    if profile:
+        lines.append(f"\n--- Profile ---")
+        for stage in profile["stages"]:
+            line = f"  {stage['stage']:<32} {stage['wall_seconds']:>9.3f}s wall {stage['cpu_seconds']:>9.3f}s cpu"
+            if "messages_per_second" in stage:
+                line += f" {stage['messages_per_second']:>12,} msg/s"
+            if "peak_alloc_bytes" in stage:
+                line += f" {stage['peak_alloc_bytes'] / 2**20:>9.1f} MiB alloc"
+            if "max_rss_bytes" in stage:
+                line += f" {stage['max_rss_bytes'] / 2**20:>9.1f} MiB rss"
+            lines.append(line)
+        lines.append(f"  {'total':<32} {profile['total_wall_seconds']:>9.3f}s wall "
+                     f"{profile['total_cpu_seconds']:>9.3f}s cpu")
+
     lines.append("\n" + "=" * 60)
     return "\n".join(lines)
 
@@ -513,37 +3909,184 @@ def format_markdown(report: dict) -> str:
         lines.append(f"| P95 | {perf['p95_ms']:.0f}ms |")
         lines.append(f"| P99 | {perf['p99_ms']:.0f}ms |")
 
+    series = report["traffic_patterns"].get("time_series")
+    if series and series["start"]:
+        lines.append(f"\n## Time Series\n")
+        lines.append(f"{len(series['start']):,} buckets of {series['bucket_seconds']:g}s; "
+                     "busiest buckets:\n")
+        lines.append("| Bucket start | Conversations | Resolution | P95 |")
+        lines.append("|--------------|---------------|------------|-----|")
+        volumes = series["conversations"]
+        for i in sorted(range(len(volumes)), key=volumes.__getitem__, reverse=True)[:10]:
+            p95 = series["p95_response_ms"][i]
+            lines.append(f"| {series['start'][i]} | {volumes[i]:,} | "
+                         f"{series['resolution_rate'][i]:.1%} | {f'{p95:.0f}ms' if p95 is not None else '-'} |")
+
+    for dimension, segments in report.get("segments", {}).items():
+        lines.append(f"\n## By {dimension.title()}\n")
+        lines.append(f"| {dimension.title()} | Conversations | Resolution | Abandonment | Fallback | P95 |")
+        lines.append("|---|---|---|---|---|---|")
+        for key, segment in segments.items():
+            core = segment["core_metrics"]
+            perf = segment["response_times"]
+            p95 = f"{perf['p95_ms']:.0f}ms" if perf.get("total_responses", 0) > 0 else "-"
+            lines.append(f"| {key} | {core['total_conversations']:,} | {core['resolution_rate']:.1%} | "
+                         f"{core['abandonment_rate']:.1%} | "
+                         f"{segment['intent_analysis']['fallback_rate']:.1%} | {p95} |")
+
+    profile = report.get("profile")
+    if profile:
+        lines.append(f"\n## Profile\n")
+        lines.append("| Stage | Wall (s) | CPU (s) | Messages/s | Peak alloc (MiB) | Max RSS (MiB) |")
+        lines.append("|-------|----------|---------|------------|------------------|---------------|")
+        for stage in profile["stages"]:
+            rate = f"{stage['messages_per_second']:,}" if "messages_per_second" in stage else "-"
+            peak = f"{stage['peak_alloc_bytes'] / 2**20:.1f}" if "peak_alloc_bytes" in stage else "-"
+            rss = f"{stage['max_rss_bytes'] / 2**20:.1f}" if "max_rss_bytes" in stage else "-"
+            lines.append(f"| {stage['stage']} | {stage['wall_seconds']:.3f} | "
+                         f"{stage['cpu_seconds']:.3f} | {rate} | {peak} | {rss} |")
+
     return "\n".join(lines)
 
 
+def format_report(report: dict, fmt: str) -> str:
+    """Render a report in one of the --format styles."""
+    if fmt == "json":
+        return json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if fmt == "markdown":
+        return format_markdown(report)
+    return format_summary(report)
+
+
+def emit_report(report: dict, fmt: str, output: str | None = None) -> None:
+    """Publish a --follow report update.
+
+    Files are replaced atomically, so readers never see a partial report;
+    stdout gets each update in turn.
+    """
+    total = report["core_metrics"]["total_conversations"]
+    text = format_report(report, fmt)
+    if output:
+        tmp_path = f"{output}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, output)
+    else:
+        print(text, flush=True)
+    print(f"[{datetime.now():%H:%M:%S}] Report updated: {total:,} conversations.", file=sys.stderr)
+
+
 def main():
     args = parse_args()
 
-    conversations = load_conversations(args.input)
-
-    if not conversations:
-        print("No conversations found in input file.", file=sys.stderr)
+    options = AnalysisOptions.from_args(args)
+    cache = ConversationCache(args.cache_dir) if args.cache_dir else None
+    paths = expand_inputs(args.input) if args.input and args.input != "-" else [args.input]
+    if len(paths) > 1 and (args.follow or args.sessions):
+        print("Error: --follow and --sessions need a single --input file", file=sys.stderr)
         sys.exit(1)
 
-    print(f"Analyzing {len(conversations)} conversations...", file=sys.stderr)
+    if args.follow:
+        if args.input != "-" and not Path(args.input).exists():
+            print(f"Error: File not found: {args.input}", file=sys.stderr)
+            sys.exit(1)
+        print(f"Following {args.input}; press Ctrl-C to stop.", file=sys.stderr)
+        follow(args.input, options, args.window, args.emit_interval,
+               emit=partial(emit_report, fmt=args.format, output=args.output))
+        return
 
-    report = {
-        "core_metrics": compute_core_metrics(conversations),
-        "drop_off_analysis": analyze_drop_offs(conversations, args.top_n),
-        "conversation_loops": detect_loops(conversations, args.loop_threshold),
-        "intent_analysis": analyze_intent_accuracy(conversations, args.top_n),
-        "response_times": analyze_response_times(conversations),
-        "traffic_patterns": analyze_traffic_patterns(conversations),
-        "language_analysis": analyze_language(conversations),
-    }
+    if len(paths) == 1 and args.input and args.input_format == "auto" and Path(args.input).exists():
+        args.input_format = detect_input_format(args.input)
+    if args.sessions and args.input_format not in COLUMNAR_FORMATS:
+        print("Error: --sessions requires Parquet or Arrow --input", file=sys.stderr)
+        sys.exit(1)
 
-    if args.format == "json":
-        output = json.dumps(report, indent=2, ensure_ascii=False, default=str)
-    elif args.format == "markdown":
-        output = format_markdown(report)
+    if args.profile:
+        print(f"Profiling analysis of {args.input}...", file=sys.stderr)
+        profiler = StageProfiler(args.trace_allocations)
+        stats = cProfile.Profile() if args.profile_stats else None
+        if profiler.trace_allocations:
+            tracemalloc.start()
+        if stats:
+            stats.enable()
+        try:
+            report = profile_analysis(paths, args.input_format, options, profiler,
+                                      args.sessions, cache)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        finally:
+            if stats:
+                stats.disable()
+            if profiler.trace_allocations:
+                tracemalloc.stop()
+        report["profile"] = profiler.result()
+        if stats:
+            stats.dump_stats(args.profile_stats)
+            print(f"cProfile statistics written to {args.profile_stats}", file=sys.stderr)
+    elif args.rollup_dir:
+        if args.input:
+            print(f"Analyzing conversations from {args.input}...", file=sys.stderr)
+        conversations = chain.from_iterable(
+            iter_input(path, args.input_format, cache) for path in paths
+        ) if args.input else ()
+        try:
+            report = analyze_with_rollups(
+                conversations,
+                args.rollup_dir,
+                options,
+                args.since,
+                args.until,
+                args.rebuild,
+            )
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif len(paths) > 1:
+        print(f"Analyzing conversations from {len(paths)} files matching {args.input}...",
+              file=sys.stderr)
+        report = analyze_files(paths, args.input_format, options, args.io_threads,
+                               args.workers, cache)
+    elif args.input_format in COLUMNAR_FORMATS and args.workers == 1:
+        print(f"Analyzing columnar messages from {args.input}...", file=sys.stderr)
+        messages = read_columnar(args.input, args.input_format)
+        sessions = None
+        if args.sessions:
+            sessions_format = COLUMNAR_SUFFIXES.get(Path(args.sessions).suffix.lower(), "parquet")
+            sessions = read_columnar(args.sessions, sessions_format)
+        try:
+            report = analyze_columnar(messages, sessions, options)
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+    elif args.workers == 1 and cache is not None:
+        print(f"Analyzing conversations from {args.input}...", file=sys.stderr)
+        report = build_report(analyze_cached(args.input, args.input_format, options, cache))
+    elif args.workers == 1:
+        print(f"Analyzing conversations from {args.input}...", file=sys.stderr)
+        report = analyze_conversations(
+            iter_conversations(args.input, args.input_format),
+            options,
+        )
     else:
-        output = format_summary(report)
+        print(f"Analyzing conversations from {args.input}...", file=sys.stderr)
+        report = analyze_parallel(
+            args.input,
+            args.input_format,
+            options,
+            args.workers,
+            args.chunk_size,
+            cache,
+        )
+
+    total = report["core_metrics"]["total_conversations"]
+    if not total:
+        print("No conversations found in input file.", file=sys.stderr)
+        sys.exit(1)
+
+    print(f"Analyzed {total:,} conversations.", file=sys.stderr)
 
+    output = format_report(report, args.format)
     if args.output:
         output_path = Path(args.output)
         with open(output_path, "w", encoding="utf-8") as f:
@@ -0,0 +1,116 @@
+"""Tests for conversation-analyzer.py (run with python -m unittest or pytest)."""
+
+import contextlib
+import importlib.util
+import io
+import json
+import unittest
+from pathlib import Path
+
+ANALYZER_PATH = Path(__file__).resolve().parent.parent / "scripts" / "conversation-analyzer.py"
+
+
+def load_analyzer():
+    """Import conversation-analyzer.py, whose file name is not a module name."""
+    spec = importlib.util.spec_from_file_location("conversation_analyzer", ANALYZER_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+ca = load_analyzer()
+
+
+def conversation(index: int, channel: str) -> dict:
+    started = f"2026-03-01T10:{index % 60:02d}:00+02:00"
+    return {
+        "session_id": f"s-{index}",
+        "channel": channel,
+        "started_at": started,
+        "outcome": "resolved" if index % 3 else "escalated",
+        "messages": [
+            {"sender": "user", "text": "where is my order", "intent": "order_status",
+             "intent_confidence": 0.9, "timestamp": started},
+            {"sender": "bot", "text": "Let me check that for you.", "response_time_ms": 400 + index,
+             "timestamp": started},
+        ],
+    }
+
+
+class SlidingWindowSegmentTest(unittest.TestCase):
+    def test_repeated_reports_keep_segment_totals(self):
+        window = ca.SlidingWindow(ca.AnalysisOptions(group_by=("channel",)), window_seconds=3600, slots=6)
+        for i in range(40):
+            window.add(conversation(i, "whatsapp" if i % 2 else "web"))
+
+        def segment_totals(report):
+            return {key: segment["core_metrics"]["total_conversations"]
+                    for key, segment in report["segments"]["channel"].items()}
+
+        first = window.report()
+        self.assertEqual(first["core_metrics"]["total_conversations"], 40)
+        self.assertEqual(segment_totals(first), {"web": 20, "whatsapp": 20})
+        for _ in range(3):
+            report = window.report()
+            self.assertEqual(report["core_metrics"]["total_conversations"], 40)
+            self.assertEqual(segment_totals(report), segment_totals(first))
+
+
+class JsonArrayStreamTest(unittest.TestCase):
+    def decode(self, text: str, chunk_size: int):
+        stream = io.StringIO(text)
+        stderr = io.StringIO()
+        original = ca.READ_CHUNK_SIZE
+        ca.READ_CHUNK_SIZE = chunk_size
+        try:
+            with contextlib.redirect_stderr(stderr), self.assertRaises(SystemExit):
+                list(ca._iter_json_array(stream, "input.json"))
+        finally:
+            ca.READ_CHUNK_SIZE = original
+        return stream.tell(), stderr.getvalue()
+
+    def test_elements_split_across_reads(self):
+        data = [conversation(i, "web") for i in range(5)]
+        data[2]["flags"] = [True, False, None, -1.5e-7, "x\U0001f600\u05d0y"]
+        text = json.dumps(data)
+        original = ca.READ_CHUNK_SIZE
+        try:
+            for chunk_size in (1, 3, 7, 64):
+                ca.READ_CHUNK_SIZE = chunk_size
+                self.assertEqual(list(ca._iter_json_array(io.StringIO(text), "input.json")), data)
+        finally:
+            ca.READ_CHUNK_SIZE = original
+
+    def test_truncated_element_is_an_error(self):
+        text = json.dumps([conversation(0, "web"), conversation(1, "web")])[:-40]
+        _, error = self.decode(text, 16)
+        self.assertIn("Invalid JSON in input.json", error)
+
+    def test_malformed_element_is_reported_without_reading_on(self):
+        rest = ",".join(json.dumps(conversation(i, "web")) for i in range(2000))
+        text = f'[{{"session_id": "s-bad", "outcome": , "messages": []}},{rest}]'
+        consumed, error = self.decode(text, 1024)
+        self.assertIn("Expecting value", error)
+        self.assertLessEqual(consumed, 1024)
+
+
+class HeavyHittersTest(unittest.TestCase):
+    def test_reading_absent_keys_changes_nothing(self):
+        hitters = ca.HeavyHitters(2)
+        for i in range(20):
+            hitters[f"k{i % 7}"] += i
+        before = (dict(hitters), dict(hitters.errors), hitters.floor)
+        for key in ("k0", "absent", "k99"):
+            hitters[key]
+        self.assertEqual((dict(hitters), dict(hitters.errors), hitters.floor), before)
+        self.assertLessEqual(set(hitters.errors), set(hitters))
+
+    def test_update_accepts_counter_forms(self):
+        hitters = ca.HeavyHitters(10)
+        hitters.update(["a", "b", "a"])
+        hitters.update({"c": 2}, d=3)
+        self.assertEqual(dict(hitters), {"a": 2, "b": 1, "c": 2, "d": 3})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""Benchmark validate_phone.py and catch throughput regressions.
+
+Generates a reproducible list of Israeli phone numbers in mixed formats
+(spaces, dashes, parentheses, +972/972 prefixes and invalid noise), then
+times clean_number, validate and to_international one number at a time
+and validate_batch at each batch size, reporting numbers/second. Results
+can be stored as a baseline; later runs compared against it exit with
+status 1 if any case got slower than the allowed threshold.
+
+Usage:
+    python benchmark_phone.py
+    python benchmark_phone.py --count 200k --batch-sizes 1,256,16384
+    python benchmark_phone.py --save-baseline
+    python benchmark_phone.py --threshold 0.15
+    python benchmark_phone.py --baseline ci-baseline.json --format json
+    python benchmark_phone.py --generate phones.txt --count 1M
+    python benchmark_phone.py --help
+
+Without --baseline, results are compared with benchmark_baseline.json next
+to this script when it exists. Baselines are machine-specific: save one on
+the machine that runs the comparison.
+"""
+
+import argparse
+import importlib.util
+import json
+import platform
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+VALIDATOR_PATH = Path(__file__).with_name("validate_phone.py")
+DEFAULT_BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+
+# Per-number cases call one public function for every input.
+FUNCTION_CASES = ("clean_number", "validate", "to_international")
+BATCH_CASE = "validate_batch"
+CASES = (*FUNCTION_CASES, BATCH_CASE)
+SCALE_UNITS = {"": 1, "k": 1_000, "m": 1_000_000}
+
+# (leading digits, digits that follow) for each valid number shape.
+VALID_SHAPES = (
+    *((f"05{d}", 7) for d in "012345678"),
+    *((f"0{d}", 7) for d in "23489"),
+    *((f"07{d}", 7) for d in "234567"),
+    ("1800", 6),
+    ("1700", 6),
+)
+MOBILE_WEIGHT = 0.6  # share of valid numbers that are mobiles, as in CRM data
+STAR_LENGTHS = (4, 5, 6)
+# Run settings a baseline must share for its throughput to be comparable.
+COMPARED_INPUTS = ("count", "invalid_ratio", "seed", "cache_size")
+
+
+def load_validator():
+    """Import validate_phone.py from next to this script."""
+    spec = importlib.util.spec_from_file_location("validate_phone", VALIDATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Benchmark validate_phone.py and check for throughput regressions.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  %(prog)s --save-baseline
+  %(prog)s --threshold 0.2
+  %(prog)s --count 1M --batch-sizes 1024,16384,65536 --format json
+
+Exit status is 1 when a case is slower than the baseline by more than --threshold.
+        """,
+    )
+    parser.add_argument(
+        "--count",
+        type=_scale,
+        default=_scale("100k"),
+        help="Numbers generated and timed per case (default: 100k)",
+    )
+    parser.add_argument(
+        "--cases",
+        type=_case_list,
+        default=list(CASES),
+        help=f"Comma-separated cases to run (default: all of {', '.join(CASES)})",
+    )
+    parser.add_argument(
+        "--batch-sizes",
+        type=_size_list,
+        default=_size_list("1,256,16384"),
+        help="Comma-separated validate_batch chunk sizes (default: 1,256,16384)",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Runs per case; the fastest is reported (default: 5)",
+    )
+    parser.add_argument(
+        "--invalid-ratio",
+        type=float,
+        default=0.15,
+        help="Share of generated inputs that are invalid noise (default: 0.15)",
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=42,
+        help="Random seed for the generator (default: 42)",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=0,
+        help="validate_phone LRU cache size while timing; 0 times the uncached "
+             "path (default: 0)",
+    )
+    parser.add_argument(
+        "--no-numpy",
+        action="store_true",
+        help="Time the pure-Python batch path even when NumPy is installed",
+    )
+    parser.add_argument(
+        "--baseline",
+        default=None,
+        help=f"Baseline results to compare against (default: {DEFAULT_BASELINE.name} if present)",
+    )
+    parser.add_argument(
+        "--save-baseline",
+        nargs="?",
+        const=str(DEFAULT_BASELINE),
+        metavar="PATH",
+        help=f"Store these results as the baseline (default path: {DEFAULT_BASELINE.name})",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed throughput drop against the baseline, as a fraction (default: 0.25)",
+    )
+    parser.add_argument(
+        "--generate",
+        metavar="PATH",
+        default=None,
+        help="Only write --count generated numbers to PATH, one per line",
+    )
+    parser.add_argument(
+        "--format", "-f",
+        choices=["summary", "json"],
+        default="summary",
+        help="Output format (default: summary)",
+    )
+    parser.add_argument(
+        "--output", "-o",
+        default=None,
+        help="Path to write the results (default: stdout)",
+    )
+    args = parser.parse_args()
+
+    if args.count < 1:
+        parser.error("--count must be at least 1")
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    if not 0 <= args.invalid_ratio <= 1:
+        parser.error("--invalid-ratio must be between 0 and 1")
+    if not 0 <= args.threshold < 1:
+        parser.error("--threshold must be at least 0 and below 1")
+    if args.cache_size < 0:
+        parser.error("--cache-size must be >= 0")
+    return args
+
+
+def _scale(value: str) -> int:
+    value = value.strip().lower()
+    try:
+        return int(float(value[:-1] if value[-1:] in SCALE_UNITS else value)
+                   * SCALE_UNITS.get(value[-1:], 1))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid size {value!r}, expected e.g. 10k or 1M") from None
+
+
+def _size_list(value: str) -> list[int]:
+    sizes = [_scale(part) for part in value.split(",") if part.strip()]
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("batch sizes must be at least 1")
+    return sizes
+
+
+def _case_list(value: str) -> list[str]:
+    cases = [part.strip() for part in value.split(",") if part.strip()]
+    unknown = [case for case in cases if case not in CASES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown case(s): {', '.join(unknown)}")
+    return cases
+
+
+def _digits(rng: random.Random, count: int) -> str:
+    return "".join(rng.choice("0123456789") for _ in range(count))
+
+
+def _format_valid(rng: random.Random, prefix: str, rest: str) -> str:
+    """One valid number written the way people type it."""
+    if prefix.startswith("1"):
+        return rng.choice((
+            f"{prefix}{rest}",
+            f"{prefix}-{rest[:3]}-{rest[3:]}",
+            f"{prefix} {rest[:3]} {rest[3:]}",
+            f"{prefix[0]}-{prefix[1:]}-{rest}",
+        ))
+    national = prefix[1:] + rest
+    area, subscriber = prefix[1:], rest
+    return rng.choice((
+        prefix + rest,
+        f"{prefix}-{rest}",
+        f"{prefix}-{rest[:3]}-{rest[3:]}",
+        f"{prefix} {rest[:3]} {rest[3:]}",
+        f"({prefix}) {rest[:3]}-{rest[3:]}",
+        f"+972{national}",
+        f"+972-{area}-{subscriber}",
+        f"+972 {area} {subscriber[:3]} {subscriber[3:]}",
+        f"+972 ({area}) {subscriber}",
+        f"972{national}",
+        f"972-{area}-{subscriber[:3]}-{subscriber[3:]}",
+        f" {prefix}{rest} ",
+    ))
+
+
+def _noise(rng: random.Random) -> str:
+    """An input validate() rejects: wrong length, wrong prefix or junk."""
+    return rng.choice((
+        lambda: "05" + _digits(rng, rng.choice((5, 6, 9))),
+        lambda: "06" + _digits(rng, 7),
+        lambda: "+1 " + _digits(rng, 10),
+        lambda: "*" + _digits(rng, rng.choice((2, 3, 8))),
+        lambda: "054-12a-4567",
+        lambda: "phone: 054 123 4567",
+        lambda: "1900" + _digits(rng, 6),
+        lambda: "",
+        lambda: "N/A",
+        lambda: _digits(rng, rng.randint(1, 14)),
+    ))()
+
+
+def generate_phones(count: int, invalid_ratio: float = 0.15, seed: int = 42) -> list[str]:
+    """`count` phone inputs; the same arguments always give the same list.
+
+    Valid numbers cover every type validate() knows (mostly mobiles) in
+    local, +972 and 972 forms with spaces, dashes or parentheses; a share
+    of `invalid_ratio` is noise.
+    """
+    rng = random.Random(seed)
+    other_shapes = [shape for shape in VALID_SHAPES if not shape[0].startswith("05")]
+    mobile_shapes = [shape for shape in VALID_SHAPES if shape[0].startswith("05")]
+    phones = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < invalid_ratio:
+            phones.append(_noise(rng))
+        elif roll < invalid_ratio + 0.03 * (1 - invalid_ratio):
+            phones.append("*" + _digits(rng, rng.choice(STAR_LENGTHS)))
+        else:
+            shapes = mobile_shapes if rng.random() < MOBILE_WEIGHT else other_shapes
+            prefix, length = rng.choice(shapes)
+            phones.append(_format_valid(rng, prefix, _digits(rng, length)))
+    return phones
+
+
+def time_case(vp, case: str, phones: list[str], batch_size: int | None, repeat: int) -> float:
+    """Fastest of `repeat` wall-clock runs of one case over all of `phones`."""
+    if case == BATCH_CASE:
+        def run():
+            for _ in vp.iter_validate_batch(phones, batch_size):
+                pass
+    else:
+        function = getattr(vp, case)
+
+        def run():
+            for phone in phones:
+                function(phone)
+
+    best = float("inf")
+    for _ in range(repeat):
+        # A cleared cache makes every run, not only the first, time the real work.
+        vp.cache_clear()
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def run_benchmarks(args, vp) -> dict:
+    if args.no_numpy:
+        vp.HAS_NUMPY = False
+    vp.configure_cache(args.cache_size)
+    phones = generate_phones(args.count, args.invalid_ratio, args.seed)
+    valid = sum(1 for phone in phones if vp.validate(phone)["valid"])
+
+    results = []
+    for case in args.cases:
+        for batch_size in (args.batch_sizes if case == BATCH_CASE else [None]):
+            label = case if batch_size is None else f"{case}[{batch_size}]"
+            print(f"  {label}...", file=sys.stderr)
+            seconds = time_case(vp, case, phones, batch_size, args.repeat)
+            results.append({
+                "case": case,
+                "batch_size": batch_size,
+                "seconds": round(seconds, 4),
+                "numbers_per_second": round(len(phones) / seconds) if seconds > 0 else None,
+            })
+
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": vp.HAS_NUMPY,
+        "inputs": {
+            "count": args.count,
+            "valid": valid,
+            "invalid_ratio": args.invalid_ratio,
+            "seed": args.seed,
+            "cache_size": args.cache_size,
+        },
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def baseline_differences(baseline: dict, args, numpy: bool) -> list[str]:
+    """Settings that differ between `baseline` and this run, as "name: old -> new".
+
+    Throughput is only comparable when these match: they decide which
+    inputs are timed and which code paths run.
+    """
+    current = {name: getattr(args, name) for name in COMPARED_INPUTS}
+    previous = baseline.get("inputs", {})
+    differences = [f"{name}: {previous.get(name)} -> {value}"
+                   for name, value in current.items() if previous.get(name) != value]
+    if baseline.get("numpy") != numpy:
+        differences.append(f"numpy: {baseline.get('numpy')} -> {numpy}")
+    return differences
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[dict]:
+    """Match results to baseline cases and flag drops larger than `threshold`.
+
+    Cases missing from either side are skipped. Adds a "baseline" section
+    to `report` and returns the regressed cases.
+    """
+    previous = {(row["case"], row["batch_size"]): row["numbers_per_second"]
+                for row in baseline.get("results", [])}
+    changes = []
+    for row in report["results"]:
+        before = previous.get((row["case"], row["batch_size"]))
+        if not before or not row["numbers_per_second"]:
+            continue
+        change = row["numbers_per_second"] / before - 1
+        changes.append({
+            "case": row["case"],
+            "batch_size": row["batch_size"],
+            "baseline_per_second": before,
+            "change": round(change, 4),
+            "regressed": change < -threshold,
+        })
+    report["baseline"] = {
+        "generated_at": baseline.get("generated_at"),
+        "threshold": threshold,
+        "cases": changes,
+    }
+    return [change for change in changes if change["regressed"]]
+
+
+def format_summary(report: dict) -> str:
+    """Format benchmark results (and any baseline comparison) as a table."""
+    lines = []
+    lines.append("=" * 70)
+    lines.append("PHONE VALIDATION BENCHMARK")
+    lines.append("=" * 70)
+    inputs = report["inputs"]
+    lines.append(f"Python {report['python']} on {report['platform']}")
+    lines.append(f"Inputs: {inputs['count']:,} numbers ({inputs['valid']:,} valid), seed {inputs['seed']}, "
+                 f"cache {inputs['cache_size']}, NumPy {'on' if report['numpy'] else 'off'}, "
+                 f"best of {report['repeat']}")
+
+    compared = {(change["case"], change["batch_size"]): change
+                for change in report.get("baseline", {}).get("cases", [])}
+    header = f"{'Case':<18} {'Batch':>7} {'Seconds':>9} {'Numbers/s':>13} {'vs baseline':>12}"
+    lines.append("")
+    lines.append(header)
+    lines.append("-" * len(header))
+    for row in report["results"]:
+        batch = f"{row['batch_size']:,}" if row["batch_size"] else "-"
+        rate = f"{row['numbers_per_second']:,}" if row["numbers_per_second"] else "-"
+        change = compared.get((row["case"], row["batch_size"]))
+        versus = "-" if change is None else f"{change['change']:+.1%}" + (" !" if change["regressed"] else "")
+        lines.append(f"{row['case']:<18} {batch:>7} {row['seconds']:>9.3f} {rate:>13} {versus:>12}")
+
+    if "baseline" in report:
+        baseline = report["baseline"]
+        lines.append("")
+        lines.append(f"Baseline from {baseline['generated_at']}, allowed drop {baseline['threshold']:.0%}")
+    lines.append("=" * 70)
+    return "\n".join(lines)
+
+
+def main():
+    args = parse_args()
+
+    if not VALIDATOR_PATH.exists():
+        print(f"Error: {VALIDATOR_PATH} not found", file=sys.stderr)
+        sys.exit(1)
+
+    if args.generate:
+        phones = generate_phones(args.count, args.invalid_ratio, args.seed)
+        with open(args.generate, "w", encoding="utf-8") as f:
+            f.writelines(phone + "\n" for phone in phones)
+        print(f"Wrote {len(phones):,} numbers to {args.generate}", file=sys.stderr)
+        return
+
+    baseline_path = Path(args.baseline) if args.baseline else DEFAULT_BASELINE
+    baseline = None
+    if args.baseline or (DEFAULT_BASELINE.exists() and not args.save_baseline):
+        try:
+            with open(baseline_path, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Error: cannot read baseline {baseline_path}: {e}", file=sys.stderr)
+            sys.exit(1)
+
+    vp = load_validator()
+    if baseline:
+        differences = baseline_differences(baseline, args, vp.HAS_NUMPY and not args.no_numpy)
+        if differences:
+            print(f"Error: baseline inputs differ from this run ({'; '.join(differences)}); "
+                  f"rerun with the baseline's settings or save a new baseline", file=sys.stderr)
+            sys.exit(1)
+
+    report = run_benchmarks(args, vp)
+    regressions = compare(report, baseline, args.threshold) if baseline else []
+
+    if args.format == "json":
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+    else:
+        output = format_summary(report)
+
+    if args.output:
+        output_path = Path(args.output)
+        with open(output_path, "w", encoding="utf-8") as f:
+            f.write(output)
+        print(f"Results written to {output_path}", file=sys.stderr)
+    else:
+        print(output)
+
+    if args.save_baseline:
+        report.pop("baseline", None)
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"Baseline saved to {args.save_baseline}", file=sys.stderr)
+
+    if regressions:
+        for change in regressions:
+            batch = f" (batch {change['batch_size']:,})" if change["batch_size"] else ""
+            print(f"Regression: {change['case']}{batch} is {-change['change']:.1%} slower than the baseline "
+                  f"({change['baseline_per_second']:,} numbers/s)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,29 @@
 """Validate, format, and convert Israeli phone numbers."""
 
 import argparse
+import csv
+import heapq
+import io
+import json
+import mmap
+import os
 import re
+import shutil
+import struct
 import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
+from itertools import islice
+
+try:
+    import numpy as np
+    HAS_NUMPY = True
+except ImportError:
+    HAS_NUMPY = False
 
 PATTERNS = {
     "mobile": r"^0(5[0-8])\d{7}$",
@@ -33,10 +54,87 @@ AREA_MAP = {
     "09": "Sharon / Netanya",
 }
 
+PHONE_TYPES = tuple(PATTERNS)
+BATCH_COLUMNS = ("cleaned", "valid", "type", "carrier", "region")
+
+DOMESTIC_ONLY = frozenset({"toll_free", "premium", "star"})
+DEFAULT_CACHE_SIZE = 4096
+MIN_VECTOR_CHUNK = 256  # smaller chunks are validated number by number, which is faster there
+
+INPUT_FORMATS = ("lines", "csv", "jsonl")
+# --input-format implied by an --input file's extension; anything else is "lines".
+INPUT_EXTENSIONS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl"}
+OUTPUT_FORMATS = ("tsv", "csv", "jsonl")
+OUTPUT_FIELDS = ("input", "status", "valid", "type", "cleaned", "international", "carrier", "region", "index_row")
+# The original --batch output: number, VALID/INVALID, type or "unknown".
+TSV_FIELDS = ("input", "status", "type")
+RECORD_FIELDS = ("input", "valid", "type", "cleaned", "international", "carrier", "region")
+DEDUP_FIELDS = ("cleaned", "type", "first_row", "count")
+
+INDEX_MAGIC = b"ILPHIDX1"
+_INDEX_HEADER = struct.Struct("<8sQ")
+_INDEX_BLOCK = 65536  # records per read/write when sorting and merging
+INVALID_CODE = 0  # encode_batch() value for invalid numbers; no valid number encodes to it
+_KEY_TYPE_CODES = {phone_type: code for code, phone_type in enumerate(PHONE_TYPES, 1)}
+# The part of a cleaned number that codes leave out, by type.
+_KEY_PREFIXES = {"mobile": "0", "landline": "0", "voip": "0", "toll_free": "", "premium": "", "star": "*"}
+_CODE_WIDTH = 10  # longest valid cleaned number
+
+_STRIP_RE = re.compile(r"[\s\-\(\)]")
+# clean_number() strips \s, "-", "(" and ")"; these are the ASCII ones.
+_ASCII_STRIP = bytes(c for c in range(128) if chr(c).isspace() or chr(c) in "-()")
+
+# PATTERNS as (prefix, type, allowed lengths): each leading block is
+# followed only by digits, so the prefix decides type, carrier and region.
+_PREFIX_RULES = (
+    *((f"05{d}", "mobile", (10,)) for d in "012345678"),
+    *((f"0{d}", "landline", (9,)) for d in "23489"),
+    *((f"07{d}", "voip", (10,)) for d in "234567"),
+    ("1800", "toll_free", (10,)),
+    ("1700", "premium", (10,)),
+    ("*", "star", (5, 6, 7)),
+)
+
+
+def _build_prefix_trie(rules) -> dict:
+    """Nested dicts keyed by character; leaves are (lengths, (type, carrier, region))."""
+    trie = {}
+    for prefix, phone_type, lengths in rules:
+        node = trie
+        for char in prefix[:-1]:
+            node = node.setdefault(char, {})
+        node[prefix[-1]] = (frozenset(lengths), (phone_type, CARRIER_MAP.get(prefix), AREA_MAP.get(prefix)))
+    return trie
+
+
+_PREFIX_TRIE = _build_prefix_trie(_PREFIX_RULES)
+
+
+def _classify(cleaned: str) -> tuple | None:
+    """(type, carrier, region) for a valid cleaned number, else None.
+
+    Walks _PREFIX_TRIE over the leading characters, then checks the length
+    and that the rest are digits (Unicode digits count, as with re's \\d).
+    """
+    node = _PREFIX_TRIE
+    for i, char in enumerate(cleaned):
+        node = node.get(char)
+        if node is None:
+            return None
+        if type(node) is tuple:
+            lengths, match = node
+            if len(cleaned) in lengths and cleaned[i + 1:].isdecimal():
+                return match
+            return None
+    return None
+
 
 def clean_number(phone: str) -> str:
     """Strip formatting and normalize international prefix."""
-    cleaned = re.sub(r"[\s\-\(\)]", "", phone)
+    if phone.isascii():
+        cleaned = phone.encode("ascii").translate(None, _ASCII_STRIP).decode("ascii")
+    else:
+        cleaned = _STRIP_RE.sub("", phone)
     if cleaned.startswith("+972"):
         cleaned = "0" + cleaned[4:]
     elif cleaned.startswith("972") and len(cleaned) > 9:
@@ -44,51 +142,805 @@ def clean_number(phone: str) -> str:
     return cleaned
 
 
+def _analyze(phone: str) -> tuple:
+    """(cleaned, _classify() result) for a raw number; what the cache holds."""
+    cleaned = clean_number(phone)
+    return cleaned, _classify(cleaned)
+
+
+def configure_cache(maxsize: int | None = DEFAULT_CACHE_SIZE) -> None:
+    """Set up the LRU cache shared by validate(), to_international() and to_local().
+
+    Entries are keyed on the raw input, so a repeated number skips cleaning
+    and classification. 0 disables caching and None removes the bound.
+    Reconfiguring starts an empty cache with fresh counters.
+    """
+    global _lookup
+    _lookup = lru_cache(maxsize=maxsize)(_analyze) if maxsize != 0 else _analyze
+
+
+def cache_info() -> dict:
+    """Hit/miss counters, hit rate and size of the shared cache."""
+    if _lookup is _analyze:
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0, "size": 0, "maxsize": 0}
+    info = _lookup.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+        "size": info.currsize,
+        "maxsize": info.maxsize,
+    }
+
+
+def cache_clear() -> None:
+    """Empty the shared cache and reset its counters."""
+    if _lookup is not _analyze:
+        _lookup.cache_clear()
+
+
+configure_cache()
+
+
 def validate(phone: str) -> dict:
     """Validate an Israeli phone number and return its type and details."""
-    cleaned = clean_number(phone)
-    for phone_type, pattern in PATTERNS.items():
-        if re.match(pattern, cleaned):
-            result = {"valid": True, "type": phone_type, "cleaned": cleaned}
-            prefix = cleaned[:3]
-            if phone_type == "mobile" and prefix in CARRIER_MAP:
-                result["carrier"] = CARRIER_MAP[prefix]
-            elif phone_type == "landline":
-                area = cleaned[:2]
-                if area in AREA_MAP:
-                    result["region"] = AREA_MAP[area]
-            return result
-    return {"valid": False, "type": None, "cleaned": cleaned}
+    cleaned, match = _lookup(phone)
+    if match is None:
+        return {"valid": False, "type": None, "cleaned": cleaned}
+    phone_type, carrier, region = match
+    result = {"valid": True, "type": phone_type, "cleaned": cleaned}
+    if carrier:
+        result["carrier"] = carrier
+    elif region:
+        result["region"] = region
+    return result
+
+
+def _validate_ascii(joined: str, n: int) -> dict | None:
+    """Batch columns for `n` NUL-joined ASCII numbers, in pure Python.
+
+    Returns None if the text does not split into `n` numbers.
+    """
+    cleaned = joined.encode("ascii").translate(None, _ASCII_STRIP).decode("ascii").split("\0")
+    if len(cleaned) != n:
+        return None
+    for i, number in enumerate(cleaned):
+        if number.startswith("+972"):
+            cleaned[i] = "0" + number[4:]
+        elif number.startswith("972") and len(number) > 9:
+            cleaned[i] = "0" + number[3:]
+    no_match = (None, None, None)
+    types, carriers, regions = zip(*[match or no_match for match in map(_classify, cleaned)])
+    return {"cleaned": cleaned, "valid": [t is not None for t in types], "type": list(types),
+            "carrier": list(carriers), "region": list(regions)}
+
+
+def _word(text: str) -> int:
+    """Little-endian integer of up to 8 ASCII characters."""
+    return int.from_bytes(text.encode("ascii"), "little")
+
+
+def _byte_mask(start: int, stop: int) -> int:
+    """Mask selecting bytes start..stop-1 of a little-endian word."""
+    return sum(0xFF << (8 * i) for i in range(start, stop))
+
+
+if HAS_NUMPY:
+    _TYPE_LABELS = np.array([None, *PHONE_TYPES], dtype=object)
+    _LANDLINE_DIGITS = np.zeros(256, dtype=bool)
+    _LANDLINE_DIGITS[[ord(d) for d in "23489"]] = True
+    _CARRIER_BY_DIGIT = np.full(256, None, dtype=object)
+    for _prefix, _carrier in CARRIER_MAP.items():
+        _CARRIER_BY_DIGIT[ord(_prefix[2])] = _carrier
+    _REGION_BY_DIGIT = np.full(256, None, dtype=object)
+    for _prefix, _region in AREA_MAP.items():
+        _REGION_BY_DIGIT[ord(_prefix[1])] = _region
+    _TYPE_CODES = {None: INVALID_CODE, **_KEY_TYPE_CODES}
+    # Leading digits a code leaves out (its prefix "0"), and the prefix byte restored on decode.
+    _DROPPED_DIGITS = np.array([0, *(len(_KEY_PREFIXES[t].strip("*")) for t in PHONE_TYPES)], dtype=np.uint64)
+    _PREFIX_BYTES = np.array([0, *(ord(_KEY_PREFIXES[t] or "\0") for t in PHONE_TYPES)], dtype=np.uint8)
+    _DIGIT_POWERS = 10 ** np.arange(_CODE_WIDTH - 1, -1, -1, dtype=np.uint64)
+
+
+def _non_digits(words):
+    """Per byte of each uint64 word, non-zero unless it is an ASCII digit."""
+    t = words ^ 0x3030303030303030
+    return (t & 0xF0F0F0F0F0F0F0F0) | (((t & 0x0F0F0F0F0F0F0F0F) + 0x0606060606060606) & 0x1010101010101010)
+
+
+def _validate_ascii_numpy(joined: str, n: int) -> dict | None:
+    """Batch columns for `n` NUL-joined ASCII numbers, as whole-array tests.
+
+    Each cleaned number is read as two little-endian words (bytes 0-7 and
+    8-15) from the joined bytes, so every PATTERNS rule becomes a few
+    integer comparisons; digit runs are checked for all bytes at once.
+    Returns None if the text does not split into `n` numbers.
+    """
+    data = joined.encode("ascii").translate(None, _ASCII_STRIP).replace(b"\0+972", b"\0" b"0")
+    if data.startswith(b"+972"):
+        data = b"0" + data[4:]
+    text = data.decode("ascii")
+    data += bytes(16)
+    ends = np.flatnonzero(np.frombuffer(data, dtype=np.uint8, count=len(text) + 1) == 0)
+    if len(ends) != n:
+        return None
+    starts = np.zeros(n, dtype=ends.dtype)
+    starts[1:] = ends[:-1] + 1
+    lengths = ends - starts
+    words = np.ndarray(len(data) - 7, dtype="<u8", buffer=data, strides=(1,))
+    cleaned = text.split("\0")
+
+    low = words[starts]
+    bare = ((low & 0xFFFFFF) == _word("972")) & (lengths > 9)
+    if bare.any():
+        # "972..." becomes "0...": skip "97" and read the "2" as "0".
+        starts += 2 * bare
+        lengths -= 2 * bare
+        low = words[starts]
+        low[bare] = (low[bare] & 0xFFFFFFFFFFFFFF00) | ord("0")
+        for i in np.flatnonzero(bare).tolist():
+            cleaned[i] = "0" + cleaned[i][3:]
+    high = words[starts + 8]
+    # Bytes past a number's end belong to the next one, but every rule
+    # below also checks the length, so they never need masking out.
+    non_digit_low = _non_digits(low)
+    non_digit_high = _non_digits(high)
+
+    def digits(start, stop):
+        result = (non_digit_low & _byte_mask(start, min(stop, 8))) == 0
+        if stop > 8:
+            result &= (non_digit_high & _byte_mask(0, stop - 8)) == 0
+        return result
+
+    first = low & 0xFF
+    second = (low >> 8) & 0xFF
+    third = (low >> 16) & 0xFF
+    ten = lengths == 10
+    mobile = ten & ((low & 0xFFFF) == _word("05")) & (third <= ord("8")) & digits(2, 10)
+    landline = (lengths == 9) & (first == ord("0")) & _LANDLINE_DIGITS[second] & digits(2, 9)
+    voip = ten & ((low & 0xFFFF) == _word("07")) & (third >= ord("2")) & (third <= ord("7")) & digits(2, 10)
+    service = ten & digits(4, 10)
+    toll_free = service & ((low & 0xFFFFFFFF) == _word("1800"))
+    premium = service & ((low & 0xFFFFFFFF) == _word("1700"))
+    star = (first == ord("*")) & (
+        (lengths == 5) & digits(1, 5) | (lengths == 6) & digits(1, 6) | (lengths == 7) & digits(1, 7))
+
+    # The rules are mutually exclusive, so codes (1-based PHONE_TYPES indexes) add up.
+    types = mobile.view(np.int8).copy()
+    for code, matched in enumerate((landline, voip, toll_free, premium, star), 2):
+        types += matched.view(np.int8) * np.int8(code)
+    return {
+        "cleaned": cleaned,
+        "valid": (types > 0).tolist(),
+        "type": _TYPE_LABELS[types].tolist(),
+        "carrier": _CARRIER_BY_DIGIT[np.where(mobile, third, 0)].tolist(),
+        "region": _REGION_BY_DIGIT[np.where(landline, second, 0)].tolist(),
+    }
+
+
+def _validate_each(phones: list[str]) -> dict:
+    """Batch columns built one number at a time with clean_number() and the trie."""
+    columns = {name: [] for name in BATCH_COLUMNS}
+    for phone in phones:
+        cleaned = clean_number(phone)
+        match = _classify(cleaned)
+        phone_type, carrier, region = match or (None, None, None)
+        columns["cleaned"].append(cleaned)
+        columns["valid"].append(match is not None)
+        columns["type"].append(phone_type)
+        columns["carrier"].append(carrier)
+        columns["region"].append(region)
+    return columns
+
+
+def _validate_chunk(phones: list[str]) -> dict:
+    """Batch columns for one chunk of numbers.
+
+    ASCII numbers take the fast path (NumPy when available); anything else
+    (non-ASCII digits or whitespace, NUL characters) goes through
+    clean_number() one by one so the results always match validate().
+    Chunks under MIN_VECTOR_CHUNK are done number by number, since the
+    fast path's fixed cost per chunk outweighs its saving there.
+    """
+    n = len(phones)
+    if n < MIN_VECTOR_CHUNK:
+        return _validate_each(phones)
+    fast = _validate_ascii_numpy if HAS_NUMPY else _validate_ascii
+    joined = "\0".join(phones)
+    odd = []
+    if not joined.isascii():
+        # The ASCII codec turns each non-ASCII character into "?"; every
+        # number with a "?" (including any that had one already) is redone.
+        joined = joined.encode("ascii", "replace").decode("ascii")
+        item = last = 0
+        position = joined.find("?")
+        while position >= 0:
+            item += joined.count("\0", last, position)
+            if not odd or odd[-1] != item:
+                odd.append(item)
+            last = position
+            position = joined.find("?", position + 1)
+    columns = fast(joined, n)
+    if columns is None:
+        # Some number contains NUL, the separator.
+        odd = [i for i, phone in enumerate(phones) if not phone.isascii() or "\0" in phone]
+        ascii_phones = list(phones)
+        for i in odd:
+            ascii_phones[i] = ""
+        columns = fast("\0".join(ascii_phones), n)
+    for i in odd:
+        cleaned = clean_number(phones[i])
+        match = _classify(cleaned)
+        columns["cleaned"][i] = cleaned
+        columns["valid"][i] = match is not None
+        columns["type"][i], columns["carrier"][i], columns["region"][i] = match or (None, None, None)
+    return columns
+
+
+def iter_validate_batch(phones, chunk_size: int = 16384):
+    """Yield validate_batch() columns for successive chunks of `phones`.
+
+    Lets callers stream any iterable of numbers without holding the full
+    result columns in memory.
+    """
+    phones = iter(phones)
+    while chunk := list(islice(phones, chunk_size)):
+        yield _validate_chunk(chunk)
+
+
+def validate_batch(phones, chunk_size: int = 16384, as_numpy: bool = False) -> dict:
+    """Validate many numbers at once, returning one list per field.
+
+    The result maps each of BATCH_COLUMNS (cleaned, valid, type, carrier,
+    region) to a list aligned with `phones`; entries match what validate()
+    returns for each number, with None where a field does not apply. With
+    NumPy installed, chunks of ASCII input are classified with vectorized
+    byte comparisons, several times faster per number than validate();
+    without it the chunk is stripped with one bytes.translate() and each
+    number classified by a walk of the prefix trie. Chunks shorter than
+    MIN_VECTOR_CHUNK (including a short final chunk) are validated number
+    by number. `as_numpy` returns NumPy arrays instead of lists (requires
+    NumPy).
+    """
+    if as_numpy and not HAS_NUMPY:
+        raise RuntimeError("as_numpy requires numpy (pip install numpy)")
+    columns = {name: [] for name in BATCH_COLUMNS}
+    for result in iter_validate_batch(phones, chunk_size):
+        for name in BATCH_COLUMNS:
+            columns[name] += result[name]
+    if as_numpy:
+        return {
+            name: np.array(values, dtype=bool if name == "valid" else object)
+            for name, values in columns.items()
+        }
+    return columns
+
+
+def read_phones(stream, input_format: str = "lines", column: str = "phone"):
+    """Yield raw numbers from a text stream.
+
+    "lines" yields each non-blank line, stripped; "csv" yields `column` of
+    every row (by header name) and "jsonl" the `column` key of every record,
+    "" where it is missing. Raises ValueError on malformed input.
+    """
+    if input_format == "lines":
+        for line in stream:
+            phone = line.strip()
+            if phone:
+                yield phone
+    elif input_format == "csv":
+        reader = csv.reader(stream)
+        header = next(reader, None)
+        if header is None:
+            return
+        if column not in header:
+            raise ValueError(f"column '{column}' not in CSV header")
+        index = header.index(column)
+        for row in reader:
+            yield row[index] if index < len(row) else ""
+    else:
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"line {line_number}: invalid JSON ({e.msg} at column {e.colno})") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"line {line_number}: expected a JSON object")
+            value = record.get(column)
+            yield "" if value is None else str(value)
+
+
+def _text_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+def _render_rows(rows, fields, output_format: str) -> str:
+    """Rows of values (in `fields` order) as tsv, csv or jsonl text."""
+    if output_format == "jsonl":
+        return "".join(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n" for row in rows)
+    rows = ([_text_value(value) for value in row] for row in rows)
+    if output_format == "csv":
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerows(rows)
+        return buffer.getvalue()
+    return "".join("\t".join(row) + "\n" for row in rows)
+
+
+def format_batch(phones: list[str], fields=TSV_FIELDS, output_format: str = "tsv",
+                 index_path: str | None = None) -> str:
+    """Validate a chunk of numbers and render one output line per number.
+
+    Fields are drawn from OUTPUT_FIELDS; "index_row" looks each number up
+    in the PhoneIndex at `index_path`. For "tsv" an invalid number's type
+    reads "unknown", as in the original --batch output; no header is
+    written here.
+    """
+    columns = validate_batch(phones, chunk_size=max(len(phones), 1))
+    columns["input"] = phones
+    if "status" in fields:
+        columns["status"] = ["VALID" if valid else "INVALID" for valid in columns["valid"]]
+    if "international" in fields:
+        columns["international"] = [
+            "+972" + cleaned[1:] if phone_type and phone_type not in DOMESTIC_ONLY else None
+            for cleaned, phone_type in zip(columns["cleaned"], columns["type"])
+        ]
+    if "index_row" in fields:
+        columns["index_row"] = _open_index(index_path).find_many(_encode_columns(columns))
+    if output_format == "tsv" and "type" in fields:
+        columns["type"] = [phone_type or "unknown" for phone_type in columns["type"]]
+    return _render_rows(zip(*(columns[field] for field in fields)), fields, output_format)
+
+
+def run_batch(stream, out, input_format: str = "lines", column: str = "phone",
+              output_format: str = "tsv", fields=None, workers: int = 1,
+              chunk_size: int = 16384, index_path: str | None = None) -> int:
+    """Stream numbers from `stream` to `out` in chunks; returns how many.
+
+    Each chunk is validated with validate_batch() and written as one block.
+    With `workers` other than 1 (0 means every CPU) chunks are rendered in
+    a process pool; output keeps input order and at most two chunks per
+    worker are in flight, so memory stays bounded. With `index_path` the
+    default fields gain "index_row", joining against that PhoneIndex.
+    """
+    fields = tuple(fields or (TSV_FIELDS if output_format == "tsv" else RECORD_FIELDS))
+    if index_path and not any(field == "index_row" for field in fields):
+        fields += ("index_row",)
+    phones = read_phones(stream, input_format, column)
+    chunks = iter(lambda: list(islice(phones, chunk_size)), [])
+    render = partial(format_batch, fields=fields, output_format=output_format, index_path=index_path)
+    if output_format == "csv":
+        csv.writer(out, lineterminator="\n").writerow(fields)
+    count = 0
+    if workers == 1:
+        for chunk in chunks:
+            out.write(render(chunk))
+            count += len(chunk)
+        return count
+    workers = workers or os.cpu_count() or 1
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for chunk in chunks:
+            pending.append(pool.submit(render, chunk))
+            count += len(chunk)
+            if len(pending) >= workers * 2:
+                out.write(pending.popleft().result())
+        while pending:
+            out.write(pending.popleft().result())
+    return count
+
+
+def _pack_key(phone_type: str, cleaned: str) -> int:
+    """Code: 1-based PHONE_TYPES index in bits 60-63, digit count in 56-59, digits below."""
+    digits = cleaned[len(_KEY_PREFIXES[phone_type]):]
+    return _KEY_TYPE_CODES[phone_type] << 60 | len(digits) << 56 | int(digits)
+
+
+def _unpack_key(key: int) -> tuple[str, str]:
+    """(type, cleaned number) for a code."""
+    phone_type = PHONE_TYPES[(key >> 60) - 1]
+    digits = str(key & 0xFFFFFFFFFFFFFF).zfill((key >> 56) & 0xF)
+    return phone_type, _KEY_PREFIXES[phone_type] + digits
+
+
+def encode_number(phone: str) -> int | None:
+    """Pack a valid number into a 64-bit integer code, or None if invalid.
+
+    Every spelling of a number gets the same code (054-1234567,
+    +972 54 123 4567 and 972541234567 all do), and codes sort by type,
+    then by number.
+    """
+    cleaned, match = _lookup(phone)
+    return None if match is None else _pack_key(match[0], cleaned)
+
+
+def decode_number(code: int) -> tuple[str, str]:
+    """(type, cleaned number) for a code from encode_number()."""
+    if not 1 <= code >> 60 <= len(PHONE_TYPES):
+        raise ValueError(f"not a phone code: {code}")
+    return _unpack_key(code)
+
+
+def _encode_columns_numpy(columns: dict):
+    types = np.fromiter(map(_TYPE_CODES.__getitem__, columns["type"]), dtype=np.uint64,
+                        count=len(columns["type"]))
+    # Unicode digits are left for int() below; everything else is parsed as
+    # fixed-width ASCII, accumulating each row's digits left to right.
+    cleaned = [number if phone_type and number.isascii() else ""
+               for number, phone_type in zip(columns["cleaned"], columns["type"])]
+    raw = np.array(cleaned, dtype=f"S{_CODE_WIDTH}").view(np.uint8).reshape(-1, _CODE_WIDTH)
+    digits = raw - np.uint8(48)
+    is_digit = digits < 10
+    value = np.zeros(len(raw), dtype=np.uint64)
+    for i in range(_CODE_WIDTH):
+        value = np.where(is_digit[:, i], value * np.uint64(10) + digits[:, i], value)
+    count = is_digit.sum(1, dtype=np.uint64) - _DROPPED_DIGITS[types]
+    codes = np.where(types != INVALID_CODE, types << np.uint64(60) | count << np.uint64(56) | value,
+                     np.uint64(INVALID_CODE))
+    for i, number in enumerate(cleaned):
+        if not number and types[i]:
+            codes[i] = _pack_key(columns["type"][i], columns["cleaned"][i])
+    return codes
+
+
+def _encode_columns(columns: dict):
+    """Codes (INVALID_CODE for invalid numbers) for validate_batch() columns.
+
+    A NumPy uint64 array when NumPy is available, else an array('Q').
+    """
+    if HAS_NUMPY:
+        return _encode_columns_numpy(columns)
+    return array("Q", [_pack_key(phone_type, cleaned) if phone_type else INVALID_CODE
+                       for cleaned, phone_type in zip(columns["cleaned"], columns["type"])])
+
+
+def encode_batch(phones, chunk_size: int = 16384, as_numpy: bool = False):
+    """encode_number() for many numbers, as an array('Q') of codes.
+
+    Invalid numbers encode to INVALID_CODE. With as_numpy=True a NumPy
+    uint64 array is returned instead.
+    """
+    if as_numpy and not HAS_NUMPY:
+        raise RuntimeError("as_numpy=True requires NumPy")
+    chunks = [_encode_columns(columns) for columns in iter_validate_batch(phones, chunk_size)]
+    if as_numpy:
+        return np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint64)
+    codes = array("Q")
+    for chunk in chunks:
+        if HAS_NUMPY:
+            codes.frombytes(chunk.tobytes())
+        else:
+            codes.extend(chunk)
+    return codes
+
+
+def decode_batch(codes) -> dict:
+    """decode_number() for an array('Q'), NumPy array or list of codes.
+
+    Returns {"type": [...], "cleaned": [...]}; INVALID_CODE entries decode
+    to None in both columns.
+    """
+    if not HAS_NUMPY:
+        rows = [decode_number(code) if code != INVALID_CODE else (None, None) for code in codes]
+        return {"type": [row[0] for row in rows], "cleaned": [row[1] for row in rows]}
+    codes = np.asarray(codes, dtype=np.uint64)
+    types = (codes >> np.uint64(60)).astype(np.intp)
+    count = ((codes >> np.uint64(56)) & np.uint64(0xF)).astype(np.intp)
+    if types.max(initial=0) > len(PHONE_TYPES) or ((types == INVALID_CODE) & (codes != INVALID_CODE)).any():
+        raise ValueError("not a phone code array")
+    # One row per code: prefix byte, zero-padded digits, newline; the mask
+    # drops padding beyond each code's digit count and absent prefixes.
+    value = codes & np.uint64(0xFFFFFFFFFFFFFF)
+    text = np.empty((len(codes), _CODE_WIDTH + 2), dtype=np.uint8)
+    text[:, 0] = _PREFIX_BYTES[types]
+    text[:, 1:-1] = value[:, None] // _DIGIT_POWERS % np.uint64(10) + np.uint64(48)
+    text[:, -1] = ord("\n")
+    keep = np.ones(text.shape, dtype=bool)
+    keep[:, 0] = text[:, 0] != 0
+    keep[:, 1:-1] = np.arange(_CODE_WIDTH) >= _CODE_WIDTH - count[:, None]
+    cleaned = text[keep].tobytes().decode("ascii").split("\n")[:-1]
+    return {"type": _TYPE_LABELS[types].tolist(),
+            "cleaned": [number or None for number in cleaned]}
+
+
+def _write_run(path: str, keys: array, rows: array) -> str:
+    """Sort one run by key and store each key once: (key, first row, count) triples."""
+    if HAS_NUMPY:
+        unique, first, counts = np.unique(np.frombuffer(keys, dtype=np.uint64),
+                                          return_index=True, return_counts=True)
+        records = np.column_stack((unique, np.frombuffer(rows, dtype=np.uint64)[first],
+                                   counts.astype(np.uint64)))
+        records.tofile(path)
+        return path
+    records = array("Q")
+    for i in sorted(range(len(keys)), key=keys.__getitem__):
+        if records and records[-3] == keys[i]:
+            records[-1] += 1
+        else:
+            records.extend((keys[i], rows[i], 1))
+    with open(path, "wb") as f:
+        records.tofile(f)
+    return path
+
+
+def _read_run(path: str):
+    """Yield the (key, first row, count) triples of a run file."""
+    with open(path, "rb") as f:
+        while True:
+            block = array("Q")
+            try:
+                block.fromfile(f, _INDEX_BLOCK * 3)
+            except EOFError:
+                pass
+            if not block:
+                return
+            values = iter(block)
+            yield from zip(values, values, values)
+
+
+def _merge_runs(paths: list[str]):
+    """Merge sorted runs, combining equal keys: earliest first row, summed count."""
+    key = first_row = count = None
+    for run_key, run_row, run_count in heapq.merge(*map(_read_run, paths)):
+        if run_key == key:
+            count += run_count
+            continue
+        if key is not None:
+            yield key, first_row, count
+        key, first_row, count = run_key, run_row, run_count
+    if key is not None:
+        yield key, first_row, count
+
+
+def build_index(phones, path: str, run_size: int = 4_000_000, chunk_size: int = 16384,
+                tmp_dir: str | None = None) -> dict:
+    """Write a sorted on-disk PhoneIndex of the distinct valid numbers in `phones`.
+
+    encode_number() codes are gathered in runs of at most `run_size` (16 bytes each
+    in memory); each run is sorted and spilled to a scratch file and the
+    runs are merged into `path`, which records every distinct key with its
+    first row (0-based position in `phones`) and how many rows share it.
+    Memory therefore stays bounded however many rows there are. Returns
+    the row, invalid and distinct counts.
+    """
+    rows = invalid = 0
+    runs = []
+    with tempfile.TemporaryDirectory(dir=tmp_dir) as scratch:
+        keys, key_rows = array("Q"), array("Q")
+        for columns in iter_validate_batch(phones, chunk_size):
+            codes = _encode_columns(columns)
+            if HAS_NUMPY:
+                valid = np.flatnonzero(codes)
+                keys.frombytes(codes[valid].tobytes())
+                key_rows.frombytes((valid.astype(np.uint64) + np.uint64(rows)).tobytes())
+                invalid += len(codes) - len(valid)
+            else:
+                for offset, key in enumerate(codes):
+                    if key == INVALID_CODE:
+                        invalid += 1
+                    else:
+                        keys.append(key)
+                        key_rows.append(rows + offset)
+            rows += len(codes)
+            if len(keys) >= run_size:
+                runs.append(_write_run(os.path.join(scratch, f"run{len(runs)}"), keys, key_rows))
+                keys, key_rows = array("Q"), array("Q")
+        if keys or not runs:
+            runs.append(_write_run(os.path.join(scratch, f"run{len(runs)}"), keys, key_rows))
+
+        # Keys go straight into the index; first rows and counts follow them
+        # as two more arrays, so they are spooled and appended at the end.
+        distinct = 0
+        tmp_path = f"{path}.tmp"
+        spools = [os.path.join(scratch, name) for name in ("rows", "counts")]
+        with open(tmp_path, "wb") as out, open(spools[0], "wb") as rows_file, \
+                open(spools[1], "wb") as counts_file:
+            out.write(_INDEX_HEADER.pack(INDEX_MAGIC, 0))
+            records = _merge_runs(runs)
+            while block := list(islice(records, _INDEX_BLOCK)):
+                block_keys, block_rows, block_counts = zip(*block)
+                array("Q", block_keys).tofile(out)
+                array("Q", block_rows).tofile(rows_file)
+                array("Q", block_counts).tofile(counts_file)
+                distinct += len(block)
+        with open(tmp_path, "r+b") as out:
+            out.seek(0, os.SEEK_END)
+            for spool in spools:
+                with open(spool, "rb") as f:
+                    shutil.copyfileobj(f, out)
+            out.seek(0)
+            out.write(_INDEX_HEADER.pack(INDEX_MAGIC, distinct))
+        os.replace(tmp_path, path)
+    return {"rows": rows, "invalid": invalid, "distinct": distinct}
+
+
+class PhoneIndex:
+    """Memory-mapped index written by build_index().
+
+    The file is a header followed by three native-order uint64 arrays of
+    equal length: sorted canonical keys, each key's first row and its row
+    count. Lookups are binary searches over the mapped keys, so opening
+    and querying an index costs no memory beyond the pages touched.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        header = self._file.read(_INDEX_HEADER.size)
+        if len(header) != _INDEX_HEADER.size or header[:8] != INDEX_MAGIC:
+            self._file.close()
+            raise ValueError(f"{path} is not a phone index")
+        self.size = _INDEX_HEADER.unpack(header)[1]
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        start = _INDEX_HEADER.size
+        view = memoryview(self._map)
+        self.keys, self.rows, self.counts = (
+            view[start + 8 * self.size * i:start + 8 * self.size * (i + 1)].cast("Q") for i in range(3))
+        view.release()
+        self._sorted_keys = None
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self):
+        """Yield (key, first row, count) in key order."""
+        return zip(self.keys, self.rows, self.counts)
+
+    def find(self, key: int) -> int | None:
+        """First row of `key`, or None if the index does not hold it."""
+        i = bisect_left(self.keys, key)
+        if i < self.size and self.keys[i] == key:
+            return self.rows[i]
+        return None
+
+    def find_many(self, keys) -> list:
+        """find() for each key of an array('Q'), NumPy array or list, vectorized with NumPy.
+
+        INVALID_CODE entries are never found.
+        """
+        if not HAS_NUMPY or not self.size:
+            return [self.find(key) for key in keys]
+        if self._sorted_keys is None:
+            self._sorted_keys = np.frombuffer(self.keys, dtype=np.uint64)
+        wanted = np.asarray(keys, dtype=np.uint64)
+        positions = np.minimum(np.searchsorted(self._sorted_keys, wanted), self.size - 1)
+        found = self._sorted_keys[positions] == wanted
+        rows = np.frombuffer(self.rows, dtype=np.uint64)[positions]
+        return [int(row) if hit else None for row, hit in zip(rows.tolist(), found.tolist())]
+
+    def close(self) -> None:
+        self._sorted_keys = None
+        for view in (self.keys, self.rows, self.counts):
+            view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@lru_cache(maxsize=None)
+def _open_index(path: str) -> PhoneIndex:
+    """One open PhoneIndex per path and process (batch workers join against it)."""
+    return PhoneIndex(path)
+
+
+def write_dedup(index: PhoneIndex, out, output_format: str = "tsv") -> None:
+    """Write one row per distinct number in `index`: DEDUP_FIELDS, in key order."""
+    if output_format == "csv":
+        csv.writer(out, lineterminator="\n").writerow(DEDUP_FIELDS)
+    records = iter(index)
+    while block := list(islice(records, _INDEX_BLOCK)):
+        rows = ((*reversed(_unpack_key(key)), first_row, count) for key, first_row, count in block)
+        out.write(_render_rows(rows, DEDUP_FIELDS, output_format))
+
+
+def _output_fields(value: str) -> tuple:
+    fields = tuple(field.strip() for field in value.split(",") if field.strip())
+    unknown = [field for field in fields if field not in OUTPUT_FIELDS]
+    if unknown or not fields:
+        raise argparse.ArgumentTypeError(
+            f"unknown field(s) {', '.join(unknown) or '(none)'}; choose from {', '.join(OUTPUT_FIELDS)}")
+    return fields
 
 
 def to_international(phone: str) -> str | None:
     """Convert local number to +972 international format."""
-    result = validate(phone)
-    if not result["valid"] or result["type"] in ("toll_free", "premium", "star"):
+    cleaned, match = _lookup(phone)
+    if match is None or match[0] in DOMESTIC_ONLY:
         return None
-    return "+972" + result["cleaned"][1:]
+    return "+972" + cleaned[1:]
 
 
 def to_local(phone: str) -> str:
     """Convert international format to local."""
-    return clean_number(phone)
+    return _lookup(phone)[0]
 
 
 def main():
-    parser = argparse.ArgumentParser(description="Israeli phone number validator")
+    parser = argparse.ArgumentParser(description="Israeli phone number validator", allow_abbrev=False)
     parser.add_argument("--number", "-n", help="Phone number to validate")
-    parser.add_argument("--batch", action="store_true", help="Read numbers from stdin")
+    parser.add_argument("--batch", action="store_true", help="Validate many numbers from --input or stdin")
+    parser.add_argument("--dedup", action="store_true",
+                        help="Read numbers from --input or stdin and write each distinct valid number once")
+    parser.add_argument("--input", "-i", metavar="PATH",
+                        help="File for --batch/--dedup to read instead of stdin")
+    parser.add_argument("--index", metavar="PATH", help="Keep the --dedup index at PATH for later --join runs")
+    parser.add_argument("--join", metavar="PATH",
+                        help="With --batch, add each number's first row in the index at PATH (index_row)")
     parser.add_argument("--format", choices=["local", "international"], help="Convert to format")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS,
+                        help="--batch input: one number per line, CSV with a header, or JSON lines "
+                             "(default: from the --input extension, .csv or .jsonl, else lines)")
+    parser.add_argument("--column", default="phone",
+                        help="CSV column or JSONL key holding the number (default: phone)")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="tsv",
+                        help="--batch output format (default: tsv)")
+    parser.add_argument("--fields", type=_output_fields,
+                        help=f"Comma-separated output fields from {', '.join(OUTPUT_FIELDS)} "
+                             f"(default: {','.join(TSV_FIELDS)} for tsv, {','.join(RECORD_FIELDS)} otherwise)")
+    parser.add_argument("--workers", "-j", type=int, default=1,
+                        help="Worker processes for --batch; 0 uses every CPU (default: 1)")
+    parser.add_argument("--chunk-size", type=int, default=16384,
+                        help="Numbers read, validated and written per chunk (default: 16384)")
     args = parser.parse_args()
+    if args.workers < 0:
+        parser.error("--workers must be >= 0")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be >= 1")
+    if args.batch and args.dedup:
+        parser.error("--batch and --dedup are mutually exclusive")
+    if args.index and not args.dedup:
+        parser.error("--index requires --dedup")
+    if args.join and not args.batch:
+        parser.error("--join requires --batch")
+    if args.fields and "index_row" in args.fields and not args.join:
+        parser.error("the index_row field requires --join")
+    if args.input and not (args.batch or args.dedup):
+        parser.error("--input requires --batch or --dedup")
+    if args.input_format is None:
+        extension = os.path.splitext(args.input or "")[1].lower()
+        args.input_format = INPUT_EXTENSIONS.get(extension, "lines")
 
-    if args.batch:
-        for line in sys.stdin:
-            phone = line.strip()
-            if not phone:
-                continue
-            result = validate(phone)
-            status = "VALID" if result["valid"] else "INVALID"
-            print(f"{phone}\t{status}\t{result['type'] or 'unknown'}")
+    if args.batch or args.dedup:
+        newline = "" if args.input_format == "csv" else None
+        try:
+            if args.input:
+                stream = open(args.input, encoding="utf-8", newline=newline)
+            else:
+                stream = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline=newline)
+            if args.dedup:
+                index_path = args.index
+                if index_path is None:
+                    handle, index_path = tempfile.mkstemp(suffix=".idx")
+                    os.close(handle)
+                try:
+                    stats = build_index(read_phones(stream, args.input_format, args.column), index_path,
+                                        chunk_size=args.chunk_size)
+                    with PhoneIndex(index_path) as index:
+                        write_dedup(index, sys.stdout, args.output_format)
+                finally:
+                    if args.index is None:
+                        os.unlink(index_path)
+                print(f"Rows: {stats['rows']}, distinct: {stats['distinct']}, invalid: {stats['invalid']}",
+                      file=sys.stderr)
+            else:
+                if args.join:
+                    _open_index(args.join)
+                run_batch(stream, sys.stdout, args.input_format, args.column, args.output_format,
+                          args.fields, args.workers, args.chunk_size, args.join)
+        except (OSError, ValueError) as e:
+            print(f"Error: {e}", file=sys.stderr)
+            sys.exit(1)
+        stream.close()
     elif args.number:
         result = validate(args.number)
         if result["valid"]: